@@ -0,0 +1,205 @@
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import LLMConfig
+from core.exceptions import CircuitOpenError, LLMRequestError
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker. After ``failure_threshold``
+    failures the circuit opens and calls fail fast; once ``reset_timeout``
+    seconds pass, one trial call is let through (half-open) and its outcome
+    closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may proceed now."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_flight:
+                return False
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = True
+            return True
+
+    def retry_after(self) -> float:
+        with self._lock:
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"LLM circuit opened after {self._failures} consecutive failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class OpenRouterClient:
+    """
+    Chat-completions client for OpenRouter (or any compatible endpoint)
+    that owns a pooled keep-alive ``requests.Session``. Calls use connect
+    and read timeouts, retry 429/5xx and transport errors with exponential
+    backoff and full jitter (honouring Retry-After), and go through a
+    circuit breaker so a failing upstream is not hammered.
+    """
+
+    def __init__(self, config: LLMConfig, session: Optional[requests.Session] = None):
+        self.config = config
+        self.breaker = CircuitBreaker(config.circuit_failure_threshold, config.circuit_reset_timeout)
+        self.session = session or self._build_session()
+        self._lock = threading.Lock()
+        self.requests_sent = 0
+        self.retries = 0
+
+    def _build_session(self) -> requests.Session:
+        session = requests.Session()
+        # Retries are handled here, not by urllib3, so backoff and the
+        # circuit breaker see every attempt.
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.config.pool_size, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({"Content-Type": "application/json"})
+        if self.config.api_key:
+            session.headers["Authorization"] = f"Bearer {self.config.api_key}"
+        return session
+
+    @property
+    def model(self) -> str:
+        return self.config.model
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.config.backoff_max)
+        cap = min(self.config.backoff_max, self.config.backoff_base * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    def chat_completion(self, messages: List[Dict[str, str]], model: Optional[str] = None,
+                        temperature: float = 0, **extra: Any) -> Dict[str, Any]:
+        """POST a chat completion and return the decoded JSON response."""
+        payload = {"model": model or self.config.model, "messages": messages, "temperature": temperature}
+        payload.update(extra)
+        timeout = (self.config.connect_timeout, self.config.read_timeout)
+
+        last_error = None
+        for attempt in range(self.config.max_retries + 1):
+            if not self.breaker.allow():
+                raise CircuitOpenError(
+                    f"LLM circuit is open; retry in {self.breaker.retry_after():.1f}s"
+                )
+
+            retry_after = None
+            recorded = False
+            try:
+                with self._lock:
+                    self.requests_sent += 1
+                response = self.session.post(self.config.api_url, json=payload, timeout=timeout)
+                if response.status_code < 400:
+                    result = response.json()
+                    self.breaker.record_success()
+                    recorded = True
+                    return result
+                message = f"LLM endpoint returned HTTP {response.status_code}: {response.text[:200]}"
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    # The upstream is healthy; the request itself is wrong.
+                    self.breaker.record_success()
+                    recorded = True
+                    raise LLMRequestError(message, status_code=response.status_code)
+                self.breaker.record_failure()
+                recorded = True
+                last_error = LLMRequestError(message, status_code=response.status_code)
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            except requests.RequestException as e:
+                # Transport errors, broken bodies and invalid JSON alike.
+                self.breaker.record_failure()
+                recorded = True
+                last_error = LLMRequestError(f"LLM request failed: {e}")
+            finally:
+                if not recorded:
+                    # Anything else (Ctrl-C, a bug) still ends the call, so a
+                    # half-open trial never keeps the circuit shut for good.
+                    self.breaker.record_failure()
+
+            if attempt < self.config.max_retries:
+                delay = self._backoff(attempt, retry_after)
+                logger.warning(f"{last_error}; retrying in {delay:.2f}s (attempt {attempt + 1}/{self.config.max_retries})")
+                with self._lock:
+                    self.retries += 1
+                time.sleep(delay)
+
+        raise last_error
+
+    def complete(self, prompt: str, model: Optional[str] = None, temperature: float = 0) -> str:
+        """Send a single user prompt and return the stripped reply text."""
+        result = self.chat_completion([{"role": "user", "content": prompt}], model=model, temperature=temperature)
+        return result["choices"][0]["message"]["content"].strip()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests_sent": self.requests_sent,
+                "retries": self.retries,
+                "circuit_state": self.breaker.state,
+            }
+
+    def close(self):
+        self.session.close()
@@ -1,23 +1,85 @@
-import os
-import json
-import requests
+import time
+from pathlib import Path
+from config.settings import settings
+from LLMs.client import OpenRouterClient
+from modules.embedder import Embedder
+from modules.schema_retriever import get_retriever
+from LLMs.response_cache import ResponseCache, schema_fingerprint
+from LLMs.semantic_cache import SemanticCache
+from services.index_usage import analyze_index_usage
+from utils.telemetry import telemetry
 
-# OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
-OPENROUTER_API_KEY = ""    #need to move it to env
-OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
-MODEL = "openai/gpt-3.5-turbo"  
+# Endpoint, key (OPENROUTER_API_KEY), timeouts and retry policy come from the environment.
+MODEL = settings.llm_model
+TOP_K_TABLES = 5
+CANNOT_ANSWER = "Sorry, I cannot answer that based on the available schema."
 
-def call_gpt_generate_sql(user_query: str, schema_json_path: str) -> str:
-    with open(schema_json_path, "r") as f:
-        schema = json.load(f)
+CACHE_PATH = "metadata/llm_cache.sqlite"
+CACHE_TTL_SECONDS = 7 * 24 * 3600
+CACHE_MAX_ENTRIES = 10000
+SEMANTIC_CACHE_THRESHOLD = 0.92
+
+_llm_client = None
+_response_cache = None
+_semantic_cache = None
+
+def get_llm_client() -> OpenRouterClient:
+    global _llm_client
+    if _llm_client is None:
+        _llm_client = OpenRouterClient(settings.llm_config)
+    return _llm_client
+
+def get_response_cache() -> ResponseCache:
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(CACHE_PATH, ttl_seconds=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES)
+    return _response_cache
+
+def get_semantic_cache(schema_json_path: str) -> SemanticCache:
+    """Semantic cache embedding questions with the backend used for the schema chunks."""
+    global _semantic_cache
+    if _semantic_cache is None:
+        embedder = Embedder(Path(schema_json_path).parent)
+        backend = Embedder.from_saved(embedder.base_dir).backend if embedder.info_path.exists() else None
+        _semantic_cache = SemanticCache(CACHE_PATH, backend=backend, threshold=SEMANTIC_CACHE_THRESHOLD,
+                                        max_entries=CACHE_MAX_ENTRIES)
+    return _semantic_cache
+
+def call_gpt_generate_sql(user_query: str, schema_json_path: str, top_k: int = TOP_K_TABLES,
+                          use_cache: bool = True) -> str:
+    started = time.perf_counter()
+    schema_hash = schema_fingerprint(schema_json_path)
+    similarity = None
+    if use_cache:
+        cached_sql = get_response_cache().get(MODEL, user_query, schema_hash)
+        if cached_sql is not None:
+            telemetry.record("sql_generation", path="exact_cache", similarity=1.0,
+                             latency_ms=(time.perf_counter() - started) * 1000)
+            return cached_sql
+
+        nearest = get_semantic_cache(schema_json_path).lookup(MODEL, user_query, schema_hash)
+        if nearest is not None:
+            similarity = nearest["similarity"]
+            if nearest["hit"]:
+                # Not copied into the exact cache: an exact entry should only
+                # ever hold SQL generated for that very question.
+                telemetry.record("sql_generation", path="semantic_cache", similarity=similarity,
+                                 matched_question=nearest["matched_question"],
+                                 latency_ms=(time.perf_counter() - started) * 1000)
+                return nearest["sql"]
+
+    # Only the tables relevant to the question (plus their FK neighbours) go
+    # into the prompt, so its size does not grow with the catalog.
+    retriever = get_retriever(schema_json_path, large_table_rows=settings.large_table_rows)
+    schema_text = retriever.build_prompt_schema(user_query, top_k=top_k)
 
     prompt = f"""
 You are a PostgreSQL expert.
 Given this database schema and a user question, generate an SQL query that best answers the user's intent.
 Avoid DROP, DELETE, INSERT, or UPDATE unless explicitly asked. Only return valid SQL query in your response.Use only the schema provided to answer user's query. Do not include explanations.
 
-Schema:
-{json.dumps(schema, indent=2)}
+Schema (one table per line: schema.table(column type [PK] [FK->schema.table.column], ...) [IDX[index; ...]] [ROWS~estimated rows]):
+{schema_text}
 
 User Query:
 {user_query}
@@ -27,25 +89,19 @@ SQL Query:
 Rules:
 - Only use the above schema. Do not guess table or column names.
 - Always use qualified names like ticket_schema.users.name
-- If the question cannot be answered from the schema, say: "Sorry, I cannot answer that based on the available schema."
+- Prefer filtering and joining on indexed columns (PK, FK targets and the leading column of an IDX entry) when several formulations answer the question. Keep indexed columns bare in predicates (no functions or casts on them); a partial index only applies when the query implies its WHERE condition.
+- Tables marked ROWS~ are very large: always filter them in WHERE (preferably on an indexed column) or add a LIMIT; never select from them unfiltered and unbounded.
+- If the question cannot be answered from the schema, say: "{CANNOT_ANSWER}"
 """
 
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "Content-Type": "application/json"
-    }
-
-    data = {
-        "model": MODEL,
-        "messages": [
-            {"role": "user", "content": prompt}
-        ],
-        "temperature": 0
-    }
-
-    response = requests.post(OPENROUTER_URL, headers=headers, json=data)
-    response.raise_for_status()
-
-    result = response.json()
-    sql = result["choices"][0]["message"]["content"].strip()
+    sql = get_llm_client().complete(prompt, model=MODEL)
+    if use_cache and sql != CANNOT_ANSWER:
+        get_response_cache().put(MODEL, user_query, schema_hash, sql)
+        get_semantic_cache(schema_json_path).add(MODEL, user_query, schema_hash, sql)
+    usage = analyze_index_usage(sql, retriever.tables)
+    telemetry.increment("index_predicates", usage.total)
+    telemetry.increment("index_predicates_hit", usage.hits)
+    telemetry.record("sql_generation", path="llm", similarity=similarity,
+                     index_predicates=usage.total, index_hits=usage.hits,
+                     latency_ms=(time.perf_counter() - started) * 1000)
     return sql
@@ -0,0 +1,171 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# Quoted literals and numbers: the parts of a question that are kept exactly as written.
+_LITERAL_RE = re.compile(r"'[^']*'|\"[^\"]*\"|`[^`]*`|\d\w*(?:[.,:/-]\w+)*")
+
+_fingerprints: Dict[str, Tuple[float, int, str]] = {}
+
+
+def normalize_question(question: str) -> str:
+    """
+    Case-fold, collapse whitespace and drop trailing punctuation outside
+    quoted literals and numbers, which are kept as written: 'ACME' and
+    'acme' can match different rows.
+    """
+    parts = []
+    position = 0
+    for match in _LITERAL_RE.finditer(question):
+        parts.append(_WHITESPACE_RE.sub(" ", question[position:match.start()]).lower())
+        parts.append(match.group())
+        position = match.end()
+    parts.append(_WHITESPACE_RE.sub(" ", question[position:]).lower())
+    return "".join(parts).strip().rstrip("?.!;").strip()
+
+
+def schema_fingerprint(schema_json_path: str) -> str:
+    """SHA-256 of the schema file, recomputed only when the file changes."""
+    path = os.path.abspath(schema_json_path)
+    stat = os.stat(path)
+    cached = _fingerprints.get(path)
+    if cached and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+        return cached[2]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    fingerprint = digest.hexdigest()
+    _fingerprints[path] = (stat.st_mtime, stat.st_size, fingerprint)
+    return fingerprint
+
+
+class ResponseCache:
+    """
+    Persistent SQLite cache of question -> generated SQL.
+
+    Keys combine the model name, the normalized question and the schema
+    fingerprint, so a schema change never serves stale SQL; entries for
+    older fingerprints are purged the first time a new one is seen.
+    Entries expire after ``ttl_seconds`` and the least recently used ones
+    are evicted beyond ``max_entries``.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 7 * 24 * 3600, max_entries: int = 10000):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                question TEXT NOT NULL,
+                schema_hash TEXT NOT NULL,
+                sql TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_access ON llm_cache (last_access)")
+
+        self._schema_hash: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(model: str, question: str, schema_hash: str) -> str:
+        raw = "\x00".join((model, normalize_question(question), schema_hash))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _check_schema_locked(self, schema_hash: str):
+        if schema_hash != self._schema_hash:
+            cursor = self._conn.execute("DELETE FROM llm_cache WHERE schema_hash != ?", (schema_hash,))
+            self.invalidations += max(cursor.rowcount, 0)
+            self._schema_hash = schema_hash
+
+    def get(self, model: str, question: str, schema_hash: str) -> Optional[str]:
+        key = self.make_key(model, question, schema_hash)
+        now = time.time()
+        with self._lock:
+            self._check_schema_locked(schema_hash)
+            row = self._conn.execute("SELECT sql, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            sql, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return sql
+
+    def put(self, model: str, question: str, schema_hash: str, sql: str):
+        key = self.make_key(model, question, schema_hash)
+        now = time.time()
+        with self._lock:
+            self._check_schema_locked(schema_hash)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, question, schema_hash, sql, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, normalize_question(question), schema_hash, sql, now, now),
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            if count > self.max_entries:
+                overflow = count - self.max_entries
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN "
+                    "(SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+
+    def purge_expired(self) -> int:
+        """Delete every entry past its TTL; returns the number removed."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+            removed = max(cursor.rowcount, 0)
+            self.expirations += removed
+            return removed
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,195 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from LLMs.response_cache import normalize_question
+from modules.embedder import EmbeddingBackend, HashingBackend
+
+# Parts of a question that change the SQL while barely moving its embedding.
+_QUOTED_RE = re.compile(r"'[^']*'|\"[^\"]*\"|`[^`]*`")
+_NUMBER_RE = re.compile(r"\d+(?:[.,:/-]\d+)*")
+_WORD_RE = re.compile(r"[a-z]+(?:'[a-z]+)?")
+_NEGATIONS = {"not", "no", "non", "without", "never", "none", "nor", "neither", "except", "excluding", "exclude",
+              "excludes", "other", "unless"}
+_DATE_WORDS = {
+    "today", "yesterday", "tomorrow", "tonight", "now", "this", "last", "next", "previous", "past", "current",
+    "prior", "ago", "since", "before", "after", "until", "between", "recent", "latest", "earliest",
+    "ytd", "mtd", "qtd", "weekend", "weekday", "daily", "weekly", "monthly", "quarterly", "yearly", "annual",
+    "january", "february", "march", "april", "may", "june", "july", "august", "september", "october",
+    "november", "december", "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+    "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday",
+    "hour", "hours", "day", "days", "week", "weeks", "month", "months", "quarter", "quarters", "year", "years",
+}
+_COMPARISONS = {
+    "more", "less", "fewer", "greater", "smaller", "larger", "above", "below", "over", "under", "least", "most",
+    "top", "bottom", "highest", "lowest", "max", "maximum", "min", "minimum", "ascending", "descending",
+    "first", "oldest", "newest", "exactly", "equal",
+}
+
+
+def question_constraints(question: str) -> Tuple[str, ...]:
+    """
+    Quoted literals, then numbers, then negations, date words and
+    comparison words of ``question``, each in order. Two questions can only share SQL when these are
+    identical: "in 2023" vs "in 2024", "with" vs "without" and "last month"
+    vs "this month" embed almost the same but ask for different rows.
+    """
+    text = normalize_question(question)
+    constraints = [f"'{literal[1:-1]}'" for literal in _QUOTED_RE.findall(text)]
+    text = _QUOTED_RE.sub(" ", text)
+    constraints += _NUMBER_RE.findall(text)
+    for word in _WORD_RE.findall(_NUMBER_RE.sub(" ", text)):
+        if word in _NEGATIONS or word.endswith("n't") or word in _DATE_WORDS or word in _COMPARISONS:
+            constraints.append(word)
+    return tuple(constraints)
+
+
+class SemanticCache:
+    """
+    Near-duplicate question cache in front of SQL generation.
+
+    Answered questions are embedded with the project embedder and kept in
+    SQLite; the vectors for the current model and schema fingerprint are
+    held in memory as one matrix. A new question reuses the SQL of the
+    nearest answered question whose similarity reaches ``threshold`` and
+    whose ``question_constraints`` (literals, numbers, negations, date and
+    comparison words) are identical, since those change the SQL without
+    moving the embedding much.
+    """
+
+    def __init__(self, path: str, backend: Optional[EmbeddingBackend] = None, threshold: float = 0.92,
+                 max_entries: int = 10000):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.backend = backend or HashingBackend()
+        self.threshold = threshold
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS semantic_cache (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                model TEXT NOT NULL,
+                schema_hash TEXT NOT NULL,
+                backend TEXT NOT NULL,
+                question TEXT NOT NULL,
+                sql TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS semantic_cache_scope ON semantic_cache (model, schema_hash, backend)"
+        )
+        self._backend_key = json.dumps(self.backend.config(), sort_keys=True)
+
+        self._scope: Optional[Tuple[str, str]] = None
+        self._matrix = np.empty((0, self.backend.dim), dtype=np.float32)
+        self._size = 0
+        self._questions: List[str] = []
+        self._constraints: List[Tuple[str, ...]] = []
+        self._sqls: List[str] = []
+
+    def _embed(self, question: str) -> np.ndarray:
+        return self.backend.embed([normalize_question(question)])[0]
+
+    def _load_scope_locked(self, model: str, schema_hash: str):
+        """Load the vectors answered for this model and schema into memory."""
+        if self._scope == (model, schema_hash):
+            return
+        # Answers for other schemas can never be served again.
+        self._conn.execute("DELETE FROM semantic_cache WHERE schema_hash != ?", (schema_hash,))
+        rows = self._conn.execute(
+            "SELECT question, sql, vector FROM semantic_cache "
+            "WHERE model = ? AND schema_hash = ? AND backend = ? ORDER BY id",
+            (model, schema_hash, self._backend_key),
+        ).fetchall()
+        self._questions = [row[0] for row in rows]
+        self._constraints = [question_constraints(row[0]) for row in rows]
+        self._sqls = [row[1] for row in rows]
+        self._matrix = np.empty((max(len(rows), 64), self.backend.dim), dtype=np.float32)
+        for i, row in enumerate(rows):
+            self._matrix[i] = np.frombuffer(row[2], dtype=np.float32)
+        self._size = len(rows)
+        self._scope = (model, schema_hash)
+
+    def lookup(self, model: str, question: str, schema_hash: str) -> Optional[Dict[str, object]]:
+        """
+        Nearest answered question for ``question``. Returns a dict with the
+        cached ``sql``, the ``similarity`` and the ``matched_question``, with
+        ``hit`` telling whether the similarity reached the threshold and the
+        constraints match; a hit is the most similar such question, a miss
+        the most similar question overall. None when nothing has been
+        answered yet for this model and schema.
+        """
+        vector = self._embed(question)
+        constraints = question_constraints(question)
+        with self._lock:
+            self._load_scope_locked(model, schema_hash)
+            if self._size == 0:
+                return None
+            scores = self._matrix[:self._size] @ vector
+            best = int(np.argmax(scores))
+            hit = False
+            above = np.flatnonzero(scores >= self.threshold)
+            for candidate in above[np.argsort(-scores[above], kind="stable")]:
+                if self._constraints[candidate] == constraints:
+                    best, hit = int(candidate), True
+                    break
+            similarity = float(scores[best])
+            return {
+                "hit": hit,
+                "sql": self._sqls[best],
+                "similarity": similarity,
+                "matched_question": self._questions[best],
+            }
+
+    def add(self, model: str, question: str, schema_hash: str, sql: str):
+        vector = self._embed(question)
+        with self._lock:
+            self._load_scope_locked(model, schema_hash)
+            self._conn.execute(
+                "INSERT INTO semantic_cache (model, schema_hash, backend, question, sql, vector, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (model, schema_hash, self._backend_key, normalize_question(question), sql,
+                 vector.astype(np.float32).tobytes(), time.time()),
+            )
+            if self._size == len(self._matrix):
+                grown = np.empty((len(self._matrix) * 2, self.backend.dim), dtype=np.float32)
+                grown[:self._size] = self._matrix[:self._size]
+                self._matrix = grown
+            self._matrix[self._size] = vector
+            self._size += 1
+            self._questions.append(normalize_question(question))
+            self._constraints.append(question_constraints(question))
+            self._sqls.append(sql)
+
+            if self._size > self.max_entries:
+                overflow = self._size - self.max_entries
+                self._conn.execute(
+                    "DELETE FROM semantic_cache WHERE id IN (SELECT id FROM semantic_cache "
+                    "WHERE model = ? AND schema_hash = ? AND backend = ? ORDER BY id LIMIT ?)",
+                    (model, schema_hash, self._backend_key, overflow),
+                )
+                self._matrix[:self._size - overflow] = self._matrix[overflow:self._size]
+                self._size -= overflow
+                del self._questions[:overflow]
+                del self._constraints[:overflow]
+                del self._sqls[:overflow]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,114 @@
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional, Tuple
+
+DEFAULT_SQL = "SELECT 1;"
+
+
+class StubLLMServer:
+    """
+    Local OpenAI/OpenRouter-compatible chat-completions endpoint for tests
+    and load tests. Replies with ``sql_for(prompt)`` (``DEFAULT_SQL`` by
+    default) after ``latency`` seconds. ``failures`` is a queue of
+    ``(status_code, retry_after)`` responses served before any success,
+    which is how retries and the circuit breaker are exercised.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 sql_for: Optional[Callable[[str], str]] = None,
+                 failures: Optional[List[Tuple[int, Optional[float]]]] = None):
+        self.latency = latency
+        self.sql_for = sql_for or (lambda prompt: DEFAULT_SQL)
+        self.failures = list(failures or [])
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: dict, headers: Optional[dict] = None):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up (e.g. a read timeout under test).
+                    pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with stub._lock:
+                    stub.requests += 1
+                    failure = stub.failures.pop(0) if stub.failures else None
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if failure is not None:
+                    status, retry_after = failure
+                    headers = {"Retry-After": str(retry_after)} if retry_after is not None else None
+                    self._send(status, {"error": {"message": "stub failure", "code": status}}, headers)
+                    return
+                prompt = payload.get("messages", [{}])[-1].get("content", "")
+                self._send(200, {
+                    "id": f"stub-{stub.requests}",
+                    "model": payload.get("model"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": stub.sql_for(prompt)}}],
+                })
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1/chat/completions"
+
+    def start(self) -> "StubLLMServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "StubLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a stub chat-completions endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before replying")
+    parser.add_argument("--sql", default=DEFAULT_SQL, help="SQL returned for every prompt")
+    args = parser.parse_args()
+
+    server = StubLLMServer(args.host, args.port, latency=args.latency, sql_for=lambda prompt: args.sql)
+    print(f"Stub LLM endpoint listening on {server.url} (set LLM_API_URL to use it)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
@@ -0,0 +1,49 @@
+# batch_run.py
+import argparse
+import logging
+
+from config.settings import settings
+from core.database import DatabaseConnection
+from services.batch_runner import BatchRunner
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a JSONL question bank through SQL generation and execution.")
+    parser.add_argument("input", help='JSONL file with one {"id": ..., "question": ...} per line')
+    parser.add_argument("output", help="JSONL file results are appended to (also the resume checkpoint; "
+                                       "failed ids are retried)")
+    parser.add_argument("--llm-concurrency", type=int, default=8, help="Concurrent SQL generation calls")
+    parser.add_argument("--db-concurrency", type=int, default=4, help="Concurrent query executions")
+    parser.add_argument("--llm-rate", type=float, default=None, help="Max LLM requests started per second")
+    parser.add_argument("--max-rows", type=int, default=100, help="Row cap per question")
+    parser.add_argument("--include-rows", action="store_true", help="Write result rows to the output")
+    parser.add_argument("--no-execute", action="store_true", help="Only generate SQL")
+    parser.add_argument("--restart", action="store_true", help="Overwrite the output instead of resuming")
+    parser.add_argument("--schema-json", default="data/llm_schema.json")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=settings.log_level, format=settings.log_format)
+    db = DatabaseConnection(config=settings.database_config)
+    runner = BatchRunner(db, schema_json_path=args.schema_json, llm_concurrency=args.llm_concurrency,
+                         db_concurrency=args.db_concurrency, llm_rate=args.llm_rate,
+                         execute=not args.no_execute, max_rows=args.max_rows, include_rows=args.include_rows)
+    try:
+        summary = runner.run(args.input, args.output, resume=not args.restart)
+    except KeyboardInterrupt:
+        print("\n[!] Interrupted; rerun the same command to resume.")
+        return
+    finally:
+        runner.close()
+        db.close()
+
+    print(f"[✓] {summary.processed} answered, {summary.skipped} resumed, {summary.errors} errors "
+          f"in {summary.elapsed_seconds:.1f}s ({summary.throughput:.1f} questions/s)")
+    cache = runner.pipeline.result_cache.stats()
+    if cache["hits"] or cache["misses"]:
+        print(f"[*] Result cache: {cache['hits']} hits / {cache['misses']} misses ({cache['hit_ratio']:.1%}), "
+              f"{cache['bytes_held'] / 2**20:.1f} MiB held, {cache['evictions']} evictions, "
+              f"{cache['invalidations']} invalidations")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/bench_ann.py
+"""
+Recall@k and latency of the IVF index versus exact search, across n_probe
+settings. Runs on a synthetic clustered corpus by default, or on the real
+chunk vectors with --base-dir.
+
+    python -m benchmarks.bench_ann --size 200000
+    python -m benchmarks.bench_ann --base-dir data
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from modules.ann_index import IVFIndex, compare_with_exact
+from modules.vector_search import VectorIndex
+
+
+def clustered_corpus(path: Path, n: int, dim: int, n_clusters: int, seed: int = 0) -> np.ndarray:
+    """Unit vectors drawn around random topic centres, written to a memmapped .npy."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((n_clusters, dim), dtype=np.float32)
+    matrix = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32, shape=(n, dim))
+    for start in range(0, n, 65536):
+        size = min(65536, n - start)
+        block = centres[rng.integers(0, n_clusters, size)] + 0.6 * rng.standard_normal((size, dim), dtype=np.float32)
+        block /= np.linalg.norm(block, axis=1, keepdims=True)
+        matrix[start:start + size] = block
+    matrix.flush()
+    del matrix
+    return np.load(path, mmap_mode='r')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-dir", help="Use the embedder's vectors in this directory")
+    parser.add_argument("--size", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("--n-lists", type=int, default=None)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--n-probe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.base_dir:
+            exact = VectorIndex.load(args.base_dir, use_ann=False)
+            vectors = exact.vectors
+        else:
+            vectors = clustered_corpus(Path(tmp) / "vectors.npy", args.size, args.dim, args.clusters)
+            metadata = [{"id": str(i), "schema": "s", "embedding_index": i} for i in range(args.size)]
+            exact = VectorIndex(vectors, metadata)
+
+        start = time.perf_counter()
+        ann = IVFIndex.build(vectors, path=Path(tmp) / "ivf", n_lists=args.n_lists)
+        build_seconds = time.perf_counter() - start
+
+        rng = np.random.default_rng(7)
+        rows = rng.choice(len(vectors), min(args.queries, len(vectors)), replace=False)
+        queries = np.asarray(vectors[np.sort(rows)]) + 0.05 * rng.standard_normal((len(rows), vectors.shape[1]), dtype=np.float32)
+
+        print(f"corpus={len(vectors)} dim={vectors.shape[1]} n_lists={ann.n_lists} k={args.k} build={build_seconds:.1f}s")
+        print(f"{'method':>8} {'n_probe':>8} {'recall@k':>9} {'p50 ms':>8} {'p95 ms':>8}")
+        for row in compare_with_exact(exact, ann, queries, k=args.k, n_probes=args.n_probe):
+            print(f"{row['method']:>8} {row['n_probe']:>8} {row['recall']:>9.3f} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f}")
+        del ann, exact, vectors
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/bench_columnar.py
+"""
+Memory and build time of a query result held as a list of dicts
+(execute_sql) versus a ColumnarResult (execute_columnar), on a synthetic
+result of mixed column types generated server-side (default 1M rows).
+Needs a reachable database (DB_* settings).
+
+    python -m benchmarks.bench_columnar --rows 1000000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from config.settings import settings
+from core.database import DatabaseConnection
+from services.query_executor import execute_columnar, execute_sql
+
+QUERY = """
+    SELECT g::bigint AS id,
+           (g %% 1000)::int AS account_id,
+           CASE WHEN g %% 10 = 0 THEN NULL ELSE g %% 97 END AS bucket,
+           g * 0.25::float8 AS amount,
+           'customer_' || (g %% 5000) AS name,
+           timestamptz '2024-01-01' + g * interval '1 second' AS created_at,
+           g %% 2 = 0 AS active
+    FROM generate_series(1, %s) AS g
+"""
+
+
+def measure(build, trace: bool):
+    gc.collect()
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    retained = peak = 0
+    if trace:
+        gc.collect()
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    del result
+    return elapsed, retained, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    db = DatabaseConnection(settings.database_config)
+    sql = QUERY % args.rows
+    variants = [
+        ("dicts", lambda: execute_sql(sql, db)),
+        ("columnar", lambda: execute_columnar(sql, db, batch_size=args.batch_size)),
+    ]
+
+    print(f"{args.rows} rows x 7 columns")
+    print(f"{'result':>10} {'build s':>9} {'held MiB':>10} {'peak MiB':>10}")
+    for name, build in variants:
+        # Time is measured untraced; tracemalloc slows allocation-heavy code.
+        elapsed, _, _ = measure(build, trace=False)
+        _, retained, peak = measure(build, trace=True)
+        print(f"{name:>10} {elapsed:>9.2f} {retained / 2**20:>10.1f} {peak / 2**20:>10.1f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# benchmarks/bench_schema_extractor.py
+"""
+Extraction-side cost of SchemaExtractor: CPU time and tracemalloc peak for
+assembling a synthetic catalog (default 50k tables x 40 columns), for the
+per-table indexed assembly and for the previous nested-loop assembly over
+fetchall() lists.
+
+    python -m benchmarks.bench_schema_extractor --tables 50000 --columns 40
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from benchmarks.synthetic import column_rows, fk_rows, pk_rows
+from core.models import ColumnInfo, DatabaseSchema, ForeignKeyInfo, TableInfo
+from services.schema_extractor import SchemaExtractor
+
+
+def nested_loop_assemble(column_rows, pk_rows, fk_rows) -> DatabaseSchema:
+    """The pre-index assembly: every PK/FK row scans all of its table's columns."""
+    column_rows, pk_rows, fk_rows = list(column_rows), list(pk_rows), list(fk_rows)
+    tables = {}
+    for row in column_rows:
+        key = f"{row['table_schema']}.{row['table_name']}"
+        if key not in tables:
+            tables[key] = TableInfo(schema_name=row['table_schema'], table_name=row['table_name'])
+        tables[key].columns.append(ColumnInfo(
+            column_name=row['column_name'], data_type=row['data_type'], is_nullable=row['is_nullable'],
+            column_default=row['column_default'], character_maximum_length=row['character_maximum_length'],
+            numeric_precision=row['numeric_precision'], numeric_scale=row['numeric_scale'],
+        ))
+    for row in pk_rows:
+        table = tables.get(f"{row['table_schema']}.{row['table_name']}")
+        if table:
+            for col in table.columns:
+                if col.column_name == row['column_name']:
+                    col.is_primary_key = True
+    for row in fk_rows:
+        table = tables.get(f"{row['table_schema']}.{row['table_name']}")
+        if table:
+            table.foreign_keys.append(ForeignKeyInfo(
+                constraint_name=row['constraint_name'], column_name=row['column_name'],
+                referenced_table_schema=row['foreign_table_schema'],
+                referenced_table_name=row['foreign_table_name'],
+                referenced_column_name=row['foreign_column_name'],
+            ))
+            for col in table.columns:
+                if col.column_name == row['column_name']:
+                    col.is_foreign_key = True
+                    col.foreign_key_info = table.foreign_keys[-1]
+    return DatabaseSchema(tables=tables)
+
+
+def consume_rows(column_rows, pk_rows, fk_rows):
+    """Generate the synthetic rows only: the floor under both assemblies."""
+    for rows in (column_rows, pk_rows, fk_rows):
+        for _ in rows:
+            pass
+
+
+def measure(assemble, args, trace: bool):
+    rows = (
+        column_rows(args.tables, args.columns, args.schemas),
+        pk_rows(args.tables, args.schemas),
+        fk_rows(args.tables, args.columns, args.schemas, args.fks),
+    )
+    gc.collect()
+    if trace:
+        tracemalloc.start()
+    start = time.process_time()
+    schema = assemble(*rows)
+    cpu = time.process_time() - start
+    peak = 0
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    del schema
+    return cpu, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables", type=int, default=50_000)
+    parser.add_argument("--columns", type=int, default=40)
+    parser.add_argument("--schemas", type=int, default=20)
+    parser.add_argument("--fks", type=int, default=2, help="Foreign keys per table")
+    parser.add_argument("--skip-baseline", action="store_true")
+    args = parser.parse_args()
+
+    variants = [("rows only", consume_rows), ("indexed", SchemaExtractor._assemble)]
+    if not args.skip_baseline:
+        variants.append(("nested-loop", nested_loop_assemble))
+
+    print(f"{args.tables} tables x {args.columns} columns, {args.fks} FKs/table")
+    print(f"{'assembly':>12} {'cpu s':>8} {'peak MiB':>10}")
+    for name, assemble in variants:
+        # CPU time is measured untraced; tracemalloc slows allocation-heavy code.
+        cpu, _ = measure(assemble, args, trace=False)
+        _, peak = measure(assemble, args, trace=True)
+        print(f"{name:>12} {cpu:>8.2f} {peak / 2**20:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# benchmarks/bench_schema_snapshot.py
+"""
+Cold-load time and resident memory of a schema saved as a pickle versus
+a binary snapshot, loaded whole or lazily (directory up front, then
+``--sample`` tables decoded on access, as a first request would), on a
+synthetic catalog (default 50k tables x 40 columns). Every load runs in a
+fresh interpreter; memory is the growth of RSS over the load. Linux only
+(/proc).
+
+    python -m benchmarks.bench_schema_snapshot --tables 50000 --columns 40
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import synthetic_schema
+
+PAGE_MIB = os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def _rss_mib() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * PAGE_MIB
+
+
+def child(mode: str, path: str, sample: int):
+    """Load ``path`` the way ``mode`` says and print one JSON line of measurements."""
+    from utils.schema_io import load_schema
+
+    gc.collect()
+    rss = _rss_mib()
+    start = time.perf_counter()
+    loaded = load_schema(path, lazy=mode == "lazy")
+    if mode == "lazy":
+        for key in random.Random(0).sample(list(loaded.tables), sample):
+            loaded.tables[key].primary_key_columns
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    print(json.dumps({"seconds": elapsed, "rss_mib": _rss_mib() - rss}))
+    del loaded
+
+
+def measure(mode: str, path: str, sample: int) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_schema_snapshot", "--child", mode, path, "--sample", str(sample)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables", type=int, default=50_000)
+    parser.add_argument("--columns", type=int, default=40)
+    parser.add_argument("--sample", type=int, default=10, help="Tables decoded after opening the snapshot")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], args.child[1], args.sample)
+        return
+
+    from utils.schema_io import save_schema
+
+    print(f"[*] Building {args.tables} tables x {args.columns} columns...")
+    schema = synthetic_schema(args.tables, args.columns)
+    with tempfile.TemporaryDirectory() as directory:
+        pickle_path = os.path.join(directory, "schema.pkl")
+        snapshot_path = os.path.join(directory, "schema.snap")
+        json_path = os.path.join(directory, "schema.json")
+        for label, path in (("pickle", pickle_path), ("snapshot", snapshot_path), ("JSON", json_path)):
+            start = time.perf_counter()
+            save_schema(schema, path)
+            print(f"[*] Saved {label}: {os.path.getsize(path) / 2**20:,.1f} MiB "
+                  f"in {time.perf_counter() - start:.2f}s")
+        del schema
+        gc.collect()
+
+        print(f"{'load':>30} {'seconds':>9} {'RSS MiB':>9}")
+        for label, mode, path in (
+            ("pickle (all tables)", "full", pickle_path),
+            ("snapshot (all tables)", "full", snapshot_path),
+            (f"snapshot (lazy, {args.sample} tables)", "lazy", snapshot_path),
+            (f"JSON (lazy, {args.sample} tables)", "lazy", json_path),
+        ):
+            result = measure(mode, path, args.sample)
+            print(f"{label:>30} {result['seconds']:>9.3f} {result['rss_mib']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/bench_vector_search.py
+"""
+Micro-benchmark for VectorIndex: queries/sec versus corpus size for single
+and batched queries, with and without a schema filter.
+
+    python -m benchmarks.bench_vector_search --sizes 10000 100000 500000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from modules.vector_search import VectorIndex
+
+
+def build_corpus(path: Path, n: int, dim: int, n_schemas: int, seed: int = 0):
+    """Write n random unit vectors to a .npy file and return (memmap, metadata)."""
+    rng = np.random.default_rng(seed)
+    matrix = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32, shape=(n, dim))
+    for start in range(0, n, 65536):
+        block = rng.standard_normal((min(65536, n - start), dim), dtype=np.float32)
+        block /= np.linalg.norm(block, axis=1, keepdims=True)
+        matrix[start:start + len(block)] = block
+    matrix.flush()
+    del matrix
+    metadata = [
+        {"id": f"schema_{i % n_schemas}.table_{i}", "schema": f"schema_{i % n_schemas}", "embedding_index": i}
+        for i in range(n)
+    ]
+    return np.load(path, mmap_mode='r'), metadata
+
+
+def time_queries(fn, queries: np.ndarray, repeat: int) -> float:
+    """Best-of-``repeat`` queries/sec for ``fn`` over ``queries``."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(queries)
+        best = min(best, time.perf_counter() - start)
+    return len(queries) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=64)
+    parser.add_argument("--schemas", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+
+    print(f"dim={args.dim} k={args.k} queries={args.queries}")
+    print(f"{'corpus':>10} {'single q/s':>12} {'batch q/s':>12} {'filtered q/s':>13} {'p50 ms':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            vectors, metadata = build_corpus(Path(tmp) / f"vectors_{n}.npy", n, args.dim, args.schemas)
+            index = VectorIndex(vectors, metadata)
+            index.search(queries[0], args.k)  # warm the page cache
+
+            single = time_queries(lambda qs: [index.search(q, args.k) for q in qs], queries, args.repeat)
+            batch = time_queries(lambda qs: index.search_batch(qs, args.k), queries, args.repeat)
+            filtered = time_queries(lambda qs: index.search_batch(qs, args.k, schemas=["schema_0"]),
+                                    queries, args.repeat)
+
+            latencies = []
+            for q in queries:
+                start = time.perf_counter()
+                index.search(q, args.k)
+                latencies.append((time.perf_counter() - start) * 1000)
+            print(f"{n:>10} {single:>12.0f} {batch:>12.0f} {filtered:>13.0f} {np.median(latencies):>8.2f}")
+            del index, vectors
+
+
+if __name__ == "__main__":
+    main()
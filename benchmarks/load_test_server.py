@@ -0,0 +1,86 @@
+# benchmarks/load_test_server.py
+"""
+Local load test for the HTTP service. Starts a stub LLM endpoint and the
+service in-process (or targets --url), fires --requests POST /query calls
+from --concurrency clients and reports throughput and latency.
+
+    python -m benchmarks.load_test_server --requests 200 --concurrency 16 --llm-latency 0.2
+    python -m benchmarks.load_test_server --no-execute   # LLM path only, no database needed
+"""
+
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+from LLMs.stub_server import StubLLMServer
+
+
+def run_load(url: str, total: int, concurrency: int, execute: bool, distinct: bool):
+    local = threading.local()
+
+    def one(i: int):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        question = f"how many users are there variant {i}" if distinct else "how many users are there"
+        started = time.perf_counter()
+        response = session.post(f"{url}/query", json={"question": question, "execute": execute}, timeout=60)
+        return response.status_code, (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies = np.array([ms for _, ms in results])
+    errors = sum(1 for status, _ in results if status != 200)
+    print(f"requests={total} concurrency={concurrency} errors={errors}")
+    print(f"throughput={total / elapsed:.1f} req/s  p50={np.percentile(latencies, 50):.1f}ms  "
+          f"p95={np.percentile(latencies, 95):.1f}ms  p99={np.percentile(latencies, 99):.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Target an already running service instead of starting one")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--sql", default="SELECT count(*) FROM ticket_schema.users")
+    parser.add_argument("--no-execute", action="store_true", help="Only generate SQL")
+    parser.add_argument("--repeat-question", action="store_true",
+                        help="Send the same question every time (exercises the caches)")
+    args = parser.parse_args()
+
+    if args.url:
+        run_load(args.url, args.requests, args.concurrency, not args.no_execute, not args.repeat_question)
+        return
+
+    with StubLLMServer(latency=args.llm_latency, sql_for=lambda prompt: args.sql) as stub:
+        # Settings are read at import time, so point them at the stub first.
+        os.environ["LLM_API_URL"] = stub.url
+        from config.settings import settings
+        from core.database import DatabaseConnection
+        from services.api_server import create_server
+
+        db = DatabaseConnection(settings.database_config)
+        server = create_server(db, port=0, workers=args.workers, warm=not args.no_execute)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        host, port = server.server_address[:2]
+        try:
+            run_load(f"http://{host}:{port}", args.requests, args.concurrency,
+                     not args.no_execute, not args.repeat_question)
+        finally:
+            server.shutdown()
+            server.server_close()
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/synthetic.py
+"""
+Synthetic catalog generator shared by the schema benchmarks. Rows have the
+same keys the SchemaExtractor catalog queries return, so they can be fed
+straight into ``SchemaExtractor._assemble``.
+"""
+
+from typing import Any, Dict, Iterator
+
+from core.models import DatabaseSchema
+from services.schema_extractor import SchemaExtractor
+
+DATA_TYPES = [
+    ("integer", None, 32, 0),
+    ("bigint", None, 64, 0),
+    ("character varying", 255, None, None),
+    ("text", None, None, None),
+    ("numeric", None, 12, 2),
+    ("timestamp without time zone", None, None, None),
+    ("boolean", None, None, None),
+]
+
+
+def _table(i: int, n_schemas: int):
+    return f"schema_{i % n_schemas}", f"table_{i}"
+
+
+def column_rows(n_tables: int, n_columns: int, n_schemas: int = 20) -> Iterator[Dict[str, Any]]:
+    """``id`` plus ``n_columns - 1`` typed columns per table; the last two are FK columns."""
+    for i in range(n_tables):
+        schema, table = _table(i, n_schemas)
+        for c in range(n_columns):
+            data_type, char_len, precision, scale = DATA_TYPES[c % len(DATA_TYPES)] if c else DATA_TYPES[1]
+            yield {
+                "table_schema": schema,
+                "table_name": table,
+                "column_name": "id" if c == 0 else f"col_{c}",
+                "data_type": data_type,
+                "is_nullable": c != 0,
+                "column_default": f"nextval('{table}_id_seq'::regclass)" if c == 0 else None,
+                "character_maximum_length": char_len,
+                "numeric_precision": precision,
+                "numeric_scale": scale,
+            }
+
+
+def pk_rows(n_tables: int, n_schemas: int = 20) -> Iterator[Dict[str, Any]]:
+    for i in range(n_tables):
+        schema, table = _table(i, n_schemas)
+        yield {"table_schema": schema, "table_name": table, "column_name": "id"}
+
+
+def fk_rows(n_tables: int, n_columns: int, n_schemas: int = 20, fks_per_table: int = 2) -> Iterator[Dict[str, Any]]:
+    """Each table references the ``id`` of the ``fks_per_table`` tables before it."""
+    for i in range(n_tables):
+        schema, table = _table(i, n_schemas)
+        for f in range(1, min(fks_per_table, n_columns - 1, i) + 1):
+            ref_schema, ref_table = _table(i - f, n_schemas)
+            column = f"col_{n_columns - f}"
+            yield {
+                "constraint_name": f"{table}_{column}_fkey",
+                "table_schema": schema,
+                "table_name": table,
+                "column_name": column,
+                "foreign_table_schema": ref_schema,
+                "foreign_table_name": ref_table,
+                "foreign_column_name": "id",
+            }
+
+
+def synthetic_schema(n_tables: int, n_columns: int = 40, n_schemas: int = 20, fks_per_table: int = 2) -> DatabaseSchema:
+    """A fully assembled DatabaseSchema over the synthetic catalog."""
+    return SchemaExtractor._assemble(
+        column_rows(n_tables, n_columns, n_schemas),
+        pk_rows(n_tables, n_schemas),
+        fk_rows(n_tables, n_columns, n_schemas, fks_per_table),
+    )
@@ -0,0 +1,30 @@
+import argparse
+import time
+
+from config.settings import settings
+from core.database import DatabaseConnection
+from services.stats_collector import StatisticsCollector
+from utils.schema_io import DEFAULT_STATS_PATH, save_statistics
+
+parser = argparse.ArgumentParser(
+    description="Snapshot table/column statistics into metadata/. Run this on its own schedule "
+                "(e.g. after nightly ANALYZE); the schema snapshot does not need to be re-extracted."
+)
+parser.add_argument("--schemas", nargs="+", help="Only collect statistics for these schemas")
+parser.add_argument("--output", default=DEFAULT_STATS_PATH)
+args = parser.parse_args()
+
+db = DatabaseConnection(settings.database_config)
+started = time.perf_counter()
+statistics = StatisticsCollector(db).collect(args.schemas)
+save_statistics(statistics, args.output)
+db.close()
+
+unanalyzed = sum(1 for table in statistics.tables.values() if table.row_estimate is None)
+print(f"[*] Collected statistics for {len(statistics.tables)} tables in {time.perf_counter() - started:.2f}s")
+if unanalyzed:
+    print(f"[!] {unanalyzed} tables have never been analyzed; run ANALYZE for row estimates.")
+for table in statistics.large_tables(settings.large_table_rows):
+    print(f"    {table.full_name}: ~{table.row_estimate:,.0f} rows, {table.total_bytes / 2**20:,.1f} MiB")
+
+print("✅ Statistics collected and saved.")
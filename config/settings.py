@@ -15,13 +15,44 @@ class DatabaseConfig(BaseModel):
     password: str = Field(..., min_length=1, description='Database password')
     sslmode: str = Field(default='prefer', description='SSL mode')
 
+    # Connection pool configuration
+    pool_min_size: int = Field(default=1, ge=0, description='Connections kept open even when idle')
+    pool_max_size: int = Field(default=10, ge=1, description='Upper bound on open connections')
+    pool_max_lifetime: float = Field(default=1800.0, gt=0, description='Seconds before a connection is recycled')
+    pool_max_idle: float = Field(default=300.0, gt=0, description='Seconds an idle connection is kept above min size')
+    pool_timeout: float = Field(default=30.0, gt=0, description='Seconds to wait for a free connection')
+    pool_check_interval: float = Field(default=5.0, ge=0, description='Idle seconds after which a checkout is health-checked')
+
     @validator('sslmode')
     def validate_sslmode(cls, v):
         valid_modes = ['disable', 'allow', 'prefer', 'require', 'verify-ca', 'verify-full']
         if v not in valid_modes:
             raise ValueError(f"Invalid SSL mode. Must be one of: {valid_modes}")
         return v
+
+    @validator('pool_max_size')
+    def validate_pool_max_size(cls, v, values):
+        min_size = values.get('pool_min_size')
+        if min_size is not None and v < min_size:
+            raise ValueError("pool_max_size must be greater than or equal to pool_min_size")
+        return v
     
+class LLMConfig(BaseModel):
+    '''LLM endpoint configuration model with validation.'''
+
+    api_url: str = Field(..., min_length=1, description='Chat completions endpoint URL')
+    api_key: str = Field(default='', description='API key sent as a bearer token')
+    model: str = Field(..., min_length=1, description='Model name')
+    connect_timeout: float = Field(default=5.0, gt=0, description='Seconds to establish a connection')
+    read_timeout: float = Field(default=60.0, gt=0, description='Seconds to wait for a response')
+    max_retries: int = Field(default=3, ge=0, description='Retries on 429/5xx and transport errors')
+    backoff_base: float = Field(default=0.5, ge=0, description='First retry backoff in seconds')
+    backoff_max: float = Field(default=20.0, ge=0, description='Upper bound on a single backoff in seconds')
+    circuit_failure_threshold: int = Field(default=5, ge=1, description='Consecutive failures that open the circuit')
+    circuit_reset_timeout: float = Field(default=30.0, gt=0, description='Seconds before an open circuit allows a trial call')
+    pool_size: int = Field(default=10, ge=1, description='Keep-alive connections kept per host')
+
+
 class Settings(BaseSettings):
     """Application settings loaded from environment varialbes"""
 
@@ -32,6 +63,44 @@ class Settings(BaseSettings):
     db_password: str = Field(..., env="DB_PASSWORD")
     db_ssl_mode: str = Field(default="prefer", env="DB_SSL_MODE")
 
+    # Connection pool configuration
+    db_pool_min_size: int = Field(default=1, env="DB_POOL_MIN_SIZE")
+    db_pool_max_size: int = Field(default=10, env="DB_POOL_MAX_SIZE")
+    db_pool_max_lifetime: float = Field(default=1800.0, env="DB_POOL_MAX_LIFETIME")
+    db_pool_max_idle: float = Field(default=300.0, env="DB_POOL_MAX_IDLE")
+    db_pool_timeout: float = Field(default=30.0, env="DB_POOL_TIMEOUT")
+    db_pool_check_interval: float = Field(default=5.0, env="DB_POOL_CHECK_INTERVAL")
+
+    # LLM configuration
+    openrouter_api_key: str = Field(default="", env="OPENROUTER_API_KEY")
+    llm_api_url: str = Field(default="https://openrouter.ai/api/v1/chat/completions", env="LLM_API_URL")
+    llm_model: str = Field(default="openai/gpt-3.5-turbo", env="LLM_MODEL")
+    llm_connect_timeout: float = Field(default=5.0, env="LLM_CONNECT_TIMEOUT")
+    llm_read_timeout: float = Field(default=60.0, env="LLM_READ_TIMEOUT")
+    llm_max_retries: int = Field(default=3, env="LLM_MAX_RETRIES")
+    llm_backoff_base: float = Field(default=0.5, env="LLM_BACKOFF_BASE")
+    llm_backoff_max: float = Field(default=20.0, env="LLM_BACKOFF_MAX")
+    llm_circuit_failure_threshold: int = Field(default=5, env="LLM_CIRCUIT_FAILURE_THRESHOLD")
+    llm_circuit_reset_timeout: float = Field(default=30.0, env="LLM_CIRCUIT_RESET_TIMEOUT")
+    llm_pool_size: int = Field(default=10, env="LLM_POOL_SIZE")
+
+    # Query time limits in seconds (0 disables); the background lane gets its own
+    query_timeout: float = Field(default=60.0, env="QUERY_TIMEOUT")
+    background_query_timeout: float = Field(default=600.0, env="BACKGROUND_QUERY_TIMEOUT")
+
+    # Result cache size (0 disables) and how often table change counters are polled
+    result_cache_max_mb: float = Field(default=64.0, env="RESULT_CACHE_MAX_MB")
+    result_cache_poll_interval: float = Field(default=5.0, env="RESULT_CACHE_POLL_INTERVAL")
+
+    # Guardrails: tables estimated above this many rows need a filter or LIMIT
+    large_table_rows: int = Field(default=1_000_000, env="LARGE_TABLE_ROWS")
+
+    # Cost gate: EXPLAIN generated SQL and apply a policy above max cost (0 disables)
+    cost_gate_max_cost: float = Field(default=1_000_000.0, env="COST_GATE_MAX_COST")
+    cost_gate_policy: str = Field(default="reject", env="COST_GATE_POLICY")
+    cost_gate_limit_rows: int = Field(default=1000, env="COST_GATE_LIMIT_ROWS")
+    cost_gate_reject_cost: float = Field(default=0.0, env="COST_GATE_REJECT_COST")
+
     # Logging configuration
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
     log_format: str = Field(default="%(asctime)s - %(name)s - %(levelname)s - %(message)s", env="LOG_FORMAT")
@@ -50,7 +119,30 @@ class Settings(BaseSettings):
             database=self.db_name,
             user=self.db_user,
             password=self.db_password,
-            sslmode=self.db_ssl_mode
+            sslmode=self.db_ssl_mode,
+            pool_min_size=self.db_pool_min_size,
+            pool_max_size=self.db_pool_max_size,
+            pool_max_lifetime=self.db_pool_max_lifetime,
+            pool_max_idle=self.db_pool_max_idle,
+            pool_timeout=self.db_pool_timeout,
+            pool_check_interval=self.db_pool_check_interval
        )
 
+    @property
+    def llm_config(self) -> LLMConfig:
+        """Get LLM endpoint configuration."""
+        return LLMConfig(
+            api_url=self.llm_api_url,
+            api_key=self.openrouter_api_key,
+            model=self.llm_model,
+            connect_timeout=self.llm_connect_timeout,
+            read_timeout=self.llm_read_timeout,
+            max_retries=self.llm_max_retries,
+            backoff_base=self.llm_backoff_base,
+            backoff_max=self.llm_backoff_max,
+            circuit_failure_threshold=self.llm_circuit_failure_threshold,
+            circuit_reset_timeout=self.llm_circuit_reset_timeout,
+            pool_size=self.llm_pool_size
+        )
+
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,264 @@
+# core/columnar.py
+from collections import defaultdict
+from collections.abc import Mapping
+from datetime import timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import psycopg2.extensions
+
+# PostgreSQL type OIDs with a native NumPy representation; every other
+# type (text, numeric, json, arrays, ...) is kept as an object array.
+PG_NUMPY_DTYPES = {
+    16: np.dtype(np.bool_),             # bool
+    21: np.dtype(np.int16),             # int2
+    23: np.dtype(np.int32),             # int4
+    20: np.dtype(np.int64),             # int8
+    26: np.dtype(np.uint32),            # oid
+    700: np.dtype(np.float32),          # float4
+    701: np.dtype(np.float64),          # float8
+    1082: np.dtype("datetime64[D]"),    # date
+    1114: np.dtype("datetime64[us]"),   # timestamp
+    1184: np.dtype("datetime64[us]"),   # timestamptz, stored as UTC
+}
+TIMESTAMPTZ_OID = 1184
+OBJECT = np.dtype(object)
+
+# Dates and timestamps are fetched as text and parsed by NumPy in C, which
+# is several times faster than building datetime objects and converting
+# them; values NumPy cannot parse go through psycopg2's own casters.
+TEMPORAL_CASTERS = {
+    1082: psycopg2.extensions.PYDATE,
+    1114: psycopg2.extensions.PYDATETIME,
+    1184: psycopg2.extensions.PYDATETIMETZ,
+}
+RAW_TEMPORAL = psycopg2.extensions.new_type(tuple(TEMPORAL_CASTERS), "COLUMNAR_RAW_TEMPORAL",
+                                            lambda value, cursor: value)
+
+
+def _temporal_chunk(values: Sequence[Optional[str]], dtype: np.dtype, oid: int, cursor) -> np.ndarray:
+    text: Optional[List[Optional[str]]] = list(values)
+    if oid == TIMESTAMPTZ_OID:
+        # Fast path for sessions in UTC (execute_columnar sets it).
+        if all(v is None or v.endswith("+00") for v in values):
+            text = [v[:-3] if v is not None else None for v in values]
+        else:
+            text = None
+    if text is not None:
+        try:
+            # NumPy reads None as NaT, which doubles as the NULL marker.
+            return np.array(text, dtype=dtype)
+        except ValueError:
+            pass
+    # Other time zones, infinity, BC dates or a non-ISO DateStyle.
+    caster = TEMPORAL_CASTERS[oid]
+    return np.fromiter((caster(v, cursor) if v is not None else None for v in values),
+                       dtype=OBJECT, count=len(values))
+
+
+def _as_objects(array: np.ndarray, utc: bool) -> np.ndarray:
+    """Datetime64 chunk as an object array of date/datetime values (None for NaT)."""
+    values = array.astype(OBJECT)
+    values[np.isnat(array)] = None
+    if utc:
+        values = np.fromiter((v.replace(tzinfo=timezone.utc) if v is not None else None for v in values),
+                             dtype=OBJECT, count=len(values))
+    return values
+
+
+def _column_chunk(values: Sequence[Any], dtype: np.dtype, oid: int, cursor):
+    """``(array, null mask or None)`` for one batch of one column."""
+    count = len(values)
+    if dtype.kind == "O":
+        return np.fromiter(values, dtype=OBJECT, count=count), None
+    if dtype.kind == "M":
+        return _temporal_chunk(values, dtype, oid, cursor), None
+    if None in values:
+        mask = np.fromiter((v is None for v in values), dtype=np.bool_, count=count)
+        return np.fromiter((0 if v is None else v for v in values), dtype=dtype, count=count), mask
+    return np.fromiter(values, dtype=dtype, count=count), None
+
+
+def _unique_names(names: Sequence[str]) -> List[str]:
+    """Column names with repeats renamed the way pandas does: ``id``, ``id.1``, ``id.2``, ..."""
+    counts: Dict[str, int] = defaultdict(int)
+    unique = []
+    for name in names:
+        count = counts[name]
+        while count > 0:
+            counts[name] = count + 1
+            name = f"{name}.{count}"
+            count = counts[name]
+        counts[name] = count + 1
+        unique.append(name)
+    return unique
+
+
+class RowView(Mapping):
+    """Read-only mapping over one row of a ColumnarResult; values are materialized on access."""
+
+    __slots__ = ("_result", "_row")
+
+    def __init__(self, result: "ColumnarResult", row: int):
+        self._result = result
+        self._row = row
+
+    def __getitem__(self, name: str) -> Any:
+        return self._result.value(self._row, self._result.column_index(name))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._result.names)
+
+    def __len__(self) -> int:
+        return len(self._result.names)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: self._result.value(self._row, i) for i, name in enumerate(self._result.names)}
+
+    def __repr__(self) -> str:
+        return f"RowView({self.to_dict()!r})"
+
+
+class ColumnarResult:
+    """
+    Query result held as one array per column, with column names stored
+    once. Integer, float, boolean, date and timestamp columns are typed
+    NumPy arrays (NULLs tracked by a boolean mask, or NaT for dates and
+    times); other types are object arrays of the values psycopg2 returns.
+
+    ``to_numpy``/``to_pandas`` hand out the column arrays without copying.
+    Indexing and iteration yield RowView mappings, so code written for
+    list-of-dicts results keeps working; ``to_dicts`` materializes them.
+    Repeated column names (``SELECT a.id, b.id``) are renamed ``id``,
+    ``id.1``, ... as pandas does, so no column is lost.
+    """
+
+    def __init__(self, names: Sequence[str], columns: Sequence[np.ndarray],
+                 masks: Optional[Sequence[Optional[np.ndarray]]] = None, utc_columns: Sequence[str] = ()):
+        self.names: List[str] = _unique_names(names)
+        self._columns = list(columns)
+        self._masks = list(masks) if masks is not None else [None] * len(self._columns)
+        self._utc = [name in utc_columns for name in self.names]
+        self._index = {name: i for i, name in enumerate(self.names)}
+        self._length = len(self._columns[0]) if self._columns else 0
+
+    @classmethod
+    def from_cursor(cls, cursor, batch_size: int = 10_000) -> "ColumnarResult":
+        """Drain ``cursor`` with fetchmany, converting each batch straight into column arrays."""
+        psycopg2.extensions.register_type(RAW_TEMPORAL, cursor)
+        # Named (server-side) cursors only describe their columns after the first fetch.
+        rows = cursor.fetchmany(batch_size) if cursor.description is None else None
+        if cursor.description is None:
+            return cls([], [])
+        names = _unique_names([desc[0] for desc in cursor.description])
+        oids = [desc[1] for desc in cursor.description]
+        dtypes = [PG_NUMPY_DTYPES.get(oid, OBJECT) for oid in oids]
+        utc = [oid == TIMESTAMPTZ_OID for oid in oids]
+        chunks: List[List[np.ndarray]] = [[] for _ in names]
+        mask_chunks: List[List[Optional[np.ndarray]]] = [[] for _ in names]
+        while True:
+            if rows is None:
+                rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for i, values in enumerate(zip(*rows)):
+                array, mask = _column_chunk(values, dtypes[i], oids[i], cursor)
+                chunks[i].append(array)
+                mask_chunks[i].append(mask)
+            rows = None
+
+        columns, masks = [], []
+        for dtype, arrays, column_masks, is_utc in zip(dtypes, chunks, mask_chunks, utc):
+            if dtype.kind == "M" and any(array.dtype.kind == "O" for array in arrays):
+                # Some values had no datetime64 form: the whole column falls back to objects.
+                arrays = [_as_objects(array, is_utc) if array.dtype.kind == "M" else array for array in arrays]
+            if not arrays:
+                columns.append(np.empty(0, dtype=dtype))
+            else:
+                columns.append(np.concatenate(arrays) if len(arrays) > 1 else arrays[0])
+            if any(mask is not None for mask in column_masks):
+                masks.append(np.concatenate([
+                    mask if mask is not None else np.zeros(len(array), dtype=np.bool_)
+                    for mask, array in zip(column_masks, arrays)
+                ]))
+            else:
+                masks.append(None)
+        return cls(names, columns, masks, [name for name, is_utc in zip(names, utc) if is_utc])
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, row: int) -> RowView:
+        if row < 0:
+            row += self._length
+        if not 0 <= row < self._length:
+            raise IndexError("row index out of range")
+        return RowView(self, row)
+
+    def __iter__(self) -> Iterator[RowView]:
+        return (RowView(self, row) for row in range(self._length))
+
+    def column_index(self, name: str) -> int:
+        return self._index[name]
+
+    def column(self, name: str) -> np.ndarray:
+        """The column's array (no copy); see ``null_mask`` for NULLs in non-object columns."""
+        return self._columns[self._index[name]]
+
+    def null_mask(self, name: str) -> Optional[np.ndarray]:
+        """Boolean array marking NULLs, or None when the column has no mask."""
+        return self._masks[self._index[name]]
+
+    def value(self, row: int, column: int) -> Any:
+        """Python value of one cell, as psycopg2 would have returned it (timestamptz in UTC)."""
+        mask = self._masks[column]
+        if mask is not None and mask[row]:
+            return None
+        value = self._columns[column][row]
+        if isinstance(value, np.generic):
+            if isinstance(value, np.datetime64):
+                if np.isnat(value):
+                    return None
+                value = value.item()
+                return value.replace(tzinfo=timezone.utc) if self._utc[column] else value
+            value = value.item()
+        return value
+
+    def to_numpy(self) -> Dict[str, np.ndarray]:
+        """``{name: array}`` without copying."""
+        return dict(zip(self.names, self._columns))
+
+    def to_pandas(self):
+        """
+        DataFrame over the column arrays. Masked integer, float and boolean
+        columns become pandas nullable arrays sharing the same buffers, and
+        timestamptz columns are localized to UTC. Requires pandas.
+        """
+        try:
+            import pandas as pd
+        except ImportError as e:
+            raise ImportError("to_pandas() requires pandas (pip install pandas)") from e
+
+        data = {}
+        for name, array, mask, is_utc in zip(self.names, self._columns, self._masks, self._utc):
+            if mask is not None:
+                if array.dtype.kind == "b":
+                    array = pd.arrays.BooleanArray(array, mask)
+                elif array.dtype.kind == "f":
+                    array = pd.arrays.FloatingArray(array, mask)
+                else:
+                    array = pd.arrays.IntegerArray(array, mask)
+            series = pd.Series(array, copy=False)
+            if is_utc and series.dtype.kind == "M":
+                series = series.dt.tz_localize("UTC")
+            data[name] = series
+        return pd.DataFrame(data, copy=False)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Materialize the list-of-dicts form returned by ``execute_sql``."""
+        return [RowView(self, row).to_dict() for row in range(self._length)]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of the column and mask arrays (object arrays count their pointers only)."""
+        return sum(a.nbytes for a in self._columns) + sum(m.nbytes for m in self._masks if m is not None)
@@ -1,20 +1,309 @@
 import psycopg2
+import psycopg2.extensions
 from psycopg2.extras import RealDictCursor
+from pydantic import BaseModel, Field
+from collections import deque
 from contextlib import contextmanager
 from typing import Generator, Dict, Any, Optional
+import threading
+import time
 import logging
 from config.settings import DatabaseConfig
-from core.exceptions import ConnectionError, DatabaseError
+from core.exceptions import ConnectionError, DatabaseError, PoolTimeoutError
 
 logger = logging.getLogger(__name__)
 
 
+class PoolStats(BaseModel):
+    """Point-in-time snapshot of connection pool usage."""
+
+    size: int = Field(..., description="Open connections (in use + idle)")
+    in_use: int = Field(..., description="Connections currently checked out")
+    idle: int = Field(..., description="Connections waiting in the pool")
+    min_size: int = Field(..., description="Configured minimum pool size")
+    max_size: int = Field(..., description="Configured maximum pool size")
+    waiting: int = Field(..., description="Callers blocked waiting for a connection")
+    checkouts: int = Field(..., description="Total successful checkouts")
+    timeouts: int = Field(..., description="Checkouts that gave up waiting")
+    connections_created: int = Field(..., description="Connections opened over the pool lifetime")
+    connections_closed: int = Field(..., description="Connections closed over the pool lifetime")
+    failed_health_checks: int = Field(..., description="Checkouts that found a dead connection")
+    total_wait_time: float = Field(..., description="Seconds spent waiting for checkouts")
+    max_wait_time: float = Field(..., description="Longest single checkout wait in seconds")
+
+    @property
+    def avg_wait_time(self) -> float:
+        """Average checkout wait in seconds."""
+        return self.total_wait_time / self.checkouts if self.checkouts else 0.0
+
+
+class _PooledConnection:
+    """Bookkeeping wrapper around a raw connection held by the pool."""
+
+    __slots__ = ("connection", "created_at", "last_used")
+
+    def __init__(self, connection: psycopg2.extensions.connection):
+        now = time.monotonic()
+        self.connection = connection
+        self.created_at = now
+        self.last_used = now
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of autocommit psycopg2 connections.
+
+    Connections are opened lazily up to ``max_size``, health-checked on
+    checkout once they have been idle for ``check_interval`` seconds, recycled
+    after ``max_lifetime`` seconds and closed after ``max_idle`` seconds of
+    inactivity as long as at least ``min_size`` connections remain open.
+    """
+
+    def __init__(
+        self,
+        connect_params: Dict[str, Any],
+        min_size: int = 1,
+        max_size: int = 10,
+        max_lifetime: float = 1800.0,
+        max_idle: float = 300.0,
+        timeout: float = 30.0,
+        check_interval: float = 5.0,
+    ):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+        self._connect_params = dict(connect_params)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.check_interval = check_interval
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle: deque = deque()
+        self._in_use: Dict[int, _PooledConnection] = {}
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+
+        self._checkouts = 0
+        self._timeouts = 0
+        self._created = 0
+        self._closed_count = 0
+        self._failed_checks = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _connect(self) -> _PooledConnection:
+        connection = psycopg2.connect(**self._connect_params)
+        connection.autocommit = True
+        with self._cond:
+            self._created += 1
+        return _PooledConnection(connection)
+
+    @staticmethod
+    def _close_quietly(pooled: _PooledConnection) -> None:
+        try:
+            if not pooled.connection.closed:
+                pooled.connection.close()
+        except Exception as e:
+            logger.warning(f"Error closing pooled connection: {e}")
+
+    def _discard(self, pooled: _PooledConnection) -> None:
+        """Close a connection that has already been removed from the pool."""
+        self._close_quietly(pooled)
+        with self._cond:
+            self._size -= 1
+            self._closed_count += 1
+            self._cond.notify()
+
+    def _is_expired(self, pooled: _PooledConnection, now: float) -> bool:
+        return now - pooled.created_at >= self.max_lifetime
+
+    def _is_healthy(self, pooled: _PooledConnection, now: float) -> bool:
+        connection = pooled.connection
+        if connection.closed:
+            return False
+        if now - pooled.last_used < self.check_interval:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return True
+        except psycopg2.Error as e:
+            logger.debug(f"Pooled connection failed health check: {e}")
+            return False
+
+    def _evict_idle_locked(self, now: float) -> list:
+        """Pop idle connections past their idle or lifetime limits (lock held).
+
+        The returned connections are already removed from the size accounting
+        and only need closing, which callers do after releasing the lock.
+        """
+        evicted = []
+        # The deque is ordered oldest-returned first, so stale entries sit at the left.
+        while self._idle and self._size > self.min_size:
+            pooled = self._idle[0]
+            if now - pooled.last_used < self.max_idle and not self._is_expired(pooled, now):
+                break
+            evicted.append(self._idle.popleft())
+            self._size -= 1
+            self._closed_count += 1
+        return evicted
+
+    def open(self) -> None:
+        """Pre-open ``min_size`` connections."""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                pooled = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append(pooled)
+                self._cond.notify()
+
+    def getconn(self, timeout: Optional[float] = None) -> psycopg2.extensions.connection:
+        """Check out a healthy connection, waiting up to ``timeout`` seconds."""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        while True:
+            pooled = None
+            create = False
+            with self._cond:
+                if self._closed:
+                    raise ConnectionError("Connection pool is closed")
+                evicted = self._evict_idle_locked(time.monotonic())
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"Timed out after {timeout:.1f}s waiting for a database connection "
+                            f"(pool max_size={self.max_size})"
+                        )
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+                    if self._closed:
+                        raise ConnectionError("Connection pool is closed")
+                if self._idle:
+                    # Most recently returned first keeps the working set small
+                    # and lets the rest age out through idle eviction.
+                    pooled = self._idle.pop()
+                else:
+                    self._size += 1
+                    create = True
+
+            for stale in evicted:
+                self._close_quietly(stale)
+
+            if create:
+                try:
+                    pooled = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            else:
+                now = time.monotonic()
+                if self._is_expired(pooled, now) or not self._is_healthy(pooled, now):
+                    if not self._is_expired(pooled, now):
+                        with self._cond:
+                            self._failed_checks += 1
+                    self._discard(pooled)
+                    continue
+
+            waited = time.monotonic() - started
+            with self._cond:
+                self._in_use[id(pooled.connection)] = pooled
+                self._checkouts += 1
+                self._total_wait += waited
+                self._max_wait = max(self._max_wait, waited)
+            return pooled.connection
+
+    def putconn(self, connection: psycopg2.extensions.connection, discard: bool = False) -> None:
+        """Return a connection to the pool, resetting any session state."""
+        with self._cond:
+            pooled = self._in_use.pop(id(connection), None)
+        if pooled is None:
+            raise DatabaseError("Connection does not belong to this pool")
+
+        if not discard and not connection.closed:
+            try:
+                status = connection.get_transaction_status()
+                if status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+                connection.autocommit = True
+                connection.cursor_factory = None
+            except psycopg2.Error as e:
+                logger.debug(f"Discarding connection that failed to reset: {e}")
+                discard = True
+
+        now = time.monotonic()
+        if discard or connection.closed or self._is_expired(pooled, now):
+            self._discard(pooled)
+            return
+
+        pooled.last_used = now
+        with self._cond:
+            if self._closed:
+                close_now = True
+            else:
+                close_now = False
+                self._idle.append(pooled)
+                self._cond.notify()
+        if close_now:
+            self._discard(pooled)
+
+    def close(self) -> None:
+        """Close idle connections and refuse further checkouts."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for pooled in idle:
+            self._discard(pooled)
+
+    def stats(self) -> PoolStats:
+        """Return a snapshot of pool usage counters."""
+        with self._cond:
+            return PoolStats(
+                size=self._size,
+                in_use=len(self._in_use),
+                idle=len(self._idle),
+                min_size=self.min_size,
+                max_size=self.max_size,
+                waiting=self._waiting,
+                checkouts=self._checkouts,
+                timeouts=self._timeouts,
+                connections_created=self._created,
+                connections_closed=self._closed_count,
+                failed_health_checks=self._failed_checks,
+                total_wait_time=self._total_wait,
+                max_wait_time=self._max_wait,
+            )
+
+
 class DatabaseConnection:
-    """Database connection manager with optional RealDictCursor."""
-    
+    """Database connection manager backed by a connection pool, with optional RealDictCursor."""
+
     def __init__(self, config: DatabaseConfig):
         self.config = config
         self._base_params = self._build_base_params()
+        self._pool: Optional[ConnectionPool] = None
+        self._pool_lock = threading.Lock()
 
     def _build_base_params(self) -> Dict[str, Any]:
         """Base connection parameters without cursor_factory."""
@@ -28,32 +317,68 @@ class DatabaseConnection:
             'connect_timeout': 10,
         }
 
+    @property
+    def pool(self) -> ConnectionPool:
+        """Connection pool, created and warmed up on first use."""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    logger.debug(f"Creating connection pool for {self.config.host}:{self.config.port}/{self.config.database}")
+                    pool = ConnectionPool(
+                        self._base_params,
+                        min_size=self.config.pool_min_size,
+                        max_size=self.config.pool_max_size,
+                        max_lifetime=self.config.pool_max_lifetime,
+                        max_idle=self.config.pool_max_idle,
+                        timeout=self.config.pool_timeout,
+                        check_interval=self.config.pool_check_interval,
+                    )
+                    pool.open()
+                    self._pool = pool
+        return self._pool
+
     @contextmanager
     def get_connection(self, use_real_dict_cursor: bool = True) -> Generator[psycopg2.extensions.connection, None, None]:
-        """Context manager for database connections with optional RealDictCursor."""
+        """Context manager that checks a pooled connection out with optional RealDictCursor."""
+        pool = None
         connection = None
+        discard = False
         try:
-            params = dict(self._base_params)
-            if use_real_dict_cursor:
-                params['cursor_factory'] = RealDictCursor
-
-            logger.debug(f"Connecting to database: {self.config.host}:{self.config.port}/{self.config.database}")
-            connection = psycopg2.connect(**params)
-            connection.autocommit = True
+            pool = self.pool
+            connection = pool.getconn()
+            connection.cursor_factory = RealDictCursor if use_real_dict_cursor else None
             yield connection
+        except PoolTimeoutError as e:
+            logger.error(f"Database connection pool exhausted: {e}")
+            raise
         except psycopg2.Error as e:
+            discard = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
             logger.error(f"Database connection failed: {e}")
             raise ConnectionError(f"Failed to connect to database: {e}") from e
+        except DatabaseError:
+            raise
         except Exception as e:
             logger.error(f"Unexpected error during database connection: {e}")
             raise DatabaseError(f"Unexpected database error: {e}") from e
         finally:
-            if connection:
+            if connection is not None:
                 try:
-                    connection.close()
-                    logger.debug("Database connection closed")
+                    pool.putconn(connection, discard=discard)
+                    logger.debug("Database connection returned to pool")
                 except Exception as e:
-                    logger.warning(f"Error closing database connection: {e}")
+                    logger.warning(f"Error returning database connection to pool: {e}")
+
+    def pool_stats(self) -> PoolStats:
+        """Current connection pool statistics."""
+        return self.pool.stats()
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+            logger.debug("Database connection pool closed")
 
     def test_connection(self) -> bool:
         """Test database connection."""
@@ -64,4 +389,4 @@ class DatabaseConnection:
                     return True
         except Exception as e:
             logger.error(f"Connection test failed: {e}")
-            return False
\ No newline at end of file
+            return False
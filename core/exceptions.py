@@ -10,4 +10,49 @@ class ConnectionError(DatabaseError):
 
 class SchemaExtractionError(DatabaseError):
     """Raised when schema extraction fails."""
-    pass
\ No newline at end of file
+    pass
+
+
+class SchemaSnapshotError(Exception):
+    """Raised when a schema snapshot file cannot be written or read."""
+    pass
+
+class PoolTimeoutError(ConnectionError):
+    """Raised when no pooled connection becomes available in time."""
+    pass
+
+
+class QueryTimeoutError(DatabaseError):
+    """Raised when a query is cancelled for exceeding its timeout or deadline."""
+    pass
+
+
+class QueryCancelledError(DatabaseError):
+    """Raised when a running query is cancelled, e.g. by Ctrl-C."""
+    pass
+
+
+class QueryRejectedError(DatabaseError):
+    """Raised when generated SQL is refused before it reaches the database."""
+
+    def __init__(self, message: str, reasons: list = None):
+        super().__init__(message)
+        self.reasons = reasons or []
+
+
+class LLMError(Exception):
+    """Base exception for LLM endpoint calls."""
+    pass
+
+
+class LLMRequestError(LLMError):
+    """Raised when the LLM endpoint rejects a request or keeps failing."""
+
+    def __init__(self, message: str, status_code: int = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CircuitOpenError(LLMError):
+    """Raised when the circuit breaker is open and calls are short-circuited."""
+    pass
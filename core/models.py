@@ -1,5 +1,6 @@
-from typing import Dict, List, Optional
-from pydantic import BaseModel, Field
+from collections.abc import MutableMapping
+from typing import Callable, Dict, Iterator, List, Optional
+from pydantic import BaseModel, Field, field_serializer
 from datetime import datetime
 
 class ForeignKeyInfo(BaseModel):
@@ -24,6 +25,8 @@ class IndexInfo(BaseModel):
     is_primary: bool = Field(default=False, description="Whether index is primary key")
     columns: List[str] = Field(default_factory=list, description="Columns in the index")
     index_type: str = Field(default="btree", description="Index type (btree, hash, etc.)")
+    predicate: Optional[str] = Field(None, description="WHERE clause of a partial index")
+    include_columns: List[str] = Field(default_factory=list, description="Non-key INCLUDE columns")
 
 class CheckConstraintInfo(BaseModel):
     """Model for check constraint information."""
@@ -77,10 +80,76 @@ class TableInfo(BaseModel):
                 return fk
         return None
 
+class LazyTableMapping(MutableMapping):
+    """
+    ``{full name: TableInfo}`` whose tables are built by ``loader`` on first
+    access and then cached. The directory of keys (with each table's schema
+    name) is known up front, so ``len``, membership, key iteration and
+    per-schema lookups decode nothing; ``values()``/``items()`` decode every
+    table they reach.
+    """
+
+    def __init__(self, schema_names: Dict[str, str], loader: Callable[[str], TableInfo]):
+        self._schema_names = schema_names
+        self._loader = loader
+        self._tables: Dict[str, TableInfo] = {}
+
+    def __getitem__(self, key: str) -> TableInfo:
+        table = self._tables.get(key)
+        if table is None:
+            if key not in self._schema_names:
+                raise KeyError(key)
+            table = self._tables.setdefault(key, self._loader(key))
+        return table
+
+    def __setitem__(self, key: str, table: TableInfo):
+        self._schema_names[key] = table.schema_name
+        self._tables[key] = table
+
+    def __delitem__(self, key: str):
+        del self._schema_names[key]
+        self._tables.pop(key, None)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._schema_names)
+
+    def __len__(self) -> int:
+        return len(self._schema_names)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._schema_names
+
+    def keys_in_schema(self, schema_name: str) -> List[str]:
+        """Keys of the tables in ``schema_name``, without decoding them."""
+        return [key for key, name in self._schema_names.items() if name == schema_name]
+
+    @property
+    def loaded(self) -> int:
+        """Number of tables decoded so far."""
+        return len(self._tables)
+
+    def __reduce__(self):
+        # Pickle and deepcopy as a plain dict: the loader may hold an open file.
+        return dict, (dict(self.items()),)
+
+    def __repr__(self) -> str:
+        return f"LazyTableMapping({len(self)} tables, {self.loaded} loaded)"
+
+
 class DatabaseSchema(BaseModel):
     """Model for complete database schema."""
     tables: Dict[str, TableInfo] = Field(default_factory=dict, description="Dictionary of tables")
     extracted_at: datetime = Field(default_factory=datetime.now, description="Extraction timestamp")
+
+    @classmethod
+    def lazy(cls, schema_names: Dict[str, str], loader: Callable[[str], TableInfo],
+             extracted_at: datetime) -> "DatabaseSchema":
+        """Schema over a LazyTableMapping: tables are built by ``loader`` when first accessed."""
+        return cls.model_construct(tables=LazyTableMapping(schema_names, loader), extracted_at=extracted_at)
+
+    @field_serializer("tables", mode="wrap")
+    def _serialize_tables(self, tables, handler):
+        return handler(dict(tables.items()) if isinstance(tables, LazyTableMapping) else tables)
     
     def get_table(self, schema_name: str, table_name: str) -> Optional[TableInfo]:
         """Get table by schema and table name."""
@@ -89,6 +158,8 @@ class DatabaseSchema(BaseModel):
     
     def get_tables_in_schema(self, schema_name: str) -> List[TableInfo]:
         """Get all tables in a specific schema."""
+        if isinstance(self.tables, LazyTableMapping):
+            return [self.tables[key] for key in self.tables.keys_in_schema(schema_name)]
         return [
             table for table in self.tables.values()
             if table.schema_name == schema_name
@@ -124,4 +195,59 @@ class DatabaseSchema(BaseModel):
         return {
             "references_to": references_to,
             "referenced_by": referenced_by
-        }
\ No newline at end of file
+        }
+
+
+class ColumnStatistics(BaseModel):
+    """Planner statistics for one column (from pg_stats)."""
+
+    column_name: str = Field(..., description="Column name")
+    null_frac: Optional[float] = Field(None, description="Fraction of NULL values")
+    n_distinct: Optional[float] = Field(None, description="Distinct values; negative means a fraction of rows")
+    avg_width: Optional[int] = Field(None, description="Average stored width in bytes")
+    estimated_bytes: Optional[int] = Field(None, description="avg_width x estimated rows")
+    most_common_values: List[str] = Field(default_factory=list, description="Most common values (truncated)")
+    most_common_freqs: List[float] = Field(default_factory=list, description="Frequencies of most_common_values")
+
+    def distinct_estimate(self, row_estimate: Optional[float]) -> Optional[float]:
+        """Absolute distinct-value estimate."""
+        if self.n_distinct is None:
+            return None
+        if self.n_distinct >= 0:
+            return self.n_distinct
+        return -self.n_distinct * row_estimate if row_estimate is not None else None
+
+
+class TableStatistics(BaseModel):
+    """Planner statistics and size estimates for one table."""
+
+    schema_name: str = Field(..., description="Schema name")
+    table_name: str = Field(..., description="Table name")
+    row_estimate: Optional[float] = Field(None, description="pg_class.reltuples; None if never analyzed")
+    relpages: int = Field(default=0, description="pg_class.relpages")
+    table_bytes: int = Field(default=0, description="Heap plus TOAST size")
+    index_bytes: int = Field(default=0, description="Size of all indexes")
+    total_bytes: int = Field(default=0, description="Total relation size")
+    last_analyzed: Optional[datetime] = Field(None, description="Last manual or auto ANALYZE")
+    columns: Dict[str, ColumnStatistics] = Field(default_factory=dict, description="Column statistics by name")
+
+    @property
+    def full_name(self) -> str:
+        """Get fully qualified table name."""
+        return f"{self.schema_name}.{self.table_name}"
+
+
+class DatabaseStatistics(BaseModel):
+    """Snapshot of table and column statistics, refreshed independently of the schema."""
+    tables: Dict[str, TableStatistics] = Field(default_factory=dict, description="Table statistics by full name")
+    collected_at: datetime = Field(default_factory=datetime.now, description="Collection timestamp")
+
+    def row_estimate(self, table_full_name: str) -> Optional[float]:
+        """Estimated row count of a table, or None if unknown."""
+        table = self.tables.get(table_full_name)
+        return table.row_estimate if table else None
+
+    def large_tables(self, min_rows: float) -> List[TableStatistics]:
+        """Tables estimated to hold at least ``min_rows`` rows, largest first."""
+        tables = [t for t in self.tables.values() if t.row_estimate is not None and t.row_estimate >= min_rows]
+        return sorted(tables, key=lambda t: t.row_estimate, reverse=True)
@@ -0,0 +1,65 @@
+# export_query.py
+import argparse
+import logging
+import sys
+
+from config.settings import settings
+from core.database import DatabaseConnection
+from services.exporter import FORMATS, export_query
+from utils.text import format_count
+
+
+def _progress(rows: int, size: int):
+    print(f"\r[*] {format_count(rows)} rows, {size / 2**20:,.1f} MiB", end="", file=sys.stderr, flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export a question's (or a SELECT's) full result to CSV/TSV with COPY, streamed to a file."
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("question", nargs="?", help="Question to generate SQL for")
+    source.add_argument("--sql", help="Export this SELECT instead of generating one (skips guardrails)")
+    parser.add_argument("-o", "--output", required=True,
+                        help="Output file, or - for stdout; a .gz suffix enables gzip, .tsv selects TSV")
+    parser.add_argument("--format", choices=FORMATS, help="Defaults to the output suffix, else csv")
+    parser.add_argument("--gzip", action="store_true", help="Compress even without a .gz suffix")
+    parser.add_argument("--no-header", action="store_true", help="Omit the column-name header row")
+    parser.add_argument("--timeout", type=float, default=settings.background_query_timeout,
+                        help="Seconds before the export is cancelled (0 for none)")
+    parser.add_argument("--schema-json", default="data/llm_schema.json")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=settings.log_level, format=settings.log_format)
+    suffixes = args.output.lower().split(".")[1:]
+    compress = args.gzip or suffixes[-1:] == ["gz"]
+    fmt = args.format or ("tsv" if "tsv" in suffixes else "csv")
+
+    sql = args.sql
+    if sql is None:
+        # Imported here so --sql exports work without an LLM configured.
+        from LLMs.generate_sql import call_gpt_generate_sql
+        from services.guardrails import enforce_guardrails
+
+        sql = call_gpt_generate_sql(args.question, args.schema_json)
+        print(f"[*] SQL: {sql}", file=sys.stderr)
+        enforce_guardrails(sql, args.schema_json)
+
+    db = DatabaseConnection(config=settings.database_config)
+    destination = sys.stdout.buffer if args.output == "-" else args.output
+    try:
+        result = export_query(sql, db, destination, fmt=fmt, header=not args.no_header, compress=compress,
+                              progress=_progress, timeout=args.timeout or None)
+    except KeyboardInterrupt:
+        print("\n[!] Export cancelled.", file=sys.stderr)
+        sys.exit(130)
+    finally:
+        db.close()
+
+    size = f", {result.file_bytes / 2**20:,.1f} MiB on disk" if result.file_bytes is not None else ""
+    print(f"\n[✓] Exported {result.rows:,} rows ({result.bytes / 2**20:,.1f} MiB {fmt}{size}) "
+          f"in {result.elapsed_seconds:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
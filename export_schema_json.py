@@ -1,6 +1,6 @@
 # export_schema_json.py
 import json
-from utils.schema_io import load_schema
+from utils.schema_io import DEFAULT_SCHEMA_PATH, load_schema
 
 def schema_to_json(schema) -> dict:
     return {
@@ -32,8 +32,8 @@ def schema_to_json(schema) -> dict:
         }
     }
 
-def export_schema_to_json(pkl_path="metadata/database_schema.pkl", json_path="metadata/schema.json"):
-    schema = load_schema(pkl_path)
+def export_schema_to_json(schema_path=DEFAULT_SCHEMA_PATH, json_path="metadata/schema.json"):
+    schema = load_schema(schema_path)
     data = schema_to_json(schema)
 
     with open(json_path, "w") as f:
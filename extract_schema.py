@@ -1,15 +1,68 @@
+import argparse
+import time
+from pathlib import Path
+
 from config.settings import settings
 from core.database import DatabaseConnection
-from services.schema_extractor import SchemaExtractor
-from utils.schema_io import save_schema
+from services.schema_extractor import BACKENDS, SchemaExtractor
+from services.stats_collector import StatisticsCollector
+from utils.schema_io import (
+    DEFAULT_SCHEMA_PATH, fingerprint_path, load_fingerprints, load_schema, save_fingerprints, save_schema,
+    save_statistics, statistics_path,
+)
 
 from pprint import pprint
 
+parser = argparse.ArgumentParser(description="Extract the database schema into metadata/.")
+parser.add_argument("--incremental", action="store_true",
+                    help="Refetch only tables whose catalog fingerprint changed since the last run")
+parser.add_argument("--backend", choices=BACKENDS, default="pg_catalog")
+parser.add_argument("--schemas", nargs="+", help="Only extract these schemas")
+parser.add_argument("--workers", type=int, default=1,
+                    help="Extract schemas concurrently on up to this many pooled connections")
+parser.add_argument("--output", default=DEFAULT_SCHEMA_PATH,
+                    help="Schema file; a .pkl path writes the legacy pickle format")
+parser.add_argument("--stats", action="store_true",
+                    help="Also refresh the statistics snapshot saved next to --output (<output>.stats.json); "
+                         "see collect_stats.py")
+args = parser.parse_args()
+
 db = DatabaseConnection(settings.database_config)
-extractor = SchemaExtractor(db)
+extractor = SchemaExtractor(db, backend=args.backend)
+sidecar = fingerprint_path(args.output)
+fingerprints, full_seconds = load_fingerprints(sidecar)
+
+if args.incremental and fingerprints and Path(args.output).exists():
+    previous = load_schema(args.output)
+    schema, fingerprints, report = extractor.extract_incremental(
+        previous, fingerprints, schemas=args.schemas, full_extraction_seconds=full_seconds
+    )
+    print(f"[*] {len(report.added)} added, {len(report.changed)} changed, "
+          f"{len(report.removed)} removed, {report.unchanged} unchanged")
+    for label, keys in (("+", report.added), ("~", report.changed), ("-", report.removed)):
+        for key in keys:
+            print(f"    {label} {key}")
+    saved = report.time_saved_seconds
+    print(f"[*] Took {report.elapsed_seconds:.2f}s"
+          + (f", {saved:.2f}s less than the last full extraction ({full_seconds:.2f}s)" if saved is not None else ""))
+else:
+    if args.incremental:
+        print("[!] No previous snapshot with fingerprints; running a full extraction.")
+        if Path(args.output).with_suffix(".pkl").exists() and not Path(args.output).exists():
+            print("[!] Found a pickled schema; python migrate_schema.py converts it for incremental runs.")
+    started = time.perf_counter()
+    # Fingerprint first: a table altered mid-extraction is then refetched next time.
+    fingerprints = {key: fp for key, (_, fp) in extractor.fingerprint_tables(args.schemas).items()}
+    schema = extractor.extract_schema(args.schemas, max_workers=args.workers)
+    full_seconds = time.perf_counter() - started
+    pprint(schema.dict(), indent=2)
+    print(f"[*] Full extraction of {len(schema.tables)} tables took {full_seconds:.2f}s")
 
-schema = extractor.extract_schema()
-pprint(schema.dict(), indent=2)
-save_schema(schema, "metadata/database_schema.pkl")
+save_schema(schema, args.output)
+save_fingerprints(sidecar, fingerprints, full_seconds)
+if args.stats:
+    statistics = StatisticsCollector(db).collect(args.schemas)
+    save_statistics(statistics, statistics_path(args.output))
+    print(f"[*] Collected statistics for {len(statistics.tables)} tables")
 
-print("✅ Schema extracted and saved.")
\ No newline at end of file
+print("✅ Schema extracted and saved.")
@@ -1,13 +1,9 @@
 # modules/format_schema.py
 
-import pickle
 import json
 from pathlib import Path
 from core.models import DatabaseSchema
-
-def load_schema_from_pickle(pickle_path: str) -> DatabaseSchema:
-    with open(pickle_path, 'rb') as f:
-        return pickle.load(f)
+from utils.schema_io import DEFAULT_SCHEMA_PATH, load_schema
 
 def format_schema_to_json(schema: DatabaseSchema) -> dict:
     structured = {}
@@ -36,6 +32,25 @@ def format_schema_to_json(schema: DatabaseSchema) -> dict:
             }
             structured[schema_name]["tables"][table_name]["columns"].append(column_data)
 
+        # Compact index list: primary keys are already flagged per column,
+        # and default-valued keys (btree, non-unique, no predicate) are omitted.
+        indexes = []
+        for index in table_info.indexes:
+            if index.is_primary:
+                continue
+            index_data = {"name": index.index_name, "columns": index.columns}
+            if index.is_unique:
+                index_data["unique"] = True
+            if index.index_type != "btree":
+                index_data["method"] = index.index_type
+            if index.include_columns:
+                index_data["include"] = index.include_columns
+            if index.predicate:
+                index_data["where"] = index.predicate
+            indexes.append(index_data)
+        if indexes:
+            structured[schema_name]["tables"][table_name]["indexes"] = indexes
+
     return {"schemas": structured}
 
 def save_json(data: dict, filepath: str):
@@ -44,9 +59,8 @@ def save_json(data: dict, filepath: str):
     print(f"✅ LLM-ready schema saved to {filepath}")
 
 if __name__ == "__main__":
-    pickle_path = "metadata/database_schema.pkl"
     output_path = "data/llm_schema.json"
 
-    schema = load_schema_from_pickle(pickle_path)
+    schema = load_schema(DEFAULT_SCHEMA_PATH)
     json_data = format_schema_to_json(schema)
     save_json(json_data, output_path)
@@ -1,26 +1,65 @@
 
 # from modules.embedding_preparation import EmbeddingPreparer
+# from modules.embedder import Embedder
 
 # if __name__ == "__main__":
 #     base_dir = "data"
 #     preparer = EmbeddingPreparer(base_dir)
 #     preparer.run()
+#     Embedder(base_dir).run()
 
 
 # main.py
+from concurrent.futures import ThreadPoolExecutor
+
 from LLMs.generate_sql import call_gpt_generate_sql
-from services.query_executor import execute_sql
+from services.cost_gate import ROW_RETURNING, CostGate
+from services.guardrails import enforce_guardrails
+from services.query_executor import enable_interrupt_cancel, execute_sql, stream_sql
 from core.database import DatabaseConnection
 from config.settings import settings
+from utils.sql_fingerprint import normalize_sql
+
+
+def report_background(pending):
+    """Print the results of finished background queries; return the ones still running."""
+    running = []
+    for question, future in pending:
+        if not future.done():
+            running.append((question, future))
+            continue
+        print(f"\n Background query finished: {question}")
+        try:
+            rows = future.result()
+        except Exception as e:
+            print(f" Error: {e}")
+            continue
+        for row in rows:
+            print(row)
+        print(f" ({len(rows)} rows)")
+    return running
+
 
 def main():
     db = DatabaseConnection(config=settings.database_config)
+    cost_gate = CostGate(db)
+    # Statements the cost gate sends to the background run here, one at a
+    # time, while the prompt stays available; results print when done.
+    background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-background")
+    pending = []
+    # Ctrl-C cancels the running query on the server and returns to the prompt.
+    enable_interrupt_cancel()
     print(" Ask questions about your database. Type 'exit' or 'quit' to stop.\n")
 
     while True:
+        pending = report_background(pending)
         user_input = input("Ask your question: ").strip()
 
         if user_input.lower() in ("exit", "quit"):
+            if pending:
+                print(f" Waiting for {len(pending)} background queries...")
+            background.shutdown(wait=True)
+            report_background(pending)
             print("👋 Exiting. Goodbye!")
             break
 
@@ -29,16 +68,39 @@ def main():
             sql = call_gpt_generate_sql(user_input, "data/llm_schema.json")
             print(" SQL Generated:")
             print(sql)
+            enforce_guardrails(sql, "data/llm_schema.json")
+            decision = cost_gate.enforce(sql)
+            if decision.reason:
+                print(f" Cost gate ({decision.action}): {decision.reason}")
+            sql = decision.sql
 
-            print("\n Executing SQL on PostgreSQL...")
-            results = execute_sql(sql, db)
+            if decision.background:
+                future = background.submit(execute_sql, sql, db, timeout=settings.background_query_timeout or None)
+                pending.append((user_input, future))
+                print(" Running in the background; results will be shown when it finishes.")
+                continue
 
+            print("\n Executing SQL on PostgreSQL...")
             print(" Results:")
-            for row in results:
+            timeout = settings.query_timeout or None
+            # Named cursors only take row-returning queries; anything else
+            # (INSERT/UPDATE/DDL asked for explicitly) runs directly.
+            if ROW_RETURNING.match(normalize_sql(sql)):
+                rows = stream_sql(sql, db, timeout=timeout)
+            else:
+                rows = execute_sql(sql, db, timeout=timeout)
+            row_count = 0
+            for row in rows:
                 print(row)
+                row_count += 1
+            print(f" ({row_count} rows)")
 
+        except KeyboardInterrupt:
+            print("\n Cancelled.")
         except Exception as e:
             print(f" Error: {e}")
 
+    db.close()
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,50 @@
+# migrate_schema.py
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+from utils.schema_io import load_schema, save_schema
+from utils.schema_snapshot import is_snapshot
+
+parser = argparse.ArgumentParser(
+    description="Convert pickled schema files (.pkl) to the binary snapshot format (.snap). "
+                "Each snapshot is read back and compared with the pickle before it is kept."
+)
+parser.add_argument("inputs", nargs="*", default=["metadata/database_schema.pkl"], help="Pickled schema files")
+parser.add_argument("--output", help="Snapshot path (single input only); defaults to the input with a .snap suffix")
+parser.add_argument("--remove-pickle", action="store_true", help="Delete each pickle after a verified migration")
+args = parser.parse_args()
+
+if args.output and len(args.inputs) > 1:
+    parser.error("--output needs exactly one input")
+
+failed = 0
+for source in args.inputs:
+    target = args.output or str(Path(source).with_suffix(".snap"))
+    if not Path(source).exists():
+        print(f"[!] {source}: not found")
+        failed += 1
+        continue
+    if is_snapshot(source):
+        print(f"[*] {source}: already a snapshot")
+        continue
+
+    started = time.perf_counter()
+    schema = load_schema(source)
+    save_schema(schema, target)
+    if load_schema(target).model_dump() != schema.model_dump():
+        os.remove(target)
+        print(f"[!] {source}: snapshot does not round-trip; kept the pickle only")
+        failed += 1
+        continue
+
+    print(f"[✓] {source} -> {target}: {len(schema.tables)} tables, "
+          f"{os.path.getsize(source) / 2**20:,.1f} MiB -> {os.path.getsize(target) / 2**20:,.1f} MiB "
+          f"in {time.perf_counter() - started:.2f}s")
+    if args.remove_pickle:
+        os.remove(source)
+        print(f"    removed {source}")
+
+sys.exit(1 if failed else 0)
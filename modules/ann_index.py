@@ -0,0 +1,214 @@
+# modules/ann_index.py
+
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from modules.embedder import Embedder
+from modules.vector_search import VectorIndex, top_k_indices
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def train_centroids(sample: np.ndarray, n_lists: int, n_iter: int = 20, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on a sample of unit vectors; returns unit centroids."""
+    rng = np.random.default_rng(seed)
+    sample = _normalize(np.asarray(sample, dtype=np.float32))
+    n_lists = min(n_lists, len(sample))
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+
+    for _ in range(n_iter):
+        assignments = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        counts = np.bincount(assignments, minlength=n_lists)
+        empty = counts == 0
+        if empty.any():
+            # Re-seed empty lists with random points so every list stays in use.
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class IVFIndex:
+    """
+    Inverted-file ANN index over the chunk vectors. Vectors are clustered
+    around k-means centroids and stored grouped by list, so a query scores
+    the centroids and then only the contiguous slices of the ``n_probe``
+    closest lists. Larger ``n_probe`` trades latency for recall.
+    """
+
+    def __init__(self, centroids: np.ndarray, offsets: np.ndarray, row_ids: np.ndarray,
+                 list_vectors: np.ndarray, n_probe: int = 8):
+        self.centroids = centroids
+        self.offsets = offsets
+        self.row_ids = row_ids
+        self.list_vectors = list_vectors
+        self.n_probe = n_probe
+
+    @property
+    def n_lists(self) -> int:
+        return self.centroids.shape[0]
+
+    def __len__(self) -> int:
+        return self.row_ids.shape[0]
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, path=None, n_lists: Optional[int] = None, n_iter: int = 20,
+              sample_size: int = 100_000, n_probe: int = 8, seed: int = 0,
+              block_size: int = 65536) -> "IVFIndex":
+        """
+        Cluster ``vectors`` (e.g. the Embedder's memory-mapped matrix) and
+        build the inverted lists. With ``path`` the grouped vectors are
+        written straight to disk in blocks and the index is returned
+        memory-mapped; otherwise it is built in memory.
+        """
+        n, dim = vectors.shape
+        if n == 0:
+            raise ValueError("Cannot build an IVF index over an empty vector matrix")
+        n_lists = n_lists or max(1, int(round(4 * np.sqrt(n))))
+        rng = np.random.default_rng(seed)
+        sample_rows = np.sort(rng.choice(n, min(n, max(sample_size, n_lists)), replace=False))
+        centroids = train_centroids(vectors[sample_rows], n_lists, n_iter=n_iter, seed=seed)
+
+        assignments = np.empty(n, dtype=np.int32)
+        for start in range(0, n, block_size):
+            block = _normalize(np.asarray(vectors[start:start + block_size], dtype=np.float32))
+            assignments[start:start + block_size] = np.argmax(block @ centroids.T, axis=1)
+
+        row_ids = np.argsort(assignments, kind="stable").astype(np.int64)
+        counts = np.bincount(assignments, minlength=len(centroids))
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+        if path is not None:
+            path = Path(path)
+            path.mkdir(parents=True, exist_ok=True)
+            list_vectors = np.lib.format.open_memmap(path / 'vectors.npy', mode='w+', dtype=np.float32, shape=(n, dim))
+        else:
+            list_vectors = np.empty((n, dim), dtype=np.float32)
+        for start in range(0, n, block_size):
+            rows = row_ids[start:start + block_size]
+            list_vectors[start:start + len(rows)] = _normalize(np.asarray(vectors[rows], dtype=np.float32))
+
+        index = cls(centroids, offsets, row_ids, list_vectors, n_probe=n_probe)
+        if path is not None:
+            list_vectors.flush()
+            del list_vectors
+            index.list_vectors = None
+            index.save(path, include_vectors=False)
+            return cls.load(path, n_probe=n_probe)
+        return index
+
+    def save(self, path, include_vectors: bool = True):
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        np.save(path / 'centroids.npy', self.centroids)
+        np.save(path / 'offsets.npy', self.offsets)
+        np.save(path / 'row_ids.npy', self.row_ids)
+        if include_vectors:
+            np.save(path / 'vectors.npy', self.list_vectors)
+        info = {
+            "type": "ivf",
+            "n_lists": int(self.n_lists),
+            "count": int(len(self)),
+            "dim": int(self.centroids.shape[1]),
+            "n_probe": self.n_probe,
+            "created_at": datetime.now().isoformat(),
+        }
+        with open(path / 'ivf.json', 'w') as f:
+            json.dump(info, f, indent=2)
+
+    @classmethod
+    def load(cls, path, n_probe: Optional[int] = None, mmap: bool = True) -> "IVFIndex":
+        path = Path(path)
+        with open(path / 'ivf.json', 'r') as f:
+            info = json.load(f)
+        return cls(
+            centroids=np.load(path / 'centroids.npy'),
+            offsets=np.load(path / 'offsets.npy'),
+            row_ids=np.load(path / 'row_ids.npy', mmap_mode='r' if mmap else None),
+            list_vectors=np.load(path / 'vectors.npy', mmap_mode='r' if mmap else None),
+            n_probe=n_probe or info.get("n_probe", 8),
+        )
+
+    def search_indices(self, queries: np.ndarray, k: int = 5,
+                       n_probe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-k for a (n_queries, dim) batch. Returns (rows, scores)
+        with rows being ``embedding_index`` values, padded with -1 / -inf when
+        the probed lists hold fewer than k vectors.
+        """
+        queries = _normalize(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        probes = top_k_indices(queries @ self.centroids.T, n_probe)
+
+        rows = np.full((len(queries), k), -1, dtype=np.int64)
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for qi, lists in enumerate(probes):
+            slices = [(self.offsets[li], self.offsets[li + 1]) for li in lists if self.offsets[li + 1] > self.offsets[li]]
+            if not slices:
+                continue
+            block = np.concatenate([self.list_vectors[start:end] for start, end in slices])
+            positions = np.concatenate([np.arange(start, end) for start, end in slices])
+            block_scores = block @ queries[qi]
+            best = top_k_indices(block_scores, k)
+            rows[qi, :len(best)] = self.row_ids[positions[best]]
+            scores[qi, :len(best)] = block_scores[best]
+        return rows, scores
+
+
+def build_ivf_index(base_dir, **build_kwargs) -> IVFIndex:
+    """Build and persist the IVF index for the Embedder's vectors under ``base_dir``."""
+    vectors = Embedder(base_dir).load_vectors(mmap=True)
+    return IVFIndex.build(vectors, path=Path(base_dir) / 'embedding_ivf', **build_kwargs)
+
+
+def recall_at_k(exact_rows: np.ndarray, approx_rows: np.ndarray) -> float:
+    """Fraction of the exact top-k rows that the approximate search returned."""
+    hits = sum(len(set(e.tolist()) & set(a.tolist())) for e, a in zip(exact_rows, approx_rows))
+    return hits / exact_rows.size if exact_rows.size else 1.0
+
+
+def _latency_ms(fn, queries: np.ndarray) -> Tuple[np.ndarray, List[float]]:
+    rows, latencies = [], []
+    for q in queries:
+        start = time.perf_counter()
+        result, _ = fn(q[None, :])
+        latencies.append((time.perf_counter() - start) * 1000)
+        rows.append(result[0])
+    return np.stack(rows), latencies
+
+
+def compare_with_exact(exact: VectorIndex, ann: IVFIndex, queries: np.ndarray, k: int = 10,
+                       n_probes: Sequence[int] = (1, 2, 4, 8, 16, 32)) -> List[Dict[str, float]]:
+    """
+    Per-query latency of exact search and of the IVF index at several
+    ``n_probe`` settings, with recall@k against the exact results.
+    """
+    exact_rows, exact_latencies = _latency_ms(lambda q: exact.search_indices(q, k), queries)
+    report = [{
+        "method": "exact",
+        "n_probe": 0,
+        "recall": 1.0,
+        "p50_ms": float(np.percentile(exact_latencies, 50)),
+        "p95_ms": float(np.percentile(exact_latencies, 95)),
+    }]
+    for n_probe in n_probes:
+        if n_probe > ann.n_lists:
+            break
+        approx_rows, latencies = _latency_ms(lambda q: ann.search_indices(q, k, n_probe=n_probe), queries)
+        report.append({
+            "method": "ivf",
+            "n_probe": n_probe,
+            "recall": recall_at_k(exact_rows, approx_rows),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p95_ms": float(np.percentile(latencies, 95)),
+        })
+    return report
@@ -0,0 +1,209 @@
+# modules/embedder.py
+
+import json
+import os
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from utils.text import tokenize
+
+
+class EmbeddingBackend:
+    """
+    Interface for embedding backends. Implementations turn a batch of texts
+    into a (len(texts), dim) float32 matrix with L2-normalised rows.
+    """
+
+    name = "base"
+    dim = 0
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        raise NotImplementedError
+
+    def config(self) -> dict:
+        """Settings recorded next to the vectors so queries use the same space."""
+        return {"name": self.name, "dim": self.dim}
+
+
+class HashingBackend(EmbeddingBackend):
+    """
+    Offline, stateless embedding via signed feature hashing of word terms and
+    character n-grams. Needs no vocabulary or network, so chunks can be
+    embedded independently in any order.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim: int = 512, ngram_min: int = 3, ngram_max: int = 4, ngram_weight: float = 0.5,
+                 cache_size: int = 100_000):
+        self.dim = dim
+        self.ngram_min = ngram_min
+        self.ngram_max = ngram_max
+        self.ngram_weight = ngram_weight
+        self.cache_size = cache_size
+        self._cache: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def config(self) -> dict:
+        return {
+            "name": self.name,
+            "dim": self.dim,
+            "ngram_min": self.ngram_min,
+            "ngram_max": self.ngram_max,
+            "ngram_weight": self.ngram_weight,
+        }
+
+    def _term_features(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Hashed (column, signed weight) pairs for a term and its n-grams."""
+        cached = self._cache.get(term)
+        if cached is not None:
+            return cached
+
+        features = [(term, 1.0)]
+        padded = f"<{term}>"
+        for n in range(self.ngram_min, self.ngram_max + 1):
+            for i in range(len(padded) - n + 1):
+                features.append(("#" + padded[i:i + n], self.ngram_weight))
+
+        cols = np.empty(len(features), dtype=np.int64)
+        values = np.empty(len(features), dtype=np.float32)
+        for j, (feature, weight) in enumerate(features):
+            # crc32 is stable across processes, unlike the built-in hash().
+            h = zlib.crc32(feature.encode("utf-8"))
+            cols[j] = h % self.dim
+            values[j] = weight if (h // self.dim) & 1 else -weight
+
+        # Column and table vocabularies repeat heavily across chunks, so a
+        # bounded per-term cache turns most hashing work into dict lookups.
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[term] = (cols, values)
+        return cols, values
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        rows, cols, values = [], [], []
+        for row, text in enumerate(texts):
+            for term in tokenize(text):
+                term_cols, term_values = self._term_features(term)
+                rows.append(np.full(len(term_cols), row, dtype=np.int64))
+                cols.append(term_cols)
+                values.append(term_values)
+
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        if rows:
+            np.add.at(matrix, (np.concatenate(rows), np.concatenate(cols)), np.concatenate(values))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+
+BACKENDS = {
+    HashingBackend.name: HashingBackend,
+}
+
+
+def backend_from_config(config: dict) -> EmbeddingBackend:
+    """Recreate the backend described by a vector file's recorded config."""
+    params = dict(config)
+    name = params.pop("name")
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {name}")
+    return BACKENDS[name](**params)
+
+
+class Embedder:
+    """
+    Embeds the chunks written by EmbeddingPreparer into a float32 matrix on
+    disk (``embedding_vectors.npy``) whose row i is the chunk with
+    ``embedding_index`` i. Chunks are streamed in batches, so memory use is
+    bounded by the batch size rather than the number of chunks.
+    """
+
+    def __init__(self, base_dir, backend: EmbeddingBackend = None, batch_size: int = 1024):
+        self.base_dir = Path(base_dir)
+        self.backend = backend or HashingBackend()
+        self.batch_size = batch_size
+        self.chunk_jsonl_path = self.base_dir / 'embedding_chunks.jsonl'
+        self.vectors_path = self.base_dir / 'embedding_vectors.npy'
+        self.info_path = self.base_dir / 'embedding_vectors.json'
+
+    def count_chunks(self) -> int:
+        with open(self.chunk_jsonl_path, 'r') as f:
+            return sum(1 for line in f if line.strip())
+
+    def iter_chunk_batches(self) -> Iterator[Tuple[List[int], List[str]]]:
+        """Yield (embedding indexes, texts) batches from the chunks file."""
+        ids, texts = [], []
+        with open(self.chunk_jsonl_path, 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                ids.append(record["id"])
+                texts.append(record["text"])
+                if len(ids) >= self.batch_size:
+                    yield ids, texts
+                    ids, texts = [], []
+        if ids:
+            yield ids, texts
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        return self.backend.embed(texts)
+
+    def save_info(self, count: int):
+        info = {
+            "backend": self.backend.config(),
+            "dim": self.backend.dim,
+            "count": count,
+            "dtype": "float32",
+            "normalized": True,
+            "created_at": datetime.now().isoformat(),
+        }
+        with open(self.info_path, 'w') as f:
+            json.dump(info, f, indent=2)
+
+    def load_info(self) -> dict:
+        with open(self.info_path, 'r') as f:
+            return json.load(f)
+
+    def load_vectors(self, mmap: bool = True) -> np.ndarray:
+        """Load the vector matrix, memory-mapped read-only by default."""
+        return np.load(self.vectors_path, mmap_mode='r' if mmap else None)
+
+    @classmethod
+    def from_saved(cls, base_dir, batch_size: int = 1024) -> "Embedder":
+        """Embedder using the backend the saved vectors were built with."""
+        embedder = cls(base_dir, batch_size=batch_size)
+        embedder.backend = backend_from_config(embedder.load_info()["backend"])
+        return embedder
+
+    def run(self):
+        print("[*] Counting chunks...")
+        count = self.count_chunks()
+
+        print(f"[*] Embedding {count} chunks with '{self.backend.name}' backend (dim={self.backend.dim})...")
+        tmp_path = self.vectors_path.with_suffix('.tmp.npy')
+        matrix = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32, shape=(count, self.backend.dim))
+        try:
+            written = 0
+            for ids, texts in self.iter_chunk_batches():
+                index = np.asarray(ids)
+                if index.min() < 0 or index.max() >= count:
+                    raise ValueError(f"Chunk id out of range for {count} chunks: {index.min()}..{index.max()}")
+                matrix[index] = self.embed_texts(texts)
+                written += len(ids)
+            matrix.flush()
+        except Exception:
+            del matrix
+            os.remove(tmp_path)
+            raise
+        del matrix
+        os.replace(tmp_path, self.vectors_path)
+
+        print("[*] Saving vector info...")
+        self.save_info(count)
+
+        print(f"[✓] Embedded {written} chunks into {self.vectors_path}.")
@@ -0,0 +1,288 @@
+# modules/schema_retriever.py
+
+import json
+import math
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from modules.embedding_preparation import EmbeddingPreparer
+from modules.vector_search import VectorIndex
+from utils.schema_io import DEFAULT_STATS_PATH, load_statistics
+from utils.text import format_count, tokenize
+
+LARGE_TABLE_ROWS = 1_000_000
+
+
+class SchemaRetriever:
+    """
+    Picks the tables relevant to a question from the embedding chunks and
+    renders them, plus their foreign-key neighbours, as a compact schema.
+    When up-to-date chunk vectors exist, the BM25 ranking is fused with a
+    vector search ranking (reciprocal rank fusion). Tables the statistics
+    snapshot estimates at ``large_table_rows`` or more are annotated with
+    their approximate row count.
+    """
+
+    def __init__(self, base_dir, schema_path: Optional[str] = None, top_k: int = 5,
+                 max_neighbours: int = 5, max_chars: int = 6000, k1: float = 1.2, b: float = 0.75,
+                 use_vectors: bool = True, rrf_k: int = 60, min_similarity: float = 0.2,
+                 stats_path: Optional[str] = DEFAULT_STATS_PATH, large_table_rows: int = LARGE_TABLE_ROWS):
+        self.preparer = EmbeddingPreparer(base_dir)
+        if schema_path:
+            self.preparer.schema_path = Path(schema_path)
+        self.top_k = top_k
+        self.max_neighbours = max_neighbours
+        self.max_chars = max_chars
+        self.k1 = k1
+        self.b = b
+        self.use_vectors = use_vectors
+        self.rrf_k = rrf_k
+        self.min_similarity = min_similarity
+        self.stats_path = Path(stats_path) if stats_path else None
+        self.large_table_rows = large_table_rows
+
+        self.tables: Dict[str, dict] = {}
+        self.table_ids: List[str] = []
+        self.neighbours: Dict[str, List[str]] = {}
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._idf: Dict[str, float] = {}
+        self._doc_lengths: List[int] = []
+        self._avg_length = 0.0
+        self.loaded_mtime = 0.0
+        self.stats_mtime = 0.0
+        self.row_estimates: Dict[str, float] = {}
+        self.vector_index: Optional[VectorIndex] = None
+        self._chunks_from_disk = False
+        self.load()
+
+    def _load_chunks_and_metadata(self, schema_data: dict) -> Tuple[List[str], List[dict]]:
+        """Use the preparer's saved outputs, regenerating them in memory if stale."""
+        paths = (self.preparer.chunk_jsonl_path, self.preparer.metadata_path)
+        schema_mtime = self.preparer.schema_path.stat().st_mtime
+        if all(p.exists() and p.stat().st_mtime >= schema_mtime for p in paths):
+            with open(self.preparer.metadata_path, 'r') as f:
+                metadata = json.load(f)
+            chunks = [""] * len(metadata)
+            with open(self.preparer.chunk_jsonl_path, 'r') as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        chunks[record["id"]] = record["text"]
+            self._chunks_from_disk = True
+            return chunks, metadata
+        self._chunks_from_disk = False
+        return self.preparer.extract_chunks_and_metadata(schema_data)
+
+    def _load_vector_index(self) -> Optional[VectorIndex]:
+        """Vector index over the saved chunks, if vectors were built from them."""
+        vectors_path = self.preparer.base_dir / 'embedding_vectors.npy'
+        if not (self.use_vectors and self._chunks_from_disk and vectors_path.exists()):
+            return None
+        if vectors_path.stat().st_mtime < self.preparer.chunk_jsonl_path.stat().st_mtime:
+            return None
+        try:
+            return VectorIndex.load(self.preparer.base_dir)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def load(self):
+        self.loaded_mtime = self.preparer.schema_path.stat().st_mtime
+        schema_data = self.preparer.load_schema()
+        chunks, metadata = self._load_chunks_and_metadata(schema_data)
+
+        self.tables = {}
+        for schema_name, schema in schema_data.get("schemas", {}).items():
+            for table_name, table_info in schema.get("tables", {}).items():
+                self.tables[f"{schema_name}.{table_name}"] = table_info
+
+        # Document i of the index is the chunk at embedding_index i.
+        self.table_ids = [""] * len(metadata)
+        for meta in metadata:
+            self.table_ids[meta["embedding_index"]] = meta["id"]
+
+        self._build_index(chunks)
+        self._build_neighbours()
+        self.vector_index = self._load_vector_index()
+        self.load_statistics()
+
+    def load_statistics(self):
+        """Row estimates from the statistics snapshot, which is refreshed on its own schedule."""
+        self.row_estimates = {}
+        self.stats_mtime = 0.0
+        if self.stats_path is None or not self.stats_path.exists():
+            return
+        self.stats_mtime = self.stats_path.stat().st_mtime
+        statistics = load_statistics(str(self.stats_path))
+        self.row_estimates = {
+            full_name: table.row_estimate
+            for full_name, table in statistics.tables.items() if table.row_estimate is not None
+        }
+
+    def statistics_stale(self) -> bool:
+        if self.stats_path is None:
+            return False
+        mtime = self.stats_path.stat().st_mtime if self.stats_path.exists() else 0.0
+        return mtime != self.stats_mtime
+
+    def _build_index(self, chunks: List[str]):
+        postings = defaultdict(list)
+        self._doc_lengths = []
+        for doc_id, text in enumerate(chunks):
+            terms = tokenize(text)
+            self._doc_lengths.append(len(terms))
+            counts: Dict[str, int] = defaultdict(int)
+            for term in terms:
+                counts[term] += 1
+            for term, tf in counts.items():
+                postings[term].append((doc_id, tf))
+
+        n_docs = len(chunks)
+        self._postings = dict(postings)
+        self._idf = {
+            term: math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self._postings.items()
+        }
+        self._avg_length = (sum(self._doc_lengths) / n_docs) if n_docs else 0.0
+
+    def _build_neighbours(self):
+        neighbours = defaultdict(list)
+        for full_name, table_info in self.tables.items():
+            for col in table_info.get("columns", []):
+                ref = col.get("references")
+                if not ref:
+                    continue
+                target = f"{ref['schema']}.{ref['table']}"
+                if target == full_name:
+                    continue
+                if target not in neighbours[full_name]:
+                    neighbours[full_name].append(target)
+                if full_name not in neighbours[target]:
+                    neighbours[target].append(full_name)
+        self.neighbours = dict(neighbours)
+
+    def score(self, question: str) -> List[Tuple[str, float]]:
+        """BM25 scores of every matching table, best first."""
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(question)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, tf in self._postings[term]:
+                norm = 1 - self.b + self.b * self._doc_lengths[doc_id] / (self._avg_length or 1.0)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return [(self.table_ids[doc_id], score) for doc_id, score in ranked]
+
+    def rank(self, question: str, top_k: int) -> List[str]:
+        """Best matching tables, fusing BM25 and vector rankings when available."""
+        lexical = [table_id for table_id, _ in self.score(question)]
+        if self.vector_index is None:
+            return lexical[:top_k]
+
+        depth = max(top_k * 4, 20)
+        semantic = [
+            table_id for table_id, similarity in self.vector_index.search_text(question, k=depth)
+            if similarity >= self.min_similarity
+        ]
+        fused: Dict[str, float] = defaultdict(float)
+        for ranking in (lexical[:depth], semantic):
+            for position, table_id in enumerate(ranking):
+                fused[table_id] += 1.0 / (self.rrf_k + position + 1)
+        return sorted(fused, key=fused.get, reverse=True)[:top_k]
+
+    def retrieve(self, question: str, top_k: Optional[int] = None) -> List[str]:
+        """Top-k matching tables followed by their foreign-key neighbours."""
+        top_k = top_k or self.top_k
+        seeds = self.rank(question, top_k)
+        if not seeds:
+            seeds = self.table_ids[:top_k]
+
+        selected = list(seeds)
+        seen = set(seeds)
+        added = 0
+        for table_id in seeds:
+            for neighbour in self.neighbours.get(table_id, []):
+                if added >= self.max_neighbours:
+                    break
+                if neighbour not in seen and neighbour in self.tables:
+                    seen.add(neighbour)
+                    selected.append(neighbour)
+                    added += 1
+        return selected
+
+    @staticmethod
+    def render_index(index: dict) -> str:
+        """Compact index note: [UNIQUE ][method](cols)[ INCLUDE (cols)][ WHERE pred]."""
+        text = f"{'UNIQUE ' if index.get('unique') else ''}{index.get('method', '')}({', '.join(index['columns'])})"
+        if index.get("include"):
+            text += f" INCLUDE ({', '.join(index['include'])})"
+        if index.get("where"):
+            text += f" WHERE {index['where']}"
+        return text
+
+    @classmethod
+    def render_table(cls, full_name: str, table_info: dict, rows: Optional[float] = None) -> str:
+        """One-line table description: name(col type [PK] [FK->schema.table.col], ...) [IDX[...]] [ROWS~n]."""
+        parts = []
+        for col in table_info.get("columns", []):
+            part = f"{col['name']} {col['data_type']}"
+            if col.get("is_primary_key"):
+                part += " PK"
+            ref = col.get("references")
+            if ref:
+                part += f" FK->{ref['schema']}.{ref['table']}.{ref['column']}"
+            parts.append(part)
+        line = f"{full_name}({', '.join(parts)})"
+        indexes = table_info.get("indexes")
+        if indexes:
+            line += f" IDX[{'; '.join(cls.render_index(index) for index in indexes)}]"
+        if rows is not None:
+            line += f" ROWS~{format_count(rows)}"
+        return line
+
+    def large_table_rows_of(self, table_id: str) -> Optional[float]:
+        """Row estimate of ``table_id`` if it counts as a large table."""
+        rows = self.row_estimates.get(table_id)
+        return rows if rows is not None and rows >= self.large_table_rows else None
+
+    def render(self, table_ids: List[str]) -> str:
+        """Render tables in order until the character budget is used up."""
+        lines = []
+        used = 0
+        for table_id in table_ids:
+            line = self.render_table(table_id, self.tables[table_id], self.large_table_rows_of(table_id))
+            if used + len(line) + 1 > self.max_chars:
+                if not lines:
+                    lines.append(line[: self.max_chars - 4] + " ...")
+                break
+            lines.append(line)
+            used += len(line) + 1
+        return "\n".join(lines)
+
+    def build_prompt_schema(self, question: str, top_k: Optional[int] = None) -> str:
+        """Compact, size-bounded schema text for the prompt."""
+        return self.render(self.retrieve(question, top_k))
+
+
+_retrievers: Dict[str, SchemaRetriever] = {}
+
+
+def get_retriever(schema_json_path: str, stats_path: Optional[str] = DEFAULT_STATS_PATH,
+                  large_table_rows: Optional[int] = None) -> SchemaRetriever:
+    """
+    Shared retriever for ``schema_json_path``, rebuilt when the file changes.
+    A refreshed statistics snapshot only reloads the row estimates.
+    """
+    schema_path = Path(schema_json_path).resolve()
+    retriever = _retrievers.get(str(schema_path))
+    if retriever is None or retriever.loaded_mtime < schema_path.stat().st_mtime:
+        retriever = SchemaRetriever(schema_path.parent, schema_path=str(schema_path),
+                                    stats_path=stats_path, large_table_rows=large_table_rows or LARGE_TABLE_ROWS)
+        _retrievers[str(schema_path)] = retriever
+    else:
+        if large_table_rows:
+            retriever.large_table_rows = large_table_rows
+        if retriever.statistics_stale():
+            retriever.load_statistics()
+    return retriever
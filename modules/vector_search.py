@@ -0,0 +1,153 @@
+# modules/vector_search.py
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from modules.embedder import Embedder
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest values along the last axis, best first."""
+    k = min(k, scores.shape[-1])
+    if k <= 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.int64)
+    if k < scores.shape[-1]:
+        part = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    else:
+        part = np.broadcast_to(np.arange(scores.shape[-1]), scores.shape).copy()
+    order = np.argsort(-np.take_along_axis(scores, part, axis=-1), axis=-1, kind="stable")
+    return np.take_along_axis(part, order, axis=-1)
+
+
+class VectorIndex:
+    """
+    Exact cosine top-k search over the chunk vector matrix written by
+    Embedder. The matrix is scored in row blocks straight from the memory
+    map, so a search never holds more than ``block_size`` scores per query.
+    An optional ANN index (see modules/ann_index.py) answers unfiltered
+    searches approximately instead.
+    """
+
+    def __init__(self, vectors: np.ndarray, metadata: List[dict], normalized: bool = True,
+                 embedder: Optional[Embedder] = None, block_size: int = 65536, ann=None):
+        if len(metadata) != vectors.shape[0]:
+            raise ValueError(f"Metadata has {len(metadata)} entries but the vector file has {vectors.shape[0]} rows")
+        self.vectors = vectors
+        self.embedder = embedder
+        self.block_size = block_size
+        self.ann = ann
+
+        self.ids: List[str] = [""] * len(metadata)
+        schema_rows: Dict[str, List[int]] = {}
+        for meta in metadata:
+            row = meta["embedding_index"]
+            self.ids[row] = meta["id"]
+            schema_rows.setdefault(meta["schema"], []).append(row)
+        self._schema_rows = {name: np.sort(np.asarray(rows, dtype=np.int64)) for name, rows in schema_rows.items()}
+
+        self._inv_norms = None
+        if not normalized:
+            norms = np.empty(vectors.shape[0], dtype=np.float32)
+            for start in range(0, vectors.shape[0], block_size):
+                norms[start:start + block_size] = np.linalg.norm(vectors[start:start + block_size], axis=1)
+            self._inv_norms = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+
+    @classmethod
+    def load(cls, base_dir, block_size: int = 65536, use_ann: bool = True) -> "VectorIndex":
+        """
+        Memory-map the vectors under ``base_dir`` alongside their metadata,
+        attaching the persisted ANN index when it is newer than the vectors.
+        """
+        base_dir = Path(base_dir)
+        embedder = Embedder.from_saved(base_dir)
+        with open(base_dir / 'embedding_metadata.json', 'r') as f:
+            metadata = json.load(f)
+        info = embedder.load_info()
+
+        ann = None
+        ann_info_path = base_dir / 'embedding_ivf' / 'ivf.json'
+        if use_ann and ann_info_path.exists() and ann_info_path.stat().st_mtime >= embedder.vectors_path.stat().st_mtime:
+            from modules.ann_index import IVFIndex
+            ann = IVFIndex.load(ann_info_path.parent)
+
+        return cls(embedder.load_vectors(mmap=True), metadata, normalized=info.get("normalized", False),
+                   embedder=embedder, block_size=block_size, ann=ann)
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    @property
+    def schemas(self) -> List[str]:
+        return sorted(self._schema_rows)
+
+    def _candidate_rows(self, schemas: Optional[Sequence[str]]) -> Optional[np.ndarray]:
+        if schemas is None:
+            return None
+        rows = [self._schema_rows[name] for name in schemas if name in self._schema_rows]
+        if not rows:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(rows)) if len(rows) > 1 else rows[0]
+
+    def search_indices(self, queries: np.ndarray, k: int = 5, schemas: Optional[Sequence[str]] = None,
+                       exact: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score a (n_queries, dim) batch and return (rows, scores), each of
+        shape (n_queries, k'), best first, where k' <= k. Unfiltered searches
+        go through the ANN index when one is attached, unless ``exact``; its
+        results are padded with row -1 when the probed lists run short.
+        """
+        if self.ann is not None and schemas is None and not exact:
+            return self.ann.search_indices(queries, k)
+
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        q_norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = np.divide(queries, q_norms, out=np.zeros_like(queries), where=q_norms > 0)
+
+        candidates = self._candidate_rows(schemas)
+        total = len(self) if candidates is None else len(candidates)
+
+        best_rows = np.empty((queries.shape[0], 0), dtype=np.int64)
+        best_scores = np.empty((queries.shape[0], 0), dtype=np.float32)
+        for start in range(0, total, self.block_size):
+            if candidates is None:
+                rows = np.arange(start, min(start + self.block_size, total))
+                block = self.vectors[start:start + self.block_size]
+            else:
+                rows = candidates[start:start + self.block_size]
+                block = self.vectors[rows]
+            scores = queries @ block.T
+            if self._inv_norms is not None:
+                scores *= self._inv_norms[rows]
+
+            local = top_k_indices(scores, k)
+            merged_rows = np.concatenate([best_rows, rows[local]], axis=1)
+            merged_scores = np.concatenate([best_scores, np.take_along_axis(scores, local, axis=1)], axis=1)
+            keep = top_k_indices(merged_scores, k)
+            best_rows = np.take_along_axis(merged_rows, keep, axis=1)
+            best_scores = np.take_along_axis(merged_scores, keep, axis=1)
+        return best_rows, best_scores
+
+    def search(self, query: np.ndarray, k: int = 5, schemas: Optional[Sequence[str]] = None,
+               exact: bool = False) -> List[Tuple[str, float]]:
+        """Top-k (chunk id, cosine score) pairs for one query vector."""
+        return self.search_batch(np.atleast_2d(query), k, schemas, exact)[0]
+
+    def search_batch(self, queries: np.ndarray, k: int = 5, schemas: Optional[Sequence[str]] = None,
+                     exact: bool = False) -> List[List[Tuple[str, float]]]:
+        """Top-k (chunk id, cosine score) pairs for each row of ``queries``."""
+        rows, scores = self.search_indices(queries, k, schemas, exact)
+        return [
+            [(self.ids[row], float(score)) for row, score in zip(query_rows, query_scores) if row >= 0]
+            for query_rows, query_scores in zip(rows, scores)
+        ]
+
+    def search_text(self, texts, k: int = 5, schemas: Optional[Sequence[str]] = None):
+        """Embed ``texts`` (a string or list of strings) with the index's embedder and search."""
+        if self.embedder is None:
+            raise ValueError("VectorIndex was built without an embedder; pass query vectors instead")
+        if isinstance(texts, str):
+            return self.search(self.embedder.embed_texts([texts])[0], k, schemas)
+        return self.search_batch(self.embedder.embed_texts(list(texts)), k, schemas)
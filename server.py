@@ -0,0 +1,37 @@
+# server.py
+import argparse
+import logging
+
+from config.settings import settings
+from core.database import DatabaseConnection
+from services.api_server import create_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the question -> SQL -> results pipeline over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent request workers")
+    parser.add_argument("--max-pending", type=int, help="Connections queued for a worker before new ones get "
+                                                        "a 503 (default: 4 x workers)")
+    parser.add_argument("--max-rows", type=int, default=1000, help="Row cap for non-streaming responses")
+    parser.add_argument("--schema-json", default="data/llm_schema.json")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=settings.log_level, format=settings.log_format)
+    db = DatabaseConnection(config=settings.database_config)
+    server = create_server(db, host=args.host, port=args.port, workers=args.workers,
+                           schema_json_path=args.schema_json, max_rows=args.max_rows,
+                           max_pending=args.max_pending)
+    print(f" Serving on http://{args.host}:{args.port} with {args.workers} workers (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("👋 Shutting down.")
+    finally:
+        server.server_close()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
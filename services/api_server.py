@@ -0,0 +1,430 @@
+# services/api_server.py
+import asyncio
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Awaitable, Dict, Optional
+
+from core.database import DatabaseConnection
+from core.exceptions import QueryRejectedError, QueryTimeoutError
+from LLMs.generate_sql import get_llm_client, get_response_cache, get_semantic_cache
+from modules.schema_retriever import get_retriever
+from services.cost_gate import ROW_RETURNING
+from services.exporter import FORMATS as EXPORT_FORMATS, export_query
+from services.pipeline import AsyncPipeline
+from services.query_executor import execute_sql, stream_sql
+from services.result_cache import ResultCache
+from utils.sql_fingerprint import normalize_sql
+from utils.telemetry import telemetry
+
+logger = logging.getLogger(__name__)
+
+STREAM_CHUNK_BYTES = 64 * 1024
+# Requests are a question and a few options; anything larger is refused unread.
+MAX_BODY_BYTES = 1024 * 1024
+EXPORT_CONTENT_TYPES = {"csv": "text/csv", "tsv": "text/tab-separated-values"}
+
+
+def _json_bytes(data: Any) -> bytes:
+    return json.dumps(data, default=str).encode("utf-8")
+
+
+class _ChunkedResponse:
+    """
+    Binary writable over a chunked HTTP response. The status line and
+    headers go out with the first write, so an export that fails before
+    producing data can still be answered with a JSON error.
+    """
+
+    def __init__(self, handler: "QueryRequestHandler", headers: Dict[str, str]):
+        self.handler = handler
+        self.headers = headers
+        self.started = False
+
+    def _start(self):
+        self.started = True
+        self.handler.send_response(200)
+        for name, value in self.headers.items():
+            self.handler.send_header(name, value)
+        self.handler.send_header("Transfer-Encoding", "chunked")
+        self.handler.end_headers()
+
+    def write(self, data: bytes) -> int:
+        if not self.started:
+            self._start()
+        if data:
+            self.handler._write_chunk(bytes(data))
+        return len(data)
+
+    def flush(self):
+        self.handler.wfile.flush()
+
+    def finish(self):
+        if not self.started:
+            self._start()
+        self.handler.wfile.write(b"0\r\n\r\n")
+
+
+class AppState:
+    """
+    Warm state shared by every request: the connection pool, the schema
+    retriever, the LLM client, the caches and the AsyncPipeline that
+    generates, checks and runs SQL. The pipeline's coroutines run on one
+    event loop thread; request workers submit them through ``call``.
+    Queries the cost gate routes to the background lane share
+    ``background_queries`` slots; when all are busy the request gets a 503.
+    """
+
+    def __init__(self, db: DatabaseConnection, schema_json_path: str = "data/llm_schema.json",
+                 max_rows: int = 1000, background_queries: int = 1, workers: int = 8,
+                 result_cache: Optional[ResultCache] = None):
+        self.db = db
+        self.pipeline = AsyncPipeline(db, schema_json_path=schema_json_path, max_concurrency=workers,
+                                      result_cache=result_cache if result_cache is not None else ResultCache(db))
+        self.background_slots = threading.BoundedSemaphore(background_queries)
+        self.schema_json_path = schema_json_path
+        self.max_rows = max_rows
+        self.started_at = time.time()
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name="pipeline", daemon=True)
+        self._loop_thread.start()
+
+    def call(self, coroutine: Awaitable[Any]) -> Any:
+        """Run a pipeline coroutine on the event loop thread and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def warm_up(self):
+        """Load everything a first request would otherwise pay for."""
+        self.db.test_connection()
+        get_retriever(self.schema_json_path)
+        get_response_cache()
+        get_semantic_cache(self.schema_json_path)
+        get_llm_client()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "uptime_seconds": time.time() - self.started_at,
+            "tables": len(get_retriever(self.schema_json_path).tables),
+            "db_pool": self.db.pool_stats().dict(),
+            "response_cache": get_response_cache().stats(),
+            "semantic_cache_entries": len(get_semantic_cache(self.schema_json_path)),
+            "llm": get_llm_client().stats(),
+            "cost_gate": self.pipeline.cost_gate.stats(),
+            "result_cache": self.pipeline.result_cache.stats(),
+            "telemetry": telemetry.counters(),
+        }
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+        self._loop.close()
+        self.pipeline.close()
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON API:
+
+    - ``GET /health``
+    - ``GET /stats``
+    - ``POST /query`` with ``{"question": ..., "execute": true, "stream": false, "max_rows": N}``.
+      Streaming responses are chunked NDJSON: a ``{"sql": ...}`` header line,
+      one line per row, then a ``{"row_count": ...}`` trailer line.
+    - ``POST /export`` with ``{"question": ..., "format": "csv", "gzip": false}``: the full
+      result as a chunked CSV/TSV download produced by COPY, gzip-encoded on request.
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    # Idle keep-alive connections give their worker back after this long.
+    timeout = 15
+    server: "QueryServer"
+
+    def handle_one_request(self):
+        super().handle_one_request()
+        if self.server.saturated:
+            # Connections are waiting for a worker: don't hold this one for an idle keep-alive.
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    @property
+    def state(self) -> AppState:
+        return self.server.state
+
+    def _send_json(self, status: int, data: Any):
+        body = _json_bytes(data)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/stats":
+            self._send_json(200, self.state.stats())
+        else:
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+
+    def do_POST(self):
+        if self.path not in ("/query", "/export"):
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+            return
+        export = self.path == "/export"
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if not 0 <= length <= MAX_BODY_BYTES:
+            # The body is left unread, so the connection cannot carry another request.
+            self.close_connection = True
+            if length < 0:
+                self._send_json(400, {"error": "Invalid request: bad Content-Length"})
+            else:
+                self._send_json(413, {"error": f"Request body over {MAX_BODY_BYTES} bytes"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            question = str(payload["question"]).strip()
+            if not question:
+                raise ValueError("question must not be empty")
+            export_format = payload.get("format", "csv")
+            if export and export_format not in EXPORT_FORMATS:
+                raise ValueError(f"format must be one of {EXPORT_FORMATS}")
+            max_rows = payload.get("max_rows", self.state.max_rows)
+            if isinstance(max_rows, bool) or not isinstance(max_rows, int) or max_rows < 0:
+                raise ValueError("max_rows must be a non-negative integer")
+            max_rows = min(max_rows, self.state.max_rows)
+        except (KeyError, TypeError, ValueError) as e:
+            self._send_json(400, {"error": f"Invalid request: {e}"})
+            return
+
+        pipeline = self.state.pipeline
+        started = time.perf_counter()
+        try:
+            sql = self.state.call(pipeline.llm.generate_sql(question))
+        except Exception as e:
+            logger.error(f"SQL generation failed: {e}")
+            self._send_json(502, {"question": question, "error": f"SQL generation failed: {e}"})
+            return
+        generation_ms = (time.perf_counter() - started) * 1000
+
+        if not export and not payload.get("execute", True):
+            self._send_json(200, {"question": question, "sql": sql, "generation_ms": generation_ms})
+            return
+
+        try:
+            decision = self.state.call(pipeline.check(sql))
+        except QueryRejectedError as e:
+            self._send_json(422, {"question": question, "sql": sql, "error": f"SQL rejected: {e}",
+                                  "reasons": e.reasons})
+            return
+        except Exception as e:
+            self._send_json(422, {"question": question, "sql": sql, "error": f"SQL execution failed: {e}"})
+            return
+
+        if decision.background and not self.state.background_slots.acquire(blocking=False):
+            self._send_json(503, {"question": question, "sql": sql,
+                                  "error": f"Background lane busy; retry later ({decision.reason})"})
+            return
+        try:
+            timeout = pipeline.database.background_timeout if decision.background else pipeline.database.timeout
+            if export:
+                self._send_export(question, decision.sql, export_format, bool(payload.get("gzip", False)), timeout)
+            elif payload.get("stream", False):
+                self._stream_rows(question, decision.sql, generation_ms, timeout)
+            else:
+                self._send_rows(question, decision.sql, generation_ms, max_rows, decision.background)
+        finally:
+            if decision.background:
+                self.state.background_slots.release()
+
+    def _send_rows(self, question: str, sql: str, generation_ms: float, max_rows: int, background: bool = False):
+        started = time.perf_counter()
+        try:
+            # One row past the limit tells us the result was truncated.
+            rows, cached = self.state.call(self.state.pipeline.database.fetch(sql, max_rows, background=background))
+        except QueryTimeoutError as e:
+            self._send_json(504, {"question": question, "sql": sql, "error": f"SQL execution failed: {e}"})
+            return
+        except Exception as e:
+            self._send_json(422, {"question": question, "sql": sql, "error": f"SQL execution failed: {e}"})
+            return
+        truncated = len(rows) > max_rows
+        self._send_json(200, {
+            "question": question,
+            "sql": sql,
+            "rows": rows[:max_rows],
+            "row_count": min(len(rows), max_rows),
+            "truncated": truncated,
+            "cached": cached,
+            "generation_ms": generation_ms,
+            "execution_ms": (time.perf_counter() - started) * 1000,
+        })
+
+    def _stream_rows(self, question: str, sql: str, generation_ms: float, timeout: Optional[float] = None):
+        """Chunked NDJSON: rows are forwarded as the server-side cursor yields them."""
+        if ROW_RETURNING.match(normalize_sql(sql)):
+            results = stream_sql(sql, self.state.db, timeout=timeout)
+        else:
+            # Named cursors only take row-returning statements.
+            results = (row for row in execute_sql(sql, self.state.db, timeout=timeout))
+        try:
+            first = next(results, None)
+        except Exception as e:
+            status = 504 if isinstance(e, QueryTimeoutError) else 422
+            self._send_json(status, {"question": question, "sql": sql, "error": f"SQL execution failed: {e}"})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        row_count = 0
+        buffer = bytearray(_json_bytes({"question": question, "sql": sql, "generation_ms": generation_ms}) + b"\n")
+        trailer: Dict[str, Any] = {}
+        try:
+            if first is not None:
+                row_count = 1
+                buffer += _json_bytes(first) + b"\n"
+                for row in results:
+                    buffer += _json_bytes(row) + b"\n"
+                    row_count += 1
+                    if len(buffer) >= STREAM_CHUNK_BYTES:
+                        self._write_chunk(bytes(buffer))
+                        buffer.clear()
+        except (BrokenPipeError, ConnectionResetError):
+            logger.info("Client disconnected during streaming; cancelling")
+            results.close()
+            self.close_connection = True
+            return
+        except Exception as e:
+            trailer["error"] = f"SQL execution failed: {e}"
+        finally:
+            results.close()
+
+        trailer["row_count"] = row_count
+        buffer += _json_bytes(trailer) + b"\n"
+        self._write_chunk(bytes(buffer))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _send_export(self, question: str, sql: str, fmt: str, compress: bool, timeout: Optional[float] = None):
+        """COPY output forwarded to the socket in bounded chunks, never parsed into rows."""
+        headers = {
+            "Content-Type": f"{EXPORT_CONTENT_TYPES[fmt]}; charset=utf-8",
+            "Content-Disposition": f'attachment; filename="export.{fmt}"',
+        }
+        if compress:
+            headers["Content-Encoding"] = "gzip"
+        response = _ChunkedResponse(self, headers)
+        try:
+            export_query(sql, self.state.db, response, fmt=fmt, compress=compress,
+                         buffer_size=STREAM_CHUNK_BYTES, timeout=timeout)
+        except (BrokenPipeError, ConnectionResetError):
+            logger.info("Client disconnected during export; cancelled")
+            self.close_connection = True
+            return
+        except Exception as e:
+            if not response.started:
+                status = 504 if isinstance(e, QueryTimeoutError) else 422
+                self._send_json(status, {"question": question, "sql": sql, "error": f"SQL execution failed: {e}"})
+            else:
+                # Headers are out: end without the final chunk so the client sees a truncated body.
+                logger.error(f"Export failed mid-stream: {e}")
+                self.close_connection = True
+            return
+        response.finish()
+
+
+class QueryServer(HTTPServer):
+    """
+    HTTP server that hands each connection to a bounded worker pool. At
+    most ``max_pending`` connections wait for a worker; beyond that new
+    connections are answered with a 503 straight away, and while any are
+    waiting, workers close keep-alive connections after their current
+    request instead of idling on them.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, state: AppState, workers: int = 8, max_pending: Optional[int] = None):
+        self.state = state
+        self.workers = workers
+        self.max_pending = workers * 4 if max_pending is None else max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http")
+        self._admission_lock = threading.Lock()
+        self._admitted = 0
+        self._running = 0
+        super().__init__(address, QueryRequestHandler)
+
+    @property
+    def saturated(self) -> bool:
+        """Whether admitted connections are waiting for a worker."""
+        with self._admission_lock:
+            return self._admitted > self._running
+
+    def process_request(self, request, client_address):
+        with self._admission_lock:
+            admitted = self._admitted < self.workers + self.max_pending
+            if admitted:
+                self._admitted += 1
+        if not admitted:
+            telemetry.increment("http_rejected_busy")
+            self._reject_busy(request)
+            return
+        self._executor.submit(self._process, request, client_address)
+
+    def _reject_busy(self, request):
+        """Answer 503 without a worker; runs on the accept thread, so it never blocks."""
+        body = _json_bytes({"error": "Server busy; retry later"})
+        head = (f"HTTP/1.1 503 Service Unavailable\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\nRetry-After: 1\r\nConnection: close\r\n\r\n")
+        try:
+            request.setblocking(False)
+            try:
+                # Drain what the client already sent so closing does not reset the connection.
+                request.recv(65536)
+            except BlockingIOError:
+                pass
+            request.send(head.encode("ascii") + body)
+        except OSError:
+            pass
+        finally:
+            self.shutdown_request(request)
+
+    def _process(self, request, client_address):
+        with self._admission_lock:
+            self._running += 1
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            with self._admission_lock:
+                self._running -= 1
+                self._admitted -= 1
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=True)
+        self.state.close()
+
+
+def create_server(db: DatabaseConnection, host: str = "127.0.0.1", port: int = 8000, workers: int = 8,
+                  schema_json_path: str = "data/llm_schema.json", max_rows: int = 1000,
+                  warm: bool = True, max_pending: Optional[int] = None) -> QueryServer:
+    state = AppState(db, schema_json_path=schema_json_path, max_rows=max_rows, workers=workers)
+    if warm:
+        state.warm_up()
+    return QueryServer((host, port), state, workers=workers, max_pending=max_pending)
@@ -0,0 +1,185 @@
+# services/batch_runner.py
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Iterator, Optional, Set, Tuple
+
+from pydantic import BaseModel, Field
+
+from core.database import DatabaseConnection
+from services.pipeline import AsyncPipeline, QuestionResult
+from services.result_cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+
+class BatchSummary(BaseModel):
+    """Counters for one batch run."""
+
+    processed: int = Field(default=0, description="Questions answered in this run")
+    skipped: int = Field(default=0, description="Questions already present in the output (resumed)")
+    errors: int = Field(default=0, description="Questions whose generation or execution failed")
+    elapsed_seconds: float = Field(default=0.0, description="Wall-clock duration of the run")
+
+    @property
+    def throughput(self) -> float:
+        """Questions per second."""
+        return self.processed / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+class RateLimiter:
+    """Token bucket limiting how many LLM requests start per second."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def read_questions(input_path: str) -> Iterator[Tuple[str, str]]:
+    """Stream ``(id, question)`` pairs; ``id`` defaults to the line number."""
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            yield str(record.get("id", line_no)), record["question"]
+
+
+def load_completed_ids(output_path: str) -> Set[str]:
+    """
+    IDs whose latest record in the output has no error; failed ids are
+    left out so a resumed run retries them. A torn last line is ignored.
+    """
+    completed: Set[str] = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                question_id = str(record["id"])
+            except (ValueError, KeyError, TypeError):
+                continue
+            if record.get("error"):
+                completed.discard(question_id)
+            else:
+                completed.add(question_id)
+    return completed
+
+
+class BatchRunner:
+    """
+    Runs a JSONL question bank through SQL generation and execution.
+
+    Questions are streamed from the input file and at most
+    ``llm_concurrency + db_concurrency`` are in flight, with generation and
+    execution on separately sized worker pools. Each result is appended to
+    the output JSONL as soon as it completes, and that file doubles as the
+    checkpoint: a resumed run skips every id already answered without an
+    error and retries the rest.
+    """
+
+    def __init__(self, db: DatabaseConnection, schema_json_path: str = "data/llm_schema.json",
+                 llm_concurrency: int = 8, db_concurrency: int = 4, llm_rate: Optional[float] = None,
+                 execute: bool = True, max_rows: int = 100, include_rows: bool = False,
+                 progress_every: int = 100):
+        self.pipeline = AsyncPipeline(
+            db,
+            schema_json_path=schema_json_path,
+            max_concurrency=llm_concurrency + db_concurrency,
+            llm_workers=llm_concurrency,
+            db_workers=db_concurrency,
+            max_rows=max_rows,
+            result_cache=ResultCache(db),
+        )
+        self.llm_rate = llm_rate
+        self.execute = execute
+        self.include_rows = include_rows
+        self.progress_every = progress_every
+
+    def _record(self, question_id: str, result: QuestionResult) -> Dict[str, Any]:
+        record = {
+            "id": question_id,
+            "question": result.question,
+            "sql": result.sql,
+            "row_count": result.row_count,
+            "truncated": result.truncated,
+            "error": result.error,
+            "generation_ms": round(result.generation_ms, 2),
+            "execution_ms": round(result.execution_ms, 2),
+            "estimated_cost": result.estimated_cost,
+            "gate_action": result.gate_action,
+        }
+        if self.include_rows:
+            record["rows"] = result.rows
+        return record
+
+    async def _run(self, input_path: str, output_path: str, resume: bool) -> BatchSummary:
+        summary = BatchSummary()
+        completed = load_completed_ids(output_path) if resume else set()
+        limiter = RateLimiter(self.llm_rate) if self.llm_rate else None
+        slots = asyncio.Semaphore(self.pipeline.max_concurrency * 2)
+        started = time.perf_counter()
+
+        mode = "a" if resume else "w"
+        with open(output_path, mode, encoding="utf-8") as out:
+            if resume and out.tell() > 0:
+                # Terminate a line torn by an interrupted run before appending.
+                with open(output_path, "rb") as check:
+                    check.seek(-1, os.SEEK_END)
+                    if check.read(1) != b"\n":
+                        out.write("\n")
+
+            async def answer(question_id: str, question: str):
+                try:
+                    if limiter:
+                        await limiter.acquire()
+                    result = await self.pipeline.ask(question, execute=self.execute)
+                    out.write(json.dumps(self._record(question_id, result), default=str) + "\n")
+                    out.flush()
+                    summary.processed += 1
+                    if result.error:
+                        summary.errors += 1
+                    if summary.processed % self.progress_every == 0:
+                        rate = summary.processed / (time.perf_counter() - started)
+                        print(f"[*] {summary.processed} answered ({summary.errors} errors, {rate:.1f}/s)")
+                finally:
+                    slots.release()
+
+            tasks = set()
+            for question_id, question in read_questions(input_path):
+                if question_id in completed:
+                    summary.skipped += 1
+                    continue
+                # Bounded read-ahead keeps memory flat for any input size.
+                await slots.acquire()
+                task = asyncio.ensure_future(answer(question_id, question))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+
+        summary.elapsed_seconds = time.perf_counter() - started
+        return summary
+
+    def run(self, input_path: str, output_path: str, resume: bool = True) -> BatchSummary:
+        return asyncio.run(self._run(input_path, output_path, resume))
+
+    def close(self):
+        self.pipeline.close()
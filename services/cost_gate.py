@@ -0,0 +1,228 @@
+# services/cost_gate.py
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from config.settings import settings
+from core.database import DatabaseConnection
+from core.exceptions import QueryRejectedError
+from utils.sql_fingerprint import has_multiple_statements, normalize_sql, sql_fingerprint
+from utils.telemetry import telemetry
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("reject", "limit", "background")
+ROW_RETURNING = re.compile(r"^\s*(?:select|with|values|table)\b", re.IGNORECASE)
+MAX_SHAPE_CHARS = 300
+
+
+def _strip_terminator(sql: str) -> str:
+    return sql.strip().rstrip(";").rstrip()
+
+
+class PlanSummary(BaseModel):
+    """The parts of an ``EXPLAIN (FORMAT JSON)`` plan the gate decides on."""
+
+    total_cost: float = Field(..., description="Estimated total cost of the top plan node")
+    startup_cost: float = Field(..., description="Estimated cost before the first row")
+    plan_rows: float = Field(..., description="Estimated rows returned")
+    plan_width: int = Field(..., description="Estimated average row width in bytes")
+    shape: str = Field(..., description="Compact plan tree, e.g. Hash Join(Seq Scan t, Hash(Seq Scan u))")
+    node_types: List[str] = Field(default_factory=list, description="Node types in pre-order")
+    seq_scans: List[str] = Field(default_factory=list, description="Relations read by sequential scans")
+    unconditioned_nested_loops: int = Field(default=0, description="Nested Loop joins without any join condition")
+
+    @classmethod
+    def from_plan(cls, plan: Dict[str, Any]) -> "PlanSummary":
+        node_types: List[str] = []
+        seq_scans: List[str] = []
+        unconditioned = 0
+
+        def walk(node: Dict[str, Any]) -> str:
+            nonlocal unconditioned
+            node_type = node["Node Type"]
+            node_types.append(node_type)
+            relation = node.get("Relation Name")
+            if relation:
+                relation = f"{node['Schema']}.{relation}" if node.get("Schema") else relation
+                if node_type == "Seq Scan":
+                    seq_scans.append(relation)
+            children = node.get("Plans", [])
+            if node_type == "Nested Loop" and not node.get("Join Filter") and not any(
+                "Index Cond" in child or "Recheck Cond" in child or child.get("Filter") for child in children
+            ):
+                unconditioned += 1
+            label = f"{node_type} {relation}" if relation else node_type
+            if children:
+                label += f"({', '.join(walk(child) for child in children)})"
+            return label
+
+        shape = walk(plan)
+        if len(shape) > MAX_SHAPE_CHARS:
+            shape = shape[:MAX_SHAPE_CHARS - 4] + " ..."
+        return cls(
+            total_cost=plan["Total Cost"],
+            startup_cost=plan["Startup Cost"],
+            plan_rows=plan["Plan Rows"],
+            plan_width=plan["Plan Width"],
+            shape=shape,
+            node_types=node_types,
+            seq_scans=seq_scans,
+            unconditioned_nested_loops=unconditioned,
+        )
+
+
+class CostGateDecision(BaseModel):
+    """What to do with one statement: run it, run a rewritten form, run it in the background, or refuse it."""
+
+    action: str = Field(..., description="'allow', 'limit', 'background' or 'reject'")
+    sql: str = Field(..., description="SQL to execute (rewritten when action is 'limit')")
+    plan: Optional[PlanSummary] = Field(None, description="Plan of the original statement; None when the gate is off")
+    reason: Optional[str] = Field(None, description="Why the statement was not simply allowed")
+
+    @property
+    def background(self) -> bool:
+        return self.action == "background"
+
+
+class CostGate:
+    """
+    Plans generated SQL with ``EXPLAIN (FORMAT JSON)`` before it runs and
+    applies a policy to statements whose estimated total cost exceeds
+    ``max_cost``:
+
+    - ``reject``: refuse the statement.
+    - ``limit``: wrap a row-returning statement in ``LIMIT limit_rows`` and
+      re-plan it; refuse it if it is still over budget (e.g. a sort or
+      aggregate over a huge join).
+    - ``background``: run it on the caller's background lane.
+
+    Statements over ``reject_cost`` are refused under every policy. Plans
+    are cached per SQL fingerprint for ``plan_ttl`` seconds, so repeated
+    statements are planned once. A ``max_cost`` of 0 disables the gate.
+    """
+
+    def __init__(self, db: DatabaseConnection, max_cost: Optional[float] = None, policy: Optional[str] = None,
+                 limit_rows: Optional[int] = None, reject_cost: Optional[float] = None,
+                 cache_size: int = 1024, plan_ttl: float = 300.0):
+        self.db = db
+        self.max_cost = settings.cost_gate_max_cost if max_cost is None else max_cost
+        self.policy = policy or settings.cost_gate_policy
+        self.limit_rows = limit_rows or settings.cost_gate_limit_rows
+        self.reject_cost = settings.cost_gate_reject_cost if reject_cost is None else reject_cost
+        if self.policy not in POLICIES:
+            raise ValueError(f"Invalid cost gate policy {self.policy!r}. Must be one of: {POLICIES}")
+        self.cache_size = cache_size
+        self.plan_ttl = plan_ttl
+        self._plans: "OrderedDict[str, Tuple[float, PlanSummary]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_cost > 0
+
+    def _cached_plan(self, fingerprint: str) -> Optional[PlanSummary]:
+        with self._lock:
+            entry = self._plans.get(fingerprint)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.plan_ttl:
+                del self._plans[fingerprint]
+                return None
+            self._plans.move_to_end(fingerprint)
+            return entry[1]
+
+    def explain(self, sql: str) -> PlanSummary:
+        """
+        Plan summary of ``sql``, from the cache when it was planned recently.
+        Only single statements are planned: EXPLAIN would plan the first and
+        run the rest. Planning happens in a transaction that is always rolled
+        back, so nothing it touches is ever committed.
+        """
+        if has_multiple_statements(sql):
+            raise QueryRejectedError("Only a single SQL statement can be run",
+                                     reasons=[{"rule": "multiple_statements"}])
+        fingerprint = sql_fingerprint(sql)
+        plan = self._cached_plan(fingerprint)
+        if plan is not None:
+            telemetry.increment("explain_cache_hits")
+            return plan
+
+        with self.db.get_connection(use_real_dict_cursor=False) as conn:
+            conn.autocommit = False
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(f"EXPLAIN (FORMAT JSON) {_strip_terminator(sql)}")
+                    document = cur.fetchone()[0]
+            finally:
+                # The pool restores autocommit when the connection is returned.
+                conn.rollback()
+        if isinstance(document, str):
+            document = json.loads(document)
+        plan = PlanSummary.from_plan(document[0]["Plan"])
+        telemetry.increment("explain_cache_misses")
+
+        with self._lock:
+            self._plans[fingerprint] = (time.monotonic(), plan)
+            self._plans.move_to_end(fingerprint)
+            while len(self._plans) > self.cache_size:
+                self._plans.popitem(last=False)
+        return plan
+
+    def limited_sql(self, sql: str) -> str:
+        return f"SELECT * FROM ({_strip_terminator(sql)}) AS limited LIMIT {int(self.limit_rows)}"
+
+    def evaluate(self, sql: str) -> CostGateDecision:
+        """Decide how ``sql`` may run; never executes it."""
+        if not self.enabled:
+            return CostGateDecision(action="allow", sql=sql)
+
+        plan = self.explain(sql)
+        if plan.total_cost <= self.max_cost:
+            return CostGateDecision(action="allow", sql=sql, plan=plan)
+
+        reason = f"estimated cost {plan.total_cost:,.0f} exceeds {self.max_cost:,.0f} ({plan.shape})"
+        if self.reject_cost and plan.total_cost > self.reject_cost:
+            return CostGateDecision(action="reject", sql=sql, plan=plan,
+                                    reason=f"estimated cost {plan.total_cost:,.0f} exceeds the hard limit "
+                                           f"{self.reject_cost:,.0f} ({plan.shape})")
+
+        if self.policy == "background":
+            return CostGateDecision(action="background", sql=sql, plan=plan, reason=reason)
+
+        if self.policy == "limit" and ROW_RETURNING.match(normalize_sql(sql)):
+            limited = self.limited_sql(sql)
+            limited_plan = self.explain(limited)
+            if limited_plan.total_cost <= self.max_cost:
+                return CostGateDecision(action="limit", sql=limited, plan=plan,
+                                        reason=f"{reason}; limited to {self.limit_rows} rows "
+                                               f"(cost {limited_plan.total_cost:,.0f})")
+            reason += f"; still {limited_plan.total_cost:,.0f} with LIMIT {self.limit_rows}"
+
+        return CostGateDecision(action="reject", sql=sql, plan=plan, reason=reason)
+
+    def enforce(self, sql: str) -> CostGateDecision:
+        """``evaluate`` and raise QueryRejectedError for rejected statements."""
+        decision = self.evaluate(sql)
+        if decision.action != "allow":
+            telemetry.increment(f"cost_gate_{decision.action}")
+            logger.info(f"Cost gate: {decision.action}: {decision.reason}")
+        if decision.action == "reject":
+            raise QueryRejectedError(decision.reason, reasons=[{
+                "rule": "cost_gate",
+                "total_cost": decision.plan.total_cost,
+                "plan_rows": decision.plan.plan_rows,
+                "shape": decision.plan.shape,
+            }])
+        return decision
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            cached = len(self._plans)
+        return {"enabled": self.enabled, "policy": self.policy, "max_cost": self.max_cost, "cached_plans": cached}
@@ -0,0 +1,181 @@
+# services/exporter.py
+import gzip
+import logging
+import os
+import time
+from typing import BinaryIO, Callable, Optional, Union
+
+import psycopg2
+import psycopg2.extensions
+from pydantic import BaseModel, Field
+
+from core.database import DatabaseConnection
+from core.exceptions import DatabaseError
+from services.cost_gate import ROW_RETURNING
+from services.query_executor import _guarded
+from utils.sql_fingerprint import normalize_sql
+from utils.telemetry import telemetry
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "tsv")
+COPY_OPTIONS = {
+    "csv": "FORMAT csv",
+    # CSV quoting with tabs: fields containing tabs or newlines stay readable by CSV parsers.
+    "tsv": "FORMAT csv, DELIMITER E'\\t'",
+}
+DEFAULT_BUFFER_BYTES = 1024 * 1024
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class ExportResult(BaseModel):
+    """Outcome of one COPY export."""
+
+    format: str = Field(..., description="'csv' or 'tsv'")
+    rows: int = Field(..., description="Data rows written (excluding the header)")
+    bytes: int = Field(..., description="Uncompressed bytes produced by COPY")
+    compressed: bool = Field(..., description="Whether the output is gzip-compressed")
+    path: Optional[str] = Field(None, description="Written file, when exporting to a path")
+    file_bytes: Optional[int] = Field(None, description="Size of the written file")
+    elapsed_seconds: float = Field(..., description="Wall time of the export")
+
+
+def copy_statement(sql: str, fmt: str = "csv", header: bool = True) -> str:
+    """``COPY (sql) TO STDOUT`` for a row-returning statement."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Invalid export format {fmt!r}. Must be one of: {FORMATS}")
+    if not ROW_RETURNING.match(normalize_sql(sql)):
+        raise ValueError("Only SELECT, WITH, VALUES and TABLE statements can be exported")
+    query = sql.strip().rstrip(";").rstrip()
+    # Newlines keep a trailing -- comment from swallowing the closing parenthesis.
+    return f"COPY (\n{query}\n) TO STDOUT WITH ({COPY_OPTIONS[fmt]}, HEADER {'true' if header else 'false'})"
+
+
+class _CopySink:
+    """
+    Write target for ``copy_expert``. psycopg2 calls ``write`` once per
+    CopyData message, i.e. once per row; rows are collected into a buffer
+    of at most ``buffer_size`` bytes before being passed on (through gzip
+    when compressing), so memory stays bounded whatever the result size.
+    The gzip stream is opened on the first flush, so nothing reaches
+    ``out`` if the statement fails before producing a full buffer.
+    """
+
+    def __init__(self, out: BinaryIO, compress: bool, compress_level: int, buffer_size: int,
+                 progress: Optional[ProgressCallback], progress_interval: float, header: bool):
+        self.out = out
+        self.compress = compress
+        self.compress_level = compress_level
+        self.buffer_size = buffer_size
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self.rows = -1 if header else 0
+        self.bytes = 0
+        self._buffer = bytearray()
+        self._stream: Optional[BinaryIO] = None
+        self._reported_at = time.monotonic()
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        self.rows += 1
+        self.bytes += len(data)
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+            if self.progress is not None and time.monotonic() - self._reported_at >= self.progress_interval:
+                self._reported_at = time.monotonic()
+                self.progress(max(self.rows, 0), self.bytes)
+        return len(data)
+
+    def flush(self):
+        if self._stream is None:
+            self._stream = (gzip.GzipFile(fileobj=self.out, mode="wb", compresslevel=self.compress_level, mtime=0)
+                            if self.compress else self.out)
+        if self._buffer:
+            self._stream.write(bytes(self._buffer))
+            self._buffer.clear()
+
+    def close(self):
+        """Flush what is left and finish the gzip member; ``out`` itself stays open."""
+        self.flush()
+        if self.compress:
+            self._stream.close()
+        self.out.flush()
+        if self.progress is not None:
+            self.progress(max(self.rows, 0), self.bytes)
+
+
+def export_query(
+    sql: str,
+    db: DatabaseConnection,
+    destination: Union[str, os.PathLike, BinaryIO],
+    fmt: str = "csv",
+    header: bool = True,
+    compress: bool = False,
+    compress_level: int = 6,
+    buffer_size: int = DEFAULT_BUFFER_BYTES,
+    progress: Optional[ProgressCallback] = None,
+    progress_interval: float = 1.0,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
+) -> ExportResult:
+    """
+    Export the rows of ``sql`` with ``COPY (...) TO STDOUT``, streamed
+    straight from the server into ``destination``: a file path, or any
+    binary writable object (an open file, ``socket.makefile("wb")``, an
+    HTTP response). No row is ever parsed into Python objects.
+
+    A path is written through ``<path>.part`` and renamed on success, so a
+    failed export never leaves a truncated file behind. ``progress`` is
+    called with ``(rows, bytes)`` at most every ``progress_interval``
+    seconds and once at the end. ``timeout``/``deadline`` bound the whole
+    export as in ``execute_sql``.
+
+    COPY cannot run while ``enable_interrupt_cancel()`` is active.
+    """
+    statement = copy_statement(sql, fmt, header)
+    if psycopg2.extensions.get_wait_callback() is not None:
+        raise DatabaseError("COPY export is unavailable while a psycopg2 wait callback "
+                            "(enable_interrupt_cancel) is installed")
+
+    started = time.perf_counter()
+    path = None if hasattr(destination, "write") else os.fspath(destination)
+    part_path = f"{path}.part" if path is not None else None
+    out = open(part_path, "wb") if part_path is not None else destination
+    sink = _CopySink(out, compress, compress_level, buffer_size, progress, progress_interval, header)
+    try:
+        with db.get_connection(use_real_dict_cursor=False) as conn:
+            try:
+                with _guarded(conn, timeout, deadline):
+                    with conn.cursor() as cur:
+                        cur.copy_expert(statement, sink)
+            except (psycopg2.Error, DatabaseError):
+                raise
+            except BaseException:
+                # The sink failed (disk full, client gone): stop the server sending the rest.
+                conn.cancel()
+                raise
+        sink.close()
+    except BaseException:
+        telemetry.increment("exports_failed")
+        if part_path is not None:
+            out.close()
+            os.remove(part_path)
+        raise
+    if part_path is not None:
+        out.close()
+        os.replace(part_path, path)
+
+    result = ExportResult(
+        format=fmt,
+        rows=max(sink.rows, 0),
+        bytes=sink.bytes,
+        compressed=compress,
+        path=path,
+        file_bytes=os.path.getsize(path) if path is not None else None,
+        elapsed_seconds=time.perf_counter() - started,
+    )
+    telemetry.increment("exports")
+    telemetry.increment("export_rows", result.rows)
+    logger.info(f"Exported {result.rows} rows ({result.bytes} bytes) in {result.elapsed_seconds:.2f}s")
+    return result
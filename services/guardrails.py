@@ -0,0 +1,93 @@
+# services/guardrails.py
+import re
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from config.settings import settings
+from core.exceptions import QueryRejectedError
+from modules.schema_retriever import LARGE_TABLE_ROWS, get_retriever
+from services.index_usage import STRING_LITERAL, analyze_index_usage, join_equalities, resolve_tables
+from utils.text import format_count
+
+ROW_LIMIT = re.compile(r"\bLIMIT\s+\d+|\bFETCH\s+(?:FIRST|NEXT)\b", re.IGNORECASE)
+
+
+class GuardrailViolation(BaseModel):
+    """One reason generated SQL must not run as written."""
+
+    rule: str = Field(..., description="Rule that was violated")
+    table: str = Field(..., description="Fully qualified table name")
+    row_estimate: float = Field(..., description="Estimated rows of the table")
+    message: str = Field(..., description="Human-readable explanation")
+
+
+def _top_level(text: str) -> str:
+    """``text`` with everything inside parentheses blanked out, leaving the outermost statement."""
+    depth = 0
+    out = []
+    for char in text:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth = max(0, depth - 1)
+            out.append(" ")
+            continue
+        out.append(char if depth == 0 else " ")
+    return "".join(out)
+
+
+def check_large_table_scans(sql: str, tables: Dict[str, dict], row_estimates: Dict[str, float],
+                            large_table_rows: int = LARGE_TABLE_ROWS) -> List[GuardrailViolation]:
+    """
+    Flag large tables that ``sql`` reads without a selective predicate,
+    unless the outermost statement bounds its output with LIMIT or FETCH
+    FIRST (a LIMIT inside a subquery or CTE bounds only that part). A table
+    counts as filtered when it has a WHERE predicate on one of its columns,
+    or is equality-joined on an indexed column to a relation that is itself
+    filtered, so the join probes the index instead of scanning. Like
+    ``analyze_index_usage`` this is lexical, not a planner.
+    """
+    text = STRING_LITERAL.sub("''", sql)
+    if ROW_LIMIT.search(_top_level(text)):
+        return []
+    large = {
+        key: row_estimates[key]
+        for key in set(resolve_tables(text, tables).values())
+        if row_estimates.get(key, 0) >= large_table_rows
+    }
+    if not large:
+        return []
+    filtered = {p.table for p in analyze_index_usage(text, tables).predicates if p.clause == "where"}
+    joins = join_equalities(text, tables)
+    grew = True
+    while grew:
+        grew = False
+        for left, right in joins:
+            for probe, driver in ((left, right), (right, left)):
+                if probe.indexed and driver.table in filtered and probe.table not in filtered:
+                    filtered.add(probe.table)
+                    grew = True
+    return [
+        GuardrailViolation(
+            rule="large_table_filter",
+            table=key,
+            row_estimate=rows,
+            message=f"{key} has ~{format_count(rows)} rows; filter it in WHERE or add a LIMIT",
+        )
+        for key, rows in sorted(large.items())
+        if key not in filtered
+    ]
+
+
+def enforce_guardrails(sql: str, schema_json_path: str, large_table_rows: Optional[int] = None):
+    """
+    Raise QueryRejectedError if ``sql`` violates a guardrail; run before
+    execution, and before the EXPLAIN cost gate when that is enabled.
+    """
+    large_table_rows = large_table_rows or settings.large_table_rows
+    retriever = get_retriever(schema_json_path, large_table_rows=large_table_rows)
+    violations = check_large_table_scans(sql, retriever.tables, retriever.row_estimates, large_table_rows)
+    if violations:
+        raise QueryRejectedError("; ".join(v.message for v in violations),
+                                 reasons=[v.model_dump() for v in violations])
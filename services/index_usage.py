@@ -0,0 +1,256 @@
+# services/index_usage.py
+import argparse
+import json
+import re
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+IDENT = r'"?[A-Za-z_][\w$]*"?'
+QUALIFIED = rf"{IDENT}(?:\s*\.\s*{IDENT}){{0,2}}"
+
+# WHERE and JOIN ... ON bodies run until the next clause keyword.
+PREDICATE_CLAUSE = re.compile(
+    r"\b(WHERE|ON)\b(.*?)(?=\b(?:WHERE|GROUP\s+BY|ORDER\s+BY|HAVING|LIMIT|OFFSET|UNION|INTERSECT|EXCEPT|WINDOW"
+    r"|RETURNING|FETCH|(?:NATURAL\s+|LEFT\s+|RIGHT\s+|FULL\s+|INNER\s+|CROSS\s+)*(?:OUTER\s+)?JOIN)\b|;|$)",
+    re.IGNORECASE | re.DOTALL,
+)
+COLUMN_REF = re.compile(rf"(?<![\w.$\"])({QUALIFIED})(?![\w$\"])(?!\s*\()", re.IGNORECASE)
+EQUALITY = re.compile(rf"(?<![\w.$\"])({QUALIFIED})\s*=\s*({QUALIFIED})(?![\w$\"])(?!\s*\()", re.IGNORECASE)
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NOT_COLUMNS = {
+    "and", "or", "not", "null", "is", "in", "like", "ilike", "similar", "between", "true", "false",
+    "any", "all", "some", "exists", "case", "when", "then", "else", "end", "as", "distinct", "from",
+    "interval", "date", "timestamp", "time", "current_date", "current_timestamp", "now", "select",
+    "escape", "collate", "on", "using", "asc", "desc", "to",
+}
+# Words that can follow a table name in FROM/JOIN and are never aliases.
+NOT_ALIASES = {
+    "on", "using", "where", "join", "left", "right", "inner", "full", "cross", "natural", "outer",
+    "group", "order", "limit", "offset", "having", "union", "intersect", "except", "window", "for",
+}
+# FROM/JOIN <table> [AS] [alias]; a following keyword is left unconsumed so
+# that "FROM a JOIN b" still matches b.
+TABLE_REF = re.compile(
+    rf"\b(?:FROM|JOIN)\s+(?!\()({IDENT}(?:\s*\.\s*{IDENT})?)"
+    rf"(?:\s+(?:AS\s+)?(?!(?:{'|'.join(sorted(NOT_ALIASES))})\b)({IDENT}))?",
+    re.IGNORECASE,
+)
+
+
+def _unquote(identifier: str) -> str:
+    identifier = identifier.strip()
+    if identifier.startswith('"') and identifier.endswith('"'):
+        return identifier[1:-1]
+    return identifier.lower()
+
+
+class PredicateColumn(BaseModel):
+    """A column referenced in a WHERE or JOIN ... ON predicate."""
+
+    table: str = Field(..., description="Fully qualified table name")
+    column: str = Field(..., description="Column name")
+    clause: str = Field(..., description="'where' or 'join'")
+    index: Optional[str] = Field(None, description="Index whose leading column this is, or 'PRIMARY KEY'")
+
+    @property
+    def indexed(self) -> bool:
+        return self.index is not None
+
+
+class IndexUsageReport(BaseModel):
+    """Which predicate columns of one SQL statement an index can serve."""
+
+    sql: str = Field(..., description="Analyzed SQL")
+    predicates: List[PredicateColumn] = Field(default_factory=list, description="Resolved predicate columns")
+
+    @property
+    def total(self) -> int:
+        return len(self.predicates)
+
+    @property
+    def hits(self) -> int:
+        return sum(1 for predicate in self.predicates if predicate.indexed)
+
+    @property
+    def hit_ratio(self) -> Optional[float]:
+        return self.hits / self.total if self.total else None
+
+
+def leading_index_columns(table_info: Dict[str, Any]) -> Dict[str, str]:
+    """``{column: index name}`` for columns an index can be entered on."""
+    leading = {}
+    for col in table_info.get("columns", []):
+        if col.get("is_primary_key"):
+            leading.setdefault(col["name"], "PRIMARY KEY")
+    for index in table_info.get("indexes", []):
+        if index.get("columns") and index.get("method", "btree") in ("btree", "hash", "brin"):
+            leading.setdefault(index["columns"][0], index["name"])
+        elif index.get("method") in ("gin", "gist", "spgist"):
+            # Multi-column GIN/GiST indexes can be probed on any key column.
+            for column in index.get("columns", []):
+                leading.setdefault(column, index["name"])
+    return leading
+
+
+def resolve_tables(sql: str, tables: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+    """Map aliases and bare/qualified table names in FROM/JOIN to schema.table keys."""
+    by_name: Dict[str, List[str]] = {}
+    for key in tables:
+        by_name.setdefault(key.split(".", 1)[1], []).append(key)
+
+    resolved = {}
+    for match in TABLE_REF.finditer(sql):
+        parts = [_unquote(part) for part in match.group(1).split(".")]
+        if len(parts) == 2:
+            key = f"{parts[0]}.{parts[1]}"
+            if key not in tables:
+                continue
+        else:
+            candidates = by_name.get(parts[0], [])
+            if len(candidates) != 1:
+                continue
+            key = candidates[0]
+        resolved[key] = key
+        resolved[key.split(".", 1)[1]] = key
+        alias = match.group(2)
+        if alias:
+            resolved[_unquote(alias)] = key
+    return resolved
+
+
+def _column_resolver(text: str, tables: Dict[str, Dict[str, Any]]
+                     ) -> Tuple[List[str], Callable[[str], Optional[Tuple[str, str]]]]:
+    """Tables in scope of ``text`` and a resolver from a column reference to ``(table, column)``."""
+    aliases = resolve_tables(text, tables)
+    in_scope = sorted(set(aliases.values()))
+    columns_of = {key: {col["name"] for col in tables[key].get("columns", [])} for key in in_scope}
+
+    def resolve(reference: str) -> Optional[Tuple[str, str]]:
+        parts = [_unquote(part) for part in reference.split(".")]
+        column = parts[-1]
+        if len(parts) == 1:
+            if column in NOT_COLUMNS:
+                return None
+            owners = [key for key in in_scope if column in columns_of[key]]
+            return (owners[0], column) if len(owners) == 1 else None
+        table = aliases.get(".".join(parts[:-1])) or aliases.get(parts[-2])
+        if table is None or column not in columns_of[table]:
+            return None
+        return table, column
+
+    return in_scope, resolve
+
+
+def analyze_index_usage(sql: str, tables: Dict[str, Dict[str, Any]]) -> IndexUsageReport:
+    """
+    Resolve columns used in WHERE and JOIN ... ON predicates of ``sql``
+    against ``tables`` (``llm_schema.json`` table entries keyed by
+    ``schema.table``) and mark those that lead an index. This is a
+    lightweight lexical analysis, not a planner: a predicate counts as a
+    hit when its column is the leading key of a B-tree/hash/BRIN index,
+    any key of a GIN/GiST index, or a primary-key column. Partial-index
+    predicates and expression keys are not matched against the query.
+    """
+    report = IndexUsageReport(sql=sql)
+    text = STRING_LITERAL.sub("''", sql)
+    in_scope, resolve = _column_resolver(text, tables)
+    if not in_scope:
+        return report
+
+    leading_of = {key: leading_index_columns(tables[key]) for key in in_scope}
+    seen = set()
+    for clause_match in PREDICATE_CLAUSE.finditer(text):
+        clause = "where" if clause_match.group(1).upper() == "WHERE" else "join"
+        for ref in COLUMN_REF.finditer(clause_match.group(2)):
+            resolved = resolve(ref.group(1))
+            if resolved is None or (*resolved, clause) in seen:
+                continue
+            seen.add((*resolved, clause))
+            table, column = resolved
+            report.predicates.append(PredicateColumn(
+                table=table, column=column, clause=clause, index=leading_of[table].get(column)
+            ))
+    return report
+
+
+def join_equalities(sql: str, tables: Dict[str, Dict[str, Any]]) -> List[Tuple[PredicateColumn, PredicateColumn]]:
+    """
+    Column-to-column equalities in JOIN ... ON clauses of ``sql``, as
+    resolved predicate pairs (each side marked with the index it leads,
+    like ``analyze_index_usage``). Sides that do not resolve to a known
+    column of a table in scope are skipped.
+    """
+    text = STRING_LITERAL.sub("''", sql)
+    in_scope, resolve = _column_resolver(text, tables)
+    if not in_scope:
+        return []
+
+    leading_of = {key: leading_index_columns(tables[key]) for key in in_scope}
+    pairs = []
+    for clause_match in PREDICATE_CLAUSE.finditer(text):
+        if clause_match.group(1).upper() != "ON":
+            continue
+        for equality in EQUALITY.finditer(clause_match.group(2)):
+            sides = [resolve(equality.group(1)), resolve(equality.group(2))]
+            if None in sides or sides[0][0] == sides[1][0]:
+                continue
+            pairs.append(tuple(
+                PredicateColumn(table=table, column=column, clause="join", index=leading_of[table].get(column))
+                for table, column in sides
+            ))
+    return pairs
+
+
+def summarize(reports: Iterable[IndexUsageReport]) -> Dict[str, Any]:
+    """Aggregate hit ratio plus the most common unindexed predicate columns."""
+    statements = total = hits = 0
+    misses: Counter = Counter()
+    for report in reports:
+        statements += 1
+        total += report.total
+        hits += report.hits
+        misses.update(f"{p.table}.{p.column}" for p in report.predicates if not p.indexed)
+    return {
+        "statements": statements,
+        "predicates": total,
+        "indexed_predicates": hits,
+        "hit_ratio": hits / total if total else None,
+        "top_unindexed": misses.most_common(10),
+    }
+
+
+def load_tables(schema_json_path: str) -> Dict[str, Dict[str, Any]]:
+    with open(schema_json_path, "r", encoding="utf-8") as f:
+        schemas = json.load(f)["schemas"]
+    return {
+        f"{schema_name}.{table_name}": table_info
+        for schema_name, schema_info in schemas.items()
+        for table_name, table_info in schema_info.get("tables", {}).items()
+    }
+
+
+def _iter_sql(path: str) -> Iterable[Tuple[str, str]]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if line.strip():
+                record = json.loads(line)
+                if record.get("sql"):
+                    yield str(record.get("id", line_no)), record["sql"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report how often generated SQL predicates hit an index.")
+    parser.add_argument("results", help="JSONL with a 'sql' field per line (e.g. batch_run.py output)")
+    parser.add_argument("--schema-json", default="data/llm_schema.json")
+    args = parser.parse_args()
+
+    schema_tables = load_tables(args.schema_json)
+    summary = summarize(analyze_index_usage(sql, schema_tables) for _, sql in _iter_sql(args.results))
+    ratio = summary["hit_ratio"]
+    print(f"[*] {summary['statements']} statements, {summary['predicates']} predicate columns, "
+          f"{summary['indexed_predicates']} indexed"
+          + (f" ({ratio:.1%})" if ratio is not None else ""))
+    for column, count in summary["top_unindexed"]:
+        print(f"    {count:>5}  {column}")
@@ -0,0 +1,202 @@
+# services/pipeline.py
+import asyncio
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel, Field
+
+from config.settings import settings
+from core.database import DatabaseConnection
+from core.exceptions import QueryRejectedError
+from LLMs.generate_sql import call_gpt_generate_sql
+from services.cost_gate import ROW_RETURNING, CostGate, CostGateDecision
+from services.guardrails import enforce_guardrails
+from services.query_executor import execute_sql, stream_sql
+from services.result_cache import ResultCache
+from utils.sql_fingerprint import normalize_sql
+
+
+class QuestionResult(BaseModel):
+    """Outcome of one question -> SQL -> rows run."""
+
+    question: str = Field(..., description="Question as asked")
+    sql: Optional[str] = Field(None, description="Generated SQL")
+    rows: List[Dict[str, Any]] = Field(default_factory=list, description="Result rows")
+    row_count: int = Field(default=0, description="Number of rows returned")
+    truncated: bool = Field(default=False, description="Whether rows were cut off at max_rows")
+    error: Optional[str] = Field(None, description="Error message if any stage failed")
+    generation_ms: float = Field(default=0.0, description="Time spent generating SQL")
+    execution_ms: float = Field(default=0.0, description="Time spent executing SQL")
+    estimated_cost: Optional[float] = Field(None, description="Planner's estimated total cost")
+    gate_action: Optional[str] = Field(None, description="Cost gate decision: allow, limit, background or reject")
+
+
+class AsyncLLMClient:
+    """
+    Async SQL generation. The blocking generator (caches, retriever and the
+    pooled HTTP client) runs on a dedicated thread pool, so many questions
+    can wait on the LLM at once without blocking the event loop.
+    """
+
+    def __init__(self, schema_json_path: str = "data/llm_schema.json", max_workers: int = 8):
+        self.schema_json_path = schema_json_path
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+
+    async def generate_sql(self, question: str) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, call_gpt_generate_sql, question, self.schema_json_path)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+class AsyncDatabase:
+    """
+    Async facade over DatabaseConnection. Queries run on a thread pool sized
+    to the connection pool, so at most ``max_workers`` connections are busy.
+    Expensive queries go to a separate background lane of
+    ``background_workers`` threads so they cannot starve interactive ones.
+    Each lane has its own per-query timeout (QUERY_TIMEOUT and
+    BACKGROUND_QUERY_TIMEOUT by default).
+    """
+
+    def __init__(self, db: DatabaseConnection, max_workers: Optional[int] = None, background_workers: int = 1,
+                 timeout: Optional[float] = None, background_timeout: Optional[float] = None,
+                 result_cache: Optional[ResultCache] = None):
+        self.db = db
+        self.result_cache = result_cache
+        self.max_workers = max_workers or db.config.pool_max_size
+        self.timeout = (timeout if timeout is not None else settings.query_timeout) or None
+        self.background_timeout = (
+            background_timeout if background_timeout is not None else settings.background_query_timeout
+        ) or None
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="db")
+        self._background = ThreadPoolExecutor(max_workers=background_workers, thread_name_prefix="db-background")
+
+    def _fetch(self, sql: str, max_rows: Optional[int], timeout: Optional[float]) -> Tuple[List[Dict[str, Any]], bool]:
+        if self.result_cache is not None:
+            return self.result_cache.get_or_fetch(sql, lambda: self._query(sql, max_rows, timeout), variant=max_rows)
+        return self._query(sql, max_rows, timeout), False
+
+    def _query(self, sql: str, max_rows: Optional[int], timeout: Optional[float]) -> List[Dict[str, Any]]:
+        if max_rows is None or not ROW_RETURNING.match(normalize_sql(sql)):
+            # Named cursors only take row-returning statements.
+            return execute_sql(sql, self.db, timeout=timeout)
+        # One row past the limit tells the caller the result was truncated.
+        rows = stream_sql(sql, self.db, itersize=min(max_rows + 1, 2000), timeout=timeout)
+        try:
+            return list(itertools.islice(rows, max_rows + 1))
+        finally:
+            rows.close()
+
+    async def fetch(self, sql: str, max_rows: Optional[int] = None,
+                    background: bool = False) -> Tuple[List[Dict[str, Any]], bool]:
+        """Rows of ``sql`` (up to one past ``max_rows``) and whether they came from the result cache."""
+        loop = asyncio.get_running_loop()
+        if background:
+            return await loop.run_in_executor(self._background, self._fetch, sql, max_rows, self.background_timeout)
+        return await loop.run_in_executor(self._executor, self._fetch, sql, max_rows, self.timeout)
+
+    async def execute(self, sql: str, max_rows: Optional[int] = None, background: bool = False) -> List[Dict[str, Any]]:
+        rows, _ = await self.fetch(sql, max_rows, background=background)
+        return rows
+
+    async def call(self, fn, *args):
+        """Run another blocking database call (e.g. EXPLAIN) on the query pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._background.shutdown(wait=True)
+
+
+class AsyncPipeline:
+    """
+    Bounded-concurrency question -> SQL -> rows pipeline. Up to
+    ``max_concurrency`` questions are in flight at once, so N questions
+    finish in roughly the slowest one's latency rather than the sum.
+    Use ``ask``/``ask_many`` from async code (e.g. a server) and ``run``
+    from synchronous code such as a batch job. Results are served from
+    ``result_cache`` when one is given.
+    """
+
+    def __init__(self, db: DatabaseConnection, schema_json_path: str = "data/llm_schema.json",
+                 max_concurrency: int = 8, llm_workers: Optional[int] = None, db_workers: Optional[int] = None,
+                 max_rows: Optional[int] = None, result_cache: Optional[ResultCache] = None):
+        self.llm = AsyncLLMClient(schema_json_path, max_workers=llm_workers or max_concurrency)
+        self.result_cache = result_cache
+        self.database = AsyncDatabase(db, max_workers=db_workers, result_cache=self.result_cache)
+        self.cost_gate = CostGate(db)
+        self.max_concurrency = max_concurrency
+        self.max_rows = max_rows
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # A semaphore is bound to the loop it is first used on.
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def check(self, sql: str) -> CostGateDecision:
+        """Guardrails, then the cost gate; raises QueryRejectedError if either refuses ``sql``."""
+        loop = asyncio.get_running_loop()
+        # Guardrails read the schema file and parse the SQL; keep both off the event loop.
+        await loop.run_in_executor(None, enforce_guardrails, sql, self.llm.schema_json_path)
+        return await self.database.call(self.cost_gate.enforce, sql)
+
+    async def ask(self, question: str, execute: bool = True) -> QuestionResult:
+        result = QuestionResult(question=question)
+        async with self._get_semaphore():
+            started = time.perf_counter()
+            try:
+                result.sql = await self.llm.generate_sql(question)
+            except Exception as e:
+                result.error = f"SQL generation failed: {e}"
+                return result
+            finally:
+                result.generation_ms = (time.perf_counter() - started) * 1000
+
+            if not execute:
+                return result
+
+            started = time.perf_counter()
+            try:
+                decision = await self.check(result.sql)
+                result.gate_action = decision.action
+                result.estimated_cost = decision.plan.total_cost if decision.plan else None
+                rows = await self.database.execute(decision.sql, self.max_rows, background=decision.background)
+            except QueryRejectedError as e:
+                if any(reason.get("rule") == "cost_gate" for reason in e.reasons):
+                    result.gate_action = "reject"
+                result.error = f"SQL rejected: {e}"
+                return result
+            except Exception as e:
+                result.error = f"SQL execution failed: {e}"
+                return result
+            finally:
+                result.execution_ms = (time.perf_counter() - started) * 1000
+
+        if self.max_rows is not None and len(rows) > self.max_rows:
+            rows = rows[:self.max_rows]
+            result.truncated = True
+        result.rows = rows
+        result.row_count = len(rows)
+        return result
+
+    async def ask_many(self, questions: Sequence[str], execute: bool = True) -> List[QuestionResult]:
+        """Answer questions concurrently; results come back in input order."""
+        return list(await asyncio.gather(*(self.ask(q, execute=execute) for q in questions)))
+
+    def run(self, questions: Sequence[str], execute: bool = True) -> List[QuestionResult]:
+        """Synchronous entry point for callers without an event loop."""
+        return asyncio.run(self.ask_many(questions, execute=execute))
+
+    def close(self):
+        self.llm.close()
+        self.database.close()
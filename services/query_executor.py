@@ -1,11 +1,203 @@
 # services/query_executor.py
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.extras
+
+from core.columnar import ColumnarResult
 from core.database import DatabaseConnection
+from core.exceptions import QueryCancelledError, QueryTimeoutError
+from utils.telemetry import telemetry
+
+DEFAULT_ITERSIZE = 2000
+
+
+def enable_interrupt_cancel():
+    """
+    Make Ctrl-C cancel the running statement on the server. psycopg2 then
+    waits on sockets in Python, so KeyboardInterrupt reaches a blocked
+    query; it sends a cancel request and the query raises
+    QueryCancelledError. The wait callback is process-wide: once it is
+    installed, every connection in the process waits through it and COPY
+    (e.g. export_query) fails for every other caller too, so only
+    single-purpose interactive entry points should call it.
+    """
+    psycopg2.extensions.set_wait_callback(psycopg2.extras.wait_select)
+
+
+def _remaining(timeout: Optional[float], deadline: Optional[float]) -> Optional[float]:
+    """Seconds left under ``timeout`` and the absolute ``deadline`` (time.monotonic())."""
+    candidates = [t for t in (timeout, deadline - time.monotonic() if deadline is not None else None) if t is not None]
+    return min(candidates) if candidates else None
+
+
+class _Watchdog:
+    """Sends a server-side cancel for ``connection`` once ``seconds`` elapse."""
+
+    def __init__(self, connection: psycopg2.extensions.connection, seconds: float):
+        self.connection = connection
+        self.fired = False
+        self._active = True
+        self._lock = threading.Lock()
+        self._timer = threading.Timer(seconds, self._fire)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _fire(self):
+        with self._lock:
+            # Never cancel after stop(): the connection may already serve another query.
+            if not self._active:
+                return
+            self.fired = True
+            try:
+                self.connection.cancel()
+            except psycopg2.Error:
+                pass
 
-def execute_sql(sql: str, db: DatabaseConnection):
-    with db.get_connection(use_real_dict_cursor=False) as conn:  
-        with conn.cursor() as cur:
-            cur.execute(sql)
-            rows = cur.fetchall()
-            columns = [desc[0] for desc in cur.description]
-            results = [dict(zip(columns, row)) for row in rows]
+    def stop(self):
+        with self._lock:
+            self._active = False
+        self._timer.cancel()
+
+
+@contextmanager
+def _guarded(conn: psycopg2.extensions.connection, timeout: Optional[float], deadline: Optional[float],
+             transaction: bool = False):
+    """
+    Run the body under ``statement_timeout`` set to the time left, and a
+    watchdog that cancels the server-side statement when the whole call
+    overruns. The timeout is transaction-local, so a transaction is opened
+    (and committed when the body finishes) only when a limit applies or
+    ``transaction`` asks for one, e.g. for named cursors; otherwise the
+    connection stays in autocommit and statements that refuse to run in a
+    transaction block (CREATE INDEX CONCURRENTLY, VACUUM) still work.
+    Cancellations surface as QueryTimeoutError or QueryCancelledError with
+    any transaction rolled back, so the pool gets the connection back clean.
+    """
+    remaining = _remaining(timeout, deadline)
+    if remaining is not None and remaining <= 0:
+        telemetry.increment("queries_timed_out")
+        raise QueryTimeoutError("Query deadline expired before execution")
+
+    in_transaction = transaction or remaining is not None
+    if in_transaction:
+        conn.autocommit = False
+    watchdog = None
+    try:
+        if remaining is not None:
+            with conn.cursor() as cur:
+                # SET LOCAL semantics: the timeout ends with the transaction.
+                cur.execute("SELECT set_config('statement_timeout', %s, true)", (f"{max(1, int(remaining * 1000))}ms",))
+            watchdog = _Watchdog(conn, remaining)
+        yield
+        if in_transaction:
+            conn.commit()
+    except psycopg2.extensions.QueryCanceledError as e:
+        conn.rollback()
+        timed_out = (watchdog is not None and watchdog.fired) or "statement timeout" in str(e)
+        if timed_out:
+            telemetry.increment("queries_timed_out")
+            if remaining is None:
+                # A server, role or database statement_timeout, not ours.
+                raise QueryTimeoutError("Query exceeded the server statement_timeout") from e
+            raise QueryTimeoutError(f"Query exceeded its {remaining:.1f}s time limit") from e
+        telemetry.increment("queries_cancelled")
+        raise QueryCancelledError("Query was cancelled") from e
+    except KeyboardInterrupt:
+        telemetry.increment("queries_cancelled")
+        raise
+    finally:
+        if watchdog is not None:
+            watchdog.stop()
+
+
+def execute_sql(sql: str, db: DatabaseConnection, timeout: Optional[float] = None,
+                deadline: Optional[float] = None):
+    """
+    Run ``sql`` and return all rows as dicts, or an empty list for
+    statements that return no rows. ``timeout`` bounds this call in seconds
+    and ``deadline`` is an absolute ``time.monotonic()`` time; the earlier
+    of the two wins.
+    """
+    with db.get_connection(use_real_dict_cursor=False) as conn:
+        with _guarded(conn, timeout, deadline):
+            with conn.cursor() as cur:
+                cur.execute(sql)
+                if cur.description is None:
+                    rows, columns = [], []
+                else:
+                    rows = cur.fetchall()
+                    columns = [desc[0] for desc in cur.description]
+        results = [dict(zip(columns, row)) for row in rows]
     return results
+
+
+def execute_columnar(sql: str, db: DatabaseConnection, timeout: Optional[float] = None,
+                     deadline: Optional[float] = None, batch_size: int = 10_000) -> ColumnarResult:
+    """
+    Run ``sql`` and return a ColumnarResult. Rows come through a named
+    server-side cursor ``batch_size`` at a time and each batch is turned
+    into column arrays immediately, so the whole result never exists as
+    Python tuples or dicts.
+    """
+    with db.get_connection(use_real_dict_cursor=False) as conn:
+        with _guarded(conn, timeout, deadline, transaction=True):
+            with conn.cursor() as cur:
+                # timestamptz text in UTC takes the vectorized parsing path.
+                cur.execute("SET LOCAL TimeZone = 'UTC'")
+            with conn.cursor(name=f"columnar_{uuid.uuid4().hex}") as cur:
+                cur.execute(sql)
+                result = ColumnarResult.from_cursor(cur, batch_size=batch_size)
+    return result
+
+
+def stream_sql(
+    sql: str,
+    db: DatabaseConnection,
+    itersize: int = DEFAULT_ITERSIZE,
+    batch_size: Optional[int] = None,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
+) -> Iterator[Union[Dict[str, Any], List[Dict[str, Any]]]]:
+    """Lazily yield query results through a named server-side cursor.
+
+    Rows are pulled from PostgreSQL ``itersize`` at a time (``batch_size`` at a
+    time when batching), so client memory stays bounded regardless of result
+    size. Yields one dict per row, or lists of up to ``batch_size`` dicts when
+    ``batch_size`` is given. The pooled connection is held until the
+    generator is exhausted or closed. Only row-returning statements (SELECT,
+    WITH, VALUES, TABLE) can run through a named cursor.
+    ``timeout``/``deadline`` bound the whole stream, including time the
+    consumer spends between rows.
+    """
+    if itersize < 1:
+        raise ValueError("itersize must be a positive integer")
+
+    if timeout is not None and deadline is None:
+        deadline = time.monotonic() + timeout
+    with db.get_connection(use_real_dict_cursor=False) as conn:
+        # Named cursors only live inside a transaction; if the consumer stops
+        # early, the pool rolls it back and restores autocommit.
+        with _guarded(conn, None, deadline, transaction=True):
+            with conn.cursor(name=f"stream_{uuid.uuid4().hex}") as cur:
+                cur.execute(sql)
+                columns = None
+                while True:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        telemetry.increment("queries_timed_out")
+                        raise QueryTimeoutError("Query deadline expired while streaming results")
+                    rows = cur.fetchmany(batch_size or itersize)
+                    if not rows:
+                        break
+                    if columns is None:
+                        columns = [desc[0] for desc in cur.description]
+                    if batch_size:
+                        yield [dict(zip(columns, row)) for row in rows]
+                    else:
+                        for row in rows:
+                            yield dict(zip(columns, row))
@@ -0,0 +1,237 @@
+# services/result_cache.py
+import logging
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from config.settings import settings
+from core.database import DatabaseConnection
+from services.cost_gate import ROW_RETURNING
+from services.index_usage import IDENT, STRING_LITERAL, _unquote
+from utils.sql_fingerprint import normalize_sql, sql_fingerprint
+
+logger = logging.getLogger(__name__)
+
+IDENTIFIER = re.compile(IDENT)
+# Set-returning functions in FROM/JOIN may read any table.
+FROM_FUNCTION = re.compile(rf"\b(?:from|join)\s+(?:{IDENT}\s*\.\s*)?{IDENT}\s*\(", re.IGNORECASE)
+# Statements whose result can differ between runs without any table changing, or that write.
+UNCACHEABLE = re.compile(
+    r"\b(?:now|random|clock_timestamp|statement_timestamp|timeofday|nextval|setval|gen_random_uuid|txid_current"
+    r"|pg_sleep|current_date|current_time|current_timestamp|localtime|localtimestamp|current_user|session_user"
+    r"|insert|update|delete|merge|into|for\s+(?:update|share|no\s+key\s+update|key\s+share))\b"
+    r"|\buuid_generate_\w+|\bpg_\w+|\binformation_schema\b",
+    re.IGNORECASE,
+)
+
+# Every user relation; only plain tables have change counters, the rest
+# (views, materialized views, foreign and partitioned tables) get NULLs.
+RELATION_VERSIONS_QUERY = """
+    SELECT n.nspname, c.relname, s.n_tup_ins, s.n_tup_upd, s.n_tup_del, c.relfilenode
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid AND c.relkind = 'r'
+    WHERE c.relkind IN ('r', 'p', 'v', 'm', 'f')
+      AND n.nspname NOT IN ('information_schema', 'pg_catalog')
+      AND n.nspname NOT LIKE 'pg\\_%%'
+"""
+
+TableKey = Tuple[str, str]
+
+
+class _Entry:
+    __slots__ = ("blob", "tables", "size")
+
+    def __init__(self, blob: bytes, tables: FrozenSet[TableKey]):
+        self.blob = blob
+        self.tables = tables
+        self.size = len(blob)
+
+
+class ResultCache:
+    """
+    Size-bounded LRU cache of query results keyed by the normalized SQL
+    fingerprint (plus a caller-chosen variant such as the row limit).
+
+    Results are stored as one pickled ``(columns, row tuples)`` blob, so
+    ``bytes_held`` is the real cost of an entry. An entry is dropped as
+    soon as a table it may read changes: table names found anywhere in the
+    statement are matched against ``pg_stat_user_tables``, whose
+    insert/update/delete counters (and the relfilenode, for TRUNCATE) are
+    polled at most every ``poll_interval`` seconds on lookup. A writer's
+    counters become visible when its backend flushes statistics: at
+    commit, or up to 10 seconds later on PostgreSQL 15+ when it flushed
+    less than a second before. A cached result can therefore be stale
+    for up to ``poll_interval`` plus that delay. Statements that read anything
+    other than plain user tables (views, functions, catalogs) or call
+    volatile functions are never cached.
+    """
+
+    def __init__(self, db: DatabaseConnection, max_bytes: Optional[int] = None,
+                 poll_interval: Optional[float] = None, max_entry_fraction: float = 0.25):
+        self.db = db
+        self.max_bytes = int(settings.result_cache_max_mb * 2**20) if max_bytes is None else max_bytes
+        self.poll_interval = settings.result_cache_poll_interval if poll_interval is None else poll_interval
+        self.max_entry_bytes = int(self.max_bytes * max_entry_fraction)
+
+        self._entries: "OrderedDict[Tuple[str, Any], _Entry]" = OrderedDict()
+        self._by_table: Dict[TableKey, Set[Tuple[str, Any]]] = defaultdict(set)
+        self._versions: Dict[TableKey, Tuple[int, int, int, int]] = {}
+        self._by_name: Dict[str, List[TableKey]] = defaultdict(list)
+        self._untracked: Set[str] = set()
+        self._changed_at: Dict[TableKey, int] = {}
+        self._generation = 0
+        self._polled_at = float("-inf")
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+
+        self.bytes_held = 0
+        self.hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @property
+    def hit_ratio(self) -> Optional[float]:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+    def _poll(self):
+        """Refresh table versions and drop entries of tables that changed since the last poll."""
+        if time.monotonic() - self._polled_at < self.poll_interval:
+            return
+        with self._poll_lock:
+            if time.monotonic() - self._polled_at < self.poll_interval:
+                return
+            with self.db.get_connection(use_real_dict_cursor=False) as conn:
+                with conn.cursor() as cur:
+                    cur.execute(RELATION_VERSIONS_QUERY)
+                    rows = cur.fetchall()
+            versions = {(row[0], row[1]): tuple(row[2:]) for row in rows if row[2] is not None}
+            untracked = {row[1] for row in rows if row[2] is None}
+            self._polled_at = time.monotonic()
+
+            with self._lock:
+                changed = [key for key, version in versions.items() if self._versions.get(key) != version]
+                changed += [key for key in self._versions if key not in versions]
+                if self._versions:
+                    self._generation += 1
+                    for key in changed:
+                        self._changed_at[key] = self._generation
+                        for cache_key in list(self._by_table.get(key, ())):
+                            self._remove(cache_key)
+                            self.invalidations += 1
+                if changed or not self._by_name:
+                    self._by_name = defaultdict(list)
+                    for key in versions:
+                        self._by_name[key[1]].append(key)
+                self._versions = versions
+                self._untracked = untracked
+
+    def referenced_tables(self, sql: str) -> Optional[FrozenSet[TableKey]]:
+        """
+        User tables ``sql`` may read, or None if it is not safe to cache.
+        Deliberately over-approximate: any identifier naming a table counts
+        (so a column sharing a table's name only costs extra invalidations),
+        while a view, partitioned/foreign table, catalog or FROM-clause
+        function makes the statement uncacheable.
+        """
+        text = normalize_sql(STRING_LITERAL.sub("''", sql))
+        if not ROW_RETURNING.match(text) or UNCACHEABLE.search(text) or FROM_FUNCTION.search(text):
+            return None
+        tables = set()
+        for token in IDENTIFIER.findall(text):
+            name = _unquote(token)
+            if name in self._untracked:
+                return None
+            tables.update(self._by_name.get(name, ()))
+        return frozenset(tables) if tables else None
+
+    def _remove(self, cache_key: Tuple[str, Any]):
+        entry = self._entries.pop(cache_key, None)
+        if entry is None:
+            return
+        self.bytes_held -= entry.size
+        for table in entry.tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(cache_key)
+                if not keys:
+                    del self._by_table[table]
+
+    def get_or_fetch(self, sql: str, fetch: Callable[[], List[Dict[str, Any]]],
+                     variant: Any = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """``(rows, hit)``: cached rows for ``sql`` or the result of ``fetch()``, cached if eligible."""
+        if not self.enabled:
+            return fetch(), False
+        self._poll()
+        cache_key = (sql_fingerprint(sql), variant)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                blob = entry.blob
+            else:
+                blob = None
+                tables = self.referenced_tables(sql)
+                if tables is None:
+                    self.uncacheable += 1
+                else:
+                    self.misses += 1
+                generation = self._generation
+        if blob is not None:
+            columns, rows = pickle.loads(blob)
+            return [dict(zip(columns, row)) for row in rows], True
+
+        rows = fetch()
+        if tables is None:
+            return rows, False
+
+        columns = list(rows[0].keys()) if rows else []
+        blob = pickle.dumps((columns, [tuple(row.values()) for row in rows]), protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_entry_bytes:
+            return rows, False
+        with self._lock:
+            # A table changed while the query ran: its result may predate the change.
+            if any(self._changed_at.get(table, 0) > generation for table in tables):
+                return rows, False
+            self._remove(cache_key)
+            entry = _Entry(blob, tables)
+            self._entries[cache_key] = entry
+            self.bytes_held += entry.size
+            for table in tables:
+                self._by_table[table].add(cache_key)
+            while self.bytes_held > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return rows, False
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+            self.bytes_held = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes_held": self.bytes_held,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "uncacheable": self.uncacheable,
+                "hit_ratio": self.hit_ratio,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
@@ -1,26 +1,393 @@
 # services/schema_extractor.py
 from core.models import TableInfo, ColumnInfo, ForeignKeyInfo, IndexInfo,CheckConstraintInfo, DatabaseSchema
 from core.database import DatabaseConnection
-from typing import Dict, Optional, List
+from typing import Any, Dict, Iterable, Mapping, Optional, List, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import heapq
+import time
+
+from pydantic import BaseModel, Field
+
+
+# One document per table, built server-side straight from the catalogs.
+# Each part is aggregated set-wise per relation and joined once, rather
+# than as per-table correlated subqueries. Type and length expressions
+# mirror information_schema.columns, with its _pg_* helpers inlined (they
+# take whole-row arguments and are not inlined by the planner), so both
+# backends report the same values. Requires PostgreSQL 12+.
+TABLES_CTE = """
+    tbl AS (
+        SELECT c.oid, c.relfilenode, n.nspname, c.relname
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relkind IN ('r', 'p')
+          AND c.relpersistence <> 't'
+          AND n.nspname NOT IN ('information_schema', 'pg_catalog')
+          AND n.nspname NOT LIKE 'pg\\_toast%%'
+          {table_filter}
+    )"""
+
+PG_CATALOG_QUERY = """
+    WITH""" + TABLES_CTE + """,
+    cols AS (
+        SELECT a.attrelid, json_agg(json_build_object(
+            'column_name', a.attname,
+            'data_type', CASE
+                WHEN t.typtype = 'd' THEN CASE
+                    WHEN bt.typelem <> 0 AND bt.typlen = -1 THEN 'ARRAY'
+                    WHEN nbt.nspname = 'pg_catalog' THEN format_type(t.typbasetype, NULL)
+                    ELSE 'USER-DEFINED' END
+                ELSE CASE
+                    WHEN t.typelem <> 0 AND t.typlen = -1 THEN 'ARRAY'
+                    WHEN nt.nspname = 'pg_catalog' THEN format_type(a.atttypid, NULL)
+                    ELSE 'USER-DEFINED' END
+                END,
+            'is_nullable', NOT (a.attnotnull OR (t.typtype = 'd' AND t.typnotnull)),
+            'column_default', CASE WHEN a.attgenerated = '' THEN pg_get_expr(ad.adbin, ad.adrelid) END,
+            'character_maximum_length', CASE
+                WHEN tt.typmod = -1 THEN NULL
+                WHEN tt.typid IN (1042, 1043) THEN tt.typmod - 4
+                WHEN tt.typid IN (1560, 1562) THEN tt.typmod
+                END,
+            'numeric_precision', CASE tt.typid
+                WHEN 21 THEN 16 WHEN 23 THEN 32 WHEN 20 THEN 64
+                WHEN 1700 THEN CASE WHEN tt.typmod <> -1 THEN ((tt.typmod - 4) >> 16) & 65535 END
+                WHEN 700 THEN 24 WHEN 701 THEN 53
+                END,
+            'numeric_scale', CASE
+                WHEN tt.typid IN (21, 23, 20) THEN 0
+                WHEN tt.typid = 1700 AND tt.typmod <> -1 THEN (tt.typmod - 4) & 65535
+                END,
+            'is_primary_key', coalesce(a.attnum = ANY(pk.conkey), false)
+        ) ORDER BY a.attnum) AS columns
+        FROM tbl
+        JOIN pg_attribute a ON a.attrelid = tbl.oid AND a.attnum > 0 AND NOT a.attisdropped
+        JOIN pg_type t ON t.oid = a.atttypid
+        JOIN pg_namespace nt ON nt.oid = t.typnamespace
+        -- information_schema._pg_truetypid/_pg_truetypmod, inlined
+        CROSS JOIN LATERAL (SELECT
+            CASE WHEN t.typtype = 'd' THEN t.typbasetype ELSE a.atttypid END AS typid,
+            CASE WHEN t.typtype = 'd' THEN t.typtypmod ELSE a.atttypmod END AS typmod
+        ) tt
+        LEFT JOIN (pg_type bt JOIN pg_namespace nbt ON nbt.oid = bt.typnamespace)
+            ON t.typtype = 'd' AND bt.oid = t.typbasetype
+        LEFT JOIN pg_attrdef ad ON ad.adrelid = a.attrelid AND ad.adnum = a.attnum
+        LEFT JOIN pg_constraint pk ON pk.conrelid = a.attrelid AND pk.contype = 'p'
+        GROUP BY a.attrelid
+    ),
+    fks AS (
+        SELECT con.conrelid, json_agg(json_build_object(
+            'constraint_name', con.conname,
+            'column_name', att1.attname,
+            'referenced_table_schema', fn.nspname,
+            'referenced_table_name', fc.relname,
+            'referenced_column_name', att2.attname
+        ) ORDER BY con.conname, k.ord) AS foreign_keys
+        FROM tbl
+        JOIN pg_constraint con ON con.conrelid = tbl.oid AND con.contype = 'f'
+        CROSS JOIN LATERAL unnest(con.conkey, con.confkey) WITH ORDINALITY AS k(attnum, foreign_attnum, ord)
+        JOIN pg_attribute att1 ON att1.attrelid = con.conrelid AND att1.attnum = k.attnum
+        JOIN pg_class fc ON fc.oid = con.confrelid
+        JOIN pg_namespace fn ON fn.oid = fc.relnamespace
+        JOIN pg_attribute att2 ON att2.attrelid = con.confrelid AND att2.attnum = k.foreign_attnum
+        GROUP BY con.conrelid
+    ),
+    idx AS (
+        SELECT i.indrelid, json_agg(json_build_object(
+            'index_name', ic.relname,
+            'is_unique', i.indisunique,
+            'is_primary', i.indisprimary,
+            'columns', (
+                SELECT json_agg(coalesce(ka.attname, pg_get_indexdef(i.indexrelid, k.n, true)) ORDER BY k.n)
+                FROM generate_series(1, i.indnkeyatts) AS k(n)
+                LEFT JOIN pg_attribute ka ON ka.attrelid = i.indrelid AND ka.attnum = i.indkey[k.n - 1]
+            ),
+            'index_type', am.amname,
+            'predicate', pg_get_expr(i.indpred, i.indrelid, true),
+            'include_columns', coalesce((
+                SELECT json_agg(ka.attname ORDER BY k.n)
+                FROM generate_series(i.indnkeyatts + 1, i.indnatts) AS k(n)
+                JOIN pg_attribute ka ON ka.attrelid = i.indrelid AND ka.attnum = i.indkey[k.n - 1]
+            ), '[]')
+        ) ORDER BY ic.relname) AS indexes
+        FROM tbl
+        JOIN pg_index i ON i.indrelid = tbl.oid
+        JOIN pg_class ic ON ic.oid = i.indexrelid
+        JOIN pg_am am ON am.oid = ic.relam
+        GROUP BY i.indrelid
+    ),
+    chk AS (
+        SELECT cc.conrelid, json_agg(json_build_object(
+            'constraint_name', cc.conname,
+            'check_clause', pg_get_constraintdef(cc.oid, true)
+        ) ORDER BY cc.conname) AS check_constraints
+        FROM tbl
+        JOIN pg_constraint cc ON cc.conrelid = tbl.oid AND cc.contype = 'c'
+        GROUP BY cc.conrelid
+    )
+    SELECT json_build_object(
+        'schema_name', tbl.nspname,
+        'table_name', tbl.relname,
+        'columns', coalesce(cols.columns, '[]'),
+        'foreign_keys', coalesce(fks.foreign_keys, '[]'),
+        'indexes', coalesce(idx.indexes, '[]'),
+        'check_constraints', coalesce(chk.check_constraints, '[]')
+    ) AS doc
+    FROM tbl
+    LEFT JOIN cols ON cols.attrelid = tbl.oid
+    LEFT JOIN fks ON fks.conrelid = tbl.oid
+    LEFT JOIN idx ON idx.indrelid = tbl.oid
+    LEFT JOIN chk ON chk.conrelid = tbl.oid
+    ORDER BY tbl.nspname, tbl.relname
+"""
+
+# Per-table change fingerprint: identity (oid, relfilenode, name) plus the
+# attribute, constraint and index definitions that feed a TableInfo.
+FINGERPRINT_QUERY = """
+    WITH""" + TABLES_CTE + """,
+    att AS (
+        SELECT a.attrelid, string_agg(concat_ws(':',
+            a.attnum, a.attname, a.atttypid, a.atttypmod, a.attnotnull, a.attgenerated,
+            pg_get_expr(ad.adbin, ad.adrelid)
+        ), ',' ORDER BY a.attnum) AS definition
+        FROM tbl
+        JOIN pg_attribute a ON a.attrelid = tbl.oid AND a.attnum > 0 AND NOT a.attisdropped
+        LEFT JOIN pg_attrdef ad ON ad.adrelid = a.attrelid AND ad.adnum = a.attnum
+        GROUP BY a.attrelid
+    ),
+    con AS (
+        SELECT con.conrelid, string_agg(con.conname || ':' || pg_get_constraintdef(con.oid), ','
+            ORDER BY con.conname) AS definition
+        FROM tbl
+        JOIN pg_constraint con ON con.conrelid = tbl.oid
+        GROUP BY con.conrelid
+    ),
+    idx AS (
+        SELECT i.indrelid, string_agg(pg_get_indexdef(i.indexrelid), ',' ORDER BY i.indexrelid) AS definition
+        FROM tbl
+        JOIN pg_index i ON i.indrelid = tbl.oid
+        GROUP BY i.indrelid
+    )
+    SELECT
+        tbl.oid,
+        tbl.nspname AS schema_name,
+        tbl.relname AS table_name,
+        md5(concat_ws('|', tbl.oid, tbl.relfilenode, tbl.nspname, tbl.relname,
+                      att.definition, con.definition, idx.definition)) AS fingerprint
+    FROM tbl
+    LEFT JOIN att ON att.attrelid = tbl.oid
+    LEFT JOIN con ON con.conrelid = tbl.oid
+    LEFT JOIN idx ON idx.indrelid = tbl.oid
+"""
+
+BACKENDS = ("pg_catalog", "information_schema")
+
+
+class IncrementalExtractionReport(BaseModel):
+    """What an incremental extraction found and what it cost."""
+
+    added: List[str] = Field(default_factory=list, description="Tables new since the previous snapshot")
+    changed: List[str] = Field(default_factory=list, description="Tables whose fingerprint changed")
+    removed: List[str] = Field(default_factory=list, description="Tables dropped since the previous snapshot")
+    unchanged: int = Field(default=0, description="Tables reused from the previous snapshot")
+    elapsed_seconds: float = Field(default=0.0, description="Duration of the incremental run")
+    full_extraction_seconds: Optional[float] = Field(None, description="Duration of the last full extraction")
+
+    @property
+    def time_saved_seconds(self) -> Optional[float]:
+        """Time saved versus the last full extraction, when it is known."""
+        if self.full_extraction_seconds is None:
+            return None
+        return self.full_extraction_seconds - self.elapsed_seconds
 
 
 class SchemaExtractor:
-    def __init__(self, db: DatabaseConnection):
+    """
+    Reads table, column, key, index and check-constraint metadata into a
+    DatabaseSchema. The default ``pg_catalog`` backend builds one JSON
+    document per table server-side and fetches the whole catalog with a
+    single statement, which also makes it one consistent snapshot. The
+    ``information_schema`` backend issues the original three queries plus
+    one over pg_index and one over ``information_schema.check_constraints``.
+    """
+
+    def __init__(self, db: DatabaseConnection, backend: str = "pg_catalog"):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown extraction backend '{backend}'; expected one of {BACKENDS}")
         self.db = db
+        self.backend = backend
+
+    def extract_schema(self, schemas: Optional[List[str]] = None,
+                       max_workers: Optional[int] = None) -> DatabaseSchema:
+        """
+        Extract every base table (optionally only in ``schemas``). With
+        ``max_workers`` > 1 the schemas are sharded across that many pooled
+        connections and extracted concurrently; see ``_extract_parallel``.
+        """
+        workers = min(max_workers or 1, self.db.config.pool_max_size - 1)
+        if workers > 1:
+            return self._extract_parallel(schemas, workers)
+        return self._extract_shard(schemas)
+
+    def _extract_shard(self, schemas: Optional[List[str]] = None, snapshot: Optional[str] = None) -> DatabaseSchema:
+        if self.backend == "pg_catalog":
+            return self._extract_pg_catalog(schemas, snapshot=snapshot)
+        return self._extract_information_schema(schemas, snapshot=snapshot)
+
+    @contextmanager
+    def _connection(self, snapshot: Optional[str] = None):
+        """A pooled connection, inside a read-only transaction on ``snapshot`` if given."""
+        with self.db.get_connection() as conn:
+            if snapshot is None:
+                yield conn
+                return
+            cursor = conn.cursor()
+            cursor.execute("BEGIN ISOLATION LEVEL REPEATABLE READ READ ONLY")
+            cursor.execute("SET TRANSACTION SNAPSHOT %s", (snapshot,))
+            yield conn
+            cursor.execute("COMMIT")
+
+    @staticmethod
+    def _shard_schemas(table_counts: Dict[str, int], n_shards: int) -> List[List[str]]:
+        """Greedily balance schemas into ``n_shards`` groups by table count."""
+        shards: List[Tuple[int, int, List[str]]] = [(0, i, []) for i in range(n_shards)]
+        for schema, count in sorted(table_counts.items(), key=lambda item: -item[1]):
+            total, i, members = heapq.heappop(shards)
+            members.append(schema)
+            heapq.heappush(shards, (total + count, i, members))
+        return [members for _, _, members in sorted(shards, key=lambda shard: shard[1]) if members]
+
+    def _extract_parallel(self, schemas: Optional[List[str]], max_workers: int) -> DatabaseSchema:
+        """
+        Coordinator/worker extraction in the style of ``pg_dump -j``. The
+        coordinator opens a repeatable-read transaction, exports its
+        snapshot and sizes each schema. Schema shards then run on up to
+        ``max_workers`` pooled connections that import the same snapshot,
+        so the merged result is as consistent as a serial extraction.
+        """
+        table_filter, params = self._table_filter(schemas)
+        with self.db.get_connection() as coordinator:
+            cursor = coordinator.cursor()
+            cursor.execute("BEGIN ISOLATION LEVEL REPEATABLE READ READ ONLY")
+            cursor.execute("SELECT pg_export_snapshot() AS snapshot")
+            snapshot = cursor.fetchone()['snapshot']
+            cursor.execute(
+                "WITH" + TABLES_CTE.format(table_filter=table_filter)
+                + " SELECT nspname, count(*) AS tables FROM tbl GROUP BY nspname",
+                params,
+            )
+            table_counts = {row['nspname']: row['tables'] for row in cursor}
+            if not table_counts:
+                cursor.execute("COMMIT")
+                return DatabaseSchema()
+
+            # One balanced shard per worker: each shard query carries fixed
+            # catalog-scan overhead (large for information_schema views).
+            shards = self._shard_schemas(table_counts, min(len(table_counts), max_workers))
+            tables: Dict[str, TableInfo] = {}
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="extract") as executor:
+                for shard in executor.map(lambda names: self._extract_shard(names, snapshot), shards):
+                    tables.update(shard.tables)
+            cursor.execute("COMMIT")
+
+        return DatabaseSchema(tables=dict(sorted(tables.items())))
 
-    def extract_schema(self, schemas: Optional[List[str]] = None) -> DatabaseSchema:
+    @staticmethod
+    def _table_filter(schemas: Optional[List[str]] = None,
+                      table_oids: Optional[List[int]] = None) -> Tuple[str, List[Any]]:
+        table_filter = ""
+        params: List[Any] = []
+        if schemas:
+            table_filter += " AND n.nspname = ANY(%s)"
+            params.append(schemas)
+        if table_oids is not None:
+            table_filter += " AND c.oid = ANY(%s::oid[])"
+            params.append(table_oids)
+        return table_filter, params
+
+    def _extract_pg_catalog(self, schemas: Optional[List[str]] = None,
+                            table_oids: Optional[List[int]] = None,
+                            snapshot: Optional[str] = None) -> DatabaseSchema:
+        table_filter, params = self._table_filter(schemas, table_oids)
+        with self._connection(snapshot) as conn:
+            cursor = conn.cursor()
+            cursor.execute(PG_CATALOG_QUERY.format(table_filter=table_filter), params)
+            return self._assemble_documents(row['doc'] for row in cursor)
+
+    def fingerprint_tables(self, schemas: Optional[List[str]] = None) -> Dict[str, Tuple[int, str]]:
+        """``{"schema.table": (oid, fingerprint)}`` for every table in scope."""
+        table_filter, params = self._table_filter(schemas)
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute(FINGERPRINT_QUERY.format(table_filter=table_filter), params)
+            return {
+                f"{row['schema_name']}.{row['table_name']}": (row['oid'], row['fingerprint'])
+                for row in cursor
+            }
+
+    def extract_incremental(self, previous: DatabaseSchema, previous_fingerprints: Dict[str, str],
+                            schemas: Optional[List[str]] = None,
+                            full_extraction_seconds: Optional[float] = None
+                            ) -> Tuple[DatabaseSchema, Dict[str, str], IncrementalExtractionReport]:
+        """
+        Refetch only tables whose fingerprint differs from
+        ``previous_fingerprints`` and merge them into ``previous``. Returns
+        the merged schema, the new fingerprints and a report. Dirty tables
+        are always read through the pg_catalog backend, by oid. With
+        ``schemas``, previous tables in other schemas are out of scope: they
+        are carried over with their fingerprints, never reported removed.
+        """
+        started = time.perf_counter()
+        current = self.fingerprint_tables(schemas)
+        report = IncrementalExtractionReport(full_extraction_seconds=full_extraction_seconds)
+        if schemas:
+            in_scope = {table.full_name for name in schemas for table in previous.get_tables_in_schema(name)}
+            carried = [key for key in previous.tables if key not in in_scope]
+        else:
+            in_scope, carried = set(previous.tables), []
+
+        dirty_oids = []
+        for key, (oid, fingerprint) in current.items():
+            old = previous_fingerprints.get(key)
+            if old == fingerprint and key in previous.tables:
+                report.unchanged += 1
+                continue
+            (report.changed if old is not None else report.added).append(key)
+            dirty_oids.append(oid)
+        report.removed = [key for key in previous.tables if key in in_scope and key not in current]
+
+        refetched = self._extract_pg_catalog(table_oids=dirty_oids).tables if dirty_oids else {}
+        tables = {
+            key: refetched[key] if key in refetched else previous.tables[key]
+            for key in sorted({*current, *carried})
+            if key in refetched or key in previous.tables
+        }
+        report.elapsed_seconds = time.perf_counter() - started
+        fingerprints = {key: previous_fingerprints[key] for key in carried if key in previous_fingerprints}
+        fingerprints.update((key, fingerprint) for key, (_, fingerprint) in current.items())
+        return DatabaseSchema(tables=tables), fingerprints, report
+
+    def _extract_information_schema(self, schemas: Optional[List[str]] = None,
+                                    snapshot: Optional[str] = None) -> DatabaseSchema:
+        with self._connection(snapshot) as conn:
             params = []
 
             schema_filter = ""
+            pk_filter = ""
+            fk_filter = ""
+            check_filter = ""
             if schemas:
                 schema_filter = " AND t.table_schema = ANY(%s)"
+                pk_filter = " AND kc.table_schema = ANY(%s)"
+                fk_filter = " AND sch1.nspname = ANY(%s)"
+                check_filter = " AND tc.table_schema = ANY(%s)"
                 params.append(schemas)
 
             # --- Fetch basic column info
-            cursor.execute(f"""
-                SELECT 
+            column_rows = conn.cursor()
+            column_rows.execute(f"""
+                SELECT
                     t.table_schema,
                     t.table_name,
                     c.column_name,
@@ -31,38 +398,18 @@ class SchemaExtractor:
                     c.numeric_precision,
                     c.numeric_scale
                 FROM information_schema.tables t
-                JOIN information_schema.columns c 
-                    ON t.table_schema = c.table_schema 
+                JOIN information_schema.columns c
+                    ON t.table_schema = c.table_schema
                     AND t.table_name = c.table_name
                 WHERE t.table_type = 'BASE TABLE'
                   AND t.table_schema NOT IN ('information_schema', 'pg_catalog')
                   {schema_filter}
+                ORDER BY t.table_schema, t.table_name, c.ordinal_position
             """, params)
 
-            tables: Dict[str, TableInfo] = {}
-            for row in cursor.fetchall():
-                key = f"{row['table_schema']}.{row['table_name']}"
-                if key not in tables:
-                    tables[key] = TableInfo(
-                        schema_name=row['table_schema'],
-                        table_name=row['table_name'],
-                        columns=[],
-                        foreign_keys=[],
-                        indexes=[],
-                        check_constraints=[]
-                    )
-                tables[key].columns.append(ColumnInfo(
-                    column_name=row['column_name'],
-                    data_type=row['data_type'],
-                    is_nullable=row['is_nullable'],
-                    column_default=row['column_default'],
-                    character_maximum_length=row['character_maximum_length'],
-                    numeric_precision=row['numeric_precision'],
-                    numeric_scale=row['numeric_scale']
-                ))
-
             # --- Primary Keys
-            cursor.execute("""
+            pk_rows = conn.cursor()
+            pk_rows.execute(f"""
                 SELECT
                     kc.table_schema,
                     kc.table_name,
@@ -71,18 +418,15 @@ class SchemaExtractor:
                 JOIN information_schema.key_column_usage kc
                   ON kc.constraint_name = tc.constraint_name
                  AND kc.table_schema = tc.table_schema
+                 AND kc.table_name = tc.table_name
                 WHERE tc.constraint_type = 'PRIMARY KEY'
-            """)
-            for row in cursor.fetchall():
-                key = f"{row['table_schema']}.{row['table_name']}"
-                table = tables.get(key)
-                if table:
-                    for col in table.columns:
-                        if col.column_name == row['column_name']:
-                            col.is_primary_key = True
-
-            # --- Foreign Keys
-            cursor.execute("""
+                  {pk_filter}
+            """, params)
+
+            # --- Foreign Keys (conkey/confkey are unnested pairwise so
+            # composite keys map column-to-column instead of cross-joining)
+            fk_rows = conn.cursor()
+            fk_rows.execute(f"""
                 SELECT
                     con.conname AS constraint_name,
                     sch1.nspname AS table_schema,
@@ -92,28 +436,181 @@ class SchemaExtractor:
                     rel2.relname AS foreign_table_name,
                     att2.attname AS foreign_column_name
                 FROM pg_constraint con
+                CROSS JOIN LATERAL unnest(con.conkey, con.confkey) AS k(attnum, foreign_attnum)
                 JOIN pg_class rel1 ON rel1.oid = con.conrelid
                 JOIN pg_namespace sch1 ON sch1.oid = rel1.relnamespace
-                JOIN pg_attribute att1 ON att1.attrelid = rel1.oid AND att1.attnum = ANY(con.conkey)
+                JOIN pg_attribute att1 ON att1.attrelid = rel1.oid AND att1.attnum = k.attnum
                 JOIN pg_class rel2 ON rel2.oid = con.confrelid
                 JOIN pg_namespace sch2 ON sch2.oid = rel2.relnamespace
-                JOIN pg_attribute att2 ON att2.attrelid = rel2.oid AND att2.attnum = ANY(con.confkey)
-                WHERE con.contype = 'f';
-            """)
-            for row in cursor.fetchall():
-                key = f"{row['table_schema']}.{row['table_name']}"
-                table = tables.get(key)
-                if table:
-                    table.foreign_keys.append(ForeignKeyInfo(
-                        constraint_name=row['constraint_name'],
-                        column_name=row['column_name'],
-                        referenced_table_schema=row['foreign_table_schema'],
-                        referenced_table_name=row['foreign_table_name'],
-                        referenced_column_name=row['foreign_column_name']
-                    ))
-                    for col in table.columns:
-                        if col.column_name == row['column_name']:
-                            col.is_foreign_key = True
-                            col.foreign_key_info = table.foreign_keys[-1]
-
-            return DatabaseSchema(tables=tables)
+                JOIN pg_attribute att2 ON att2.attrelid = rel2.oid AND att2.attnum = k.foreign_attnum
+                WHERE con.contype = 'f'
+                  {fk_filter}
+            """, params)
+
+            # --- Indexes (no information_schema view covers them)
+            index_rows = conn.cursor()
+            index_rows.execute(f"""
+                SELECT
+                    sch1.nspname AS table_schema,
+                    rel1.relname AS table_name,
+                    ic.relname AS index_name,
+                    i.indisunique AS is_unique,
+                    i.indisprimary AS is_primary,
+                    ARRAY(
+                        SELECT coalesce(ka.attname::text, pg_get_indexdef(i.indexrelid, k.n, true))
+                        FROM generate_series(1, i.indnkeyatts) AS k(n)
+                        LEFT JOIN pg_attribute ka ON ka.attrelid = i.indrelid AND ka.attnum = i.indkey[k.n - 1]
+                        ORDER BY k.n
+                    ) AS columns,
+                    am.amname AS index_type,
+                    pg_get_expr(i.indpred, i.indrelid, true) AS predicate,
+                    ARRAY(
+                        SELECT ka.attname::text
+                        FROM generate_series(i.indnkeyatts + 1, i.indnatts) AS k(n)
+                        JOIN pg_attribute ka ON ka.attrelid = i.indrelid AND ka.attnum = i.indkey[k.n - 1]
+                        ORDER BY k.n
+                    ) AS include_columns
+                FROM pg_index i
+                JOIN pg_class ic ON ic.oid = i.indexrelid
+                JOIN pg_am am ON am.oid = ic.relam
+                JOIN pg_class rel1 ON rel1.oid = i.indrelid
+                JOIN pg_namespace sch1 ON sch1.oid = rel1.relnamespace
+                WHERE sch1.nspname NOT IN ('information_schema', 'pg_catalog')
+                  {fk_filter}
+                ORDER BY ic.relname
+            """, params)
+
+            # --- Check constraints (NOT NULL columns also appear here under
+            # generated "<oid>_<oid>_<attnum>_not_null" names; those are skipped)
+            check_rows = conn.cursor()
+            check_rows.execute(f"""
+                SELECT
+                    tc.table_schema,
+                    tc.table_name,
+                    cc.constraint_name,
+                    'CHECK ' || cc.check_clause AS check_clause
+                FROM information_schema.table_constraints tc
+                JOIN information_schema.check_constraints cc
+                  ON cc.constraint_schema = tc.constraint_schema
+                 AND cc.constraint_name = tc.constraint_name
+                WHERE tc.constraint_type = 'CHECK'
+                  AND tc.table_schema NOT IN ('information_schema', 'pg_catalog')
+                  AND cc.constraint_name !~ '^[0-9]+_[0-9]+_[0-9]+_not_null$'
+                  {check_filter}
+                ORDER BY cc.constraint_name
+            """, params)
+
+            # These are client-side cursors: libpq has already buffered every
+            # result set in full and all five stay alive until _assemble
+            # returns. Iterating them only avoids copying the rows into
+            # Python lists on top of that.
+            return self._assemble(column_rows, pk_rows, fk_rows, index_rows, check_rows)
+
+    @staticmethod
+    def _assemble_documents(documents: Iterable[Mapping[str, Any]]) -> DatabaseSchema:
+        """Validate per-table documents and link FK columns to their constraints."""
+        tables: Dict[str, TableInfo] = {}
+        for document in documents:
+            table = TableInfo.model_validate(document)
+            columns = {column.column_name: column for column in table.columns}
+            for fk in table.foreign_keys:
+                column = columns.get(fk.column_name)
+                if column:
+                    column.is_foreign_key = True
+                    column.foreign_key_info = fk
+            tables[table.full_name] = table
+        return DatabaseSchema(tables=tables)
+
+    @staticmethod
+    def _assemble(column_rows: Iterable[Mapping[str, Any]],
+                  pk_rows: Iterable[Mapping[str, Any]],
+                  fk_rows: Iterable[Mapping[str, Any]],
+                  index_rows: Iterable[Mapping[str, Any]] = (),
+                  check_rows: Iterable[Mapping[str, Any]] = ()) -> DatabaseSchema:
+        """
+        Build a DatabaseSchema from catalog rows in a single pass over each
+        row set. Columns are indexed per table by name, so every PK/FK row
+        is applied with two dict lookups regardless of table width, and
+        repeated column or FK rows are ignored rather than appended twice.
+        """
+        tables: Dict[str, TableInfo] = {}
+        columns_by_table: Dict[str, Dict[str, ColumnInfo]] = {}
+
+        for row in column_rows:
+            key = f"{row['table_schema']}.{row['table_name']}"
+            table_columns = columns_by_table.get(key)
+            if table_columns is None:
+                tables[key] = TableInfo(
+                    schema_name=row['table_schema'],
+                    table_name=row['table_name'],
+                    columns=[],
+                    foreign_keys=[],
+                    indexes=[],
+                    check_constraints=[]
+                )
+                table_columns = columns_by_table[key] = {}
+            if row['column_name'] in table_columns:
+                continue
+            column = ColumnInfo(
+                column_name=row['column_name'],
+                data_type=row['data_type'],
+                is_nullable=row['is_nullable'],
+                column_default=row['column_default'],
+                character_maximum_length=row['character_maximum_length'],
+                numeric_precision=row['numeric_precision'],
+                numeric_scale=row['numeric_scale']
+            )
+            table_columns[column.column_name] = column
+            tables[key].columns.append(column)
+
+        for row in pk_rows:
+            table_columns = columns_by_table.get(f"{row['table_schema']}.{row['table_name']}")
+            column = table_columns.get(row['column_name']) if table_columns else None
+            if column:
+                column.is_primary_key = True
+
+        seen_fks: Set[Tuple[str, str, str]] = set()
+        for row in fk_rows:
+            key = f"{row['table_schema']}.{row['table_name']}"
+            table_columns = columns_by_table.get(key)
+            if table_columns is None:
+                continue
+            fk_key = (key, row['constraint_name'], row['column_name'])
+            if fk_key in seen_fks:
+                continue
+            seen_fks.add(fk_key)
+            fk = ForeignKeyInfo(
+                constraint_name=row['constraint_name'],
+                column_name=row['column_name'],
+                referenced_table_schema=row['foreign_table_schema'],
+                referenced_table_name=row['foreign_table_name'],
+                referenced_column_name=row['foreign_column_name']
+            )
+            tables[key].foreign_keys.append(fk)
+            column = table_columns.get(row['column_name'])
+            if column:
+                column.is_foreign_key = True
+                column.foreign_key_info = fk
+
+        for row in index_rows:
+            table = tables.get(f"{row['table_schema']}.{row['table_name']}")
+            if table:
+                table.indexes.append(IndexInfo(
+                    index_name=row['index_name'],
+                    is_unique=row['is_unique'],
+                    is_primary=row['is_primary'],
+                    columns=row['columns'],
+                    index_type=row['index_type'],
+                    predicate=row['predicate'],
+                    include_columns=row['include_columns']
+                ))
+
+        for row in check_rows:
+            table = tables.get(f"{row['table_schema']}.{row['table_name']}")
+            if table:
+                table.check_constraints.append(CheckConstraintInfo(
+                    constraint_name=row['constraint_name'],
+                    check_clause=row['check_clause']
+                ))
+
+        return DatabaseSchema(tables=tables)
@@ -0,0 +1,90 @@
+# services/stats_collector.py
+from typing import List, Optional
+
+from core.database import DatabaseConnection
+from core.models import DatabaseStatistics, TableStatistics
+from services.schema_extractor import SchemaExtractor, TABLES_CTE
+
+MOST_COMMON_VALUES = 5
+MAX_VALUE_CHARS = 60
+
+# reltuples is -1 for tables that were never analyzed (PostgreSQL 14+).
+STATS_QUERY = """
+    WITH""" + TABLES_CTE + """,
+    col AS (
+        SELECT tbl.oid, json_agg(json_build_object(
+            'column_name', s.attname,
+            'null_frac', s.null_frac,
+            'n_distinct', s.n_distinct,
+            'avg_width', s.avg_width,
+            'estimated_bytes', (s.avg_width * greatest(c.reltuples, 0))::bigint,
+            'most_common_values', coalesce((
+                SELECT json_agg(left(v, {max_value_chars}) ORDER BY i)
+                FROM unnest(s.most_common_vals::text::text[]) WITH ORDINALITY AS e(v, i)
+                WHERE i <= {most_common_values}
+            ), '[]'),
+            'most_common_freqs', coalesce(to_json(s.most_common_freqs[1:{most_common_values}]), '[]')
+        ) ORDER BY s.attname) AS columns
+        FROM tbl
+        JOIN pg_class c ON c.oid = tbl.oid
+        JOIN pg_stats s ON s.schemaname = tbl.nspname AND s.tablename = tbl.relname
+                       AND s.inherited = (c.relkind = 'p')
+        GROUP BY tbl.oid
+    )
+    SELECT
+        tbl.nspname AS schema_name,
+        tbl.relname AS table_name,
+        CASE WHEN c.reltuples >= 0 THEN c.reltuples END AS row_estimate,
+        c.relpages,
+        pg_table_size(tbl.oid) AS table_bytes,
+        pg_indexes_size(tbl.oid) AS index_bytes,
+        pg_total_relation_size(tbl.oid) AS total_bytes,
+        greatest(st.last_analyze, st.last_autoanalyze) AS last_analyzed,
+        coalesce(col.columns, '[]') AS columns
+    FROM tbl
+    JOIN pg_class c ON c.oid = tbl.oid
+    LEFT JOIN pg_stat_user_tables st ON st.relid = tbl.oid
+    LEFT JOIN col ON col.oid = tbl.oid
+    ORDER BY tbl.nspname, tbl.relname
+"""
+
+
+class StatisticsCollector:
+    """
+    Snapshots planner statistics (reltuples, relpages, pg_stats) and size
+    estimates for every table in one statement. The snapshot is stored
+    next to the schema but collected on its own schedule, since it goes
+    stale with data changes rather than DDL.
+    """
+
+    def __init__(self, db: DatabaseConnection, most_common_values: int = MOST_COMMON_VALUES,
+                 max_value_chars: int = MAX_VALUE_CHARS):
+        self.db = db
+        self.most_common_values = most_common_values
+        self.max_value_chars = max_value_chars
+
+    def collect(self, schemas: Optional[List[str]] = None) -> DatabaseStatistics:
+        table_filter, params = SchemaExtractor._table_filter(schemas)
+        query = STATS_QUERY.format(
+            table_filter=table_filter,
+            most_common_values=int(self.most_common_values),
+            max_value_chars=int(self.max_value_chars),
+        )
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            tables = {}
+            for row in cursor:
+                stats = TableStatistics(
+                    schema_name=row['schema_name'],
+                    table_name=row['table_name'],
+                    row_estimate=row['row_estimate'],
+                    relpages=row['relpages'],
+                    table_bytes=row['table_bytes'],
+                    index_bytes=row['index_bytes'],
+                    total_bytes=row['total_bytes'],
+                    last_analyzed=row['last_analyzed'],
+                    columns={col['column_name']: col for col in row['columns']},
+                )
+                tables[stats.full_name] = stats
+        return DatabaseStatistics(tables=tables)
@@ -0,0 +1,72 @@
+# tests/conftest.py
+import json
+
+import pytest
+
+
+def column(name, data_type="integer", pk=False, references=None):
+    return {
+        "name": name,
+        "data_type": data_type,
+        "is_primary_key": pk,
+        "is_foreign_key": references is not None,
+        "references": dict(zip(("schema", "table", "column"), references.split("."))) if references else None,
+        "synonyms": [],
+    }
+
+
+# A small llm_schema.json: customers and products with orders between them, plus support tickets.
+LLM_SCHEMA = {
+    "schemas": {
+        "sales": {
+            "tables": {
+                "customers": {"columns": [
+                    column("id", pk=True),
+                    column("name", "text"),
+                    column("region", "text"),
+                ]},
+                "products": {"columns": [
+                    column("id", pk=True),
+                    column("title", "text"),
+                    column("price", "numeric"),
+                ]},
+                "orders": {"columns": [
+                    column("id", pk=True),
+                    column("customer_id", references="sales.customers.id"),
+                    column("product_id", references="sales.products.id"),
+                    column("created_at", "timestamp with time zone"),
+                ]},
+            }
+        },
+        "support": {
+            "tables": {
+                "tickets": {
+                    "columns": [
+                        column("id", pk=True),
+                        column("customer_id", references="sales.customers.id"),
+                        column("priority", "text"),
+                        column("status", "text"),
+                        column("created_at", "timestamp with time zone"),
+                    ],
+                    "indexes": [
+                        {"name": "tickets_customer_idx", "method": "btree", "unique": False,
+                         "columns": ["customer_id"], "include": [], "where": None},
+                        {"name": "tickets_open_idx", "method": "btree", "unique": False,
+                         "columns": ["created_at"], "include": ["priority"], "where": "status = 'open'"},
+                    ],
+                },
+                "agents": {"columns": [
+                    column("id", pk=True),
+                    column("name", "text"),
+                ]},
+            }
+        },
+    }
+}
+
+
+@pytest.fixture
+def llm_schema_path(tmp_path):
+    path = tmp_path / "llm_schema.json"
+    path.write_text(json.dumps(LLM_SCHEMA))
+    return path
@@ -0,0 +1,113 @@
+# tests/fakes.py
+"""In-memory stand-ins for psycopg2 connections and cursors."""
+
+from contextlib import contextmanager
+
+import psycopg2.extensions
+
+from config.settings import DatabaseConfig
+
+
+class FakeCursor:
+    """Cursor that records statements and serves canned rows."""
+
+    def __init__(self, connection, name=None):
+        self.connection = connection
+        self.name = name
+        self.description = None
+        self.itersize = 2000
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.connection.executed.append((sql, params))
+        if self.connection.fail_on is not None and self.connection.fail_on in sql:
+            raise self.connection.error
+        if sql.lstrip().upper().startswith("SET ") or "set_config(" in sql:
+            # Session settings never consume a canned result.
+            self.description, self._rows = None, []
+            return
+        result = self.connection.results.pop(0) if self.connection.results else None
+        if result is None:
+            self.description, self._rows = None, []
+        else:
+            columns, rows = result
+            self.description = [(column,) for column in columns]
+            self._rows = list(rows)
+
+    def fetchall(self):
+        if self.description is None:
+            raise psycopg2.ProgrammingError("no results to fetch")
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchmany(self, size):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def __iter__(self):
+        while self._rows:
+            yield self._rows.pop(0)
+
+
+class FakeConnection:
+    """
+    Connection whose cursors return ``results`` in order, one
+    ``(columns, rows)`` pair (or None for no result set) per execute;
+    SET and set_config() statements are recorded but skipped.
+    A statement containing ``fail_on`` raises ``error``.
+    """
+
+    def __init__(self, results=None, fail_on=None, error=None):
+        self.results = list(results or [])
+        self.fail_on = fail_on
+        self.error = error
+        self.executed = []
+        self.autocommit = True
+        self.cursor_factory = None
+        self.closed = 0
+        self.commits = 0
+        self.rollbacks = 0
+        self.cancels = 0
+        self.status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def cursor(self, name=None):
+        return FakeCursor(self, name)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def cancel(self):
+        self.cancels += 1
+
+    def close(self):
+        self.closed = 1
+
+    def get_transaction_status(self):
+        return self.status
+
+
+class FakeDatabase:
+    """``DatabaseConnection`` look-alike handing out one FakeConnection."""
+
+    def __init__(self, connection=None):
+        self.config = DatabaseConfig(host="fake", database="fake", user="fake", password="fake")
+        self.connection = connection or FakeConnection()
+        self.checkouts = 0
+
+    @contextmanager
+    def get_connection(self, use_real_dict_cursor=True):
+        self.checkouts += 1
+        yield self.connection
@@ -0,0 +1,63 @@
+# tests/test_ann_index.py
+import numpy as np
+import pytest
+
+from modules.ann_index import IVFIndex, recall_at_k
+from modules.vector_search import VectorIndex
+from tests.test_vector_search import metadata, random_vectors
+
+
+def test_probing_every_list_is_exact():
+    vectors = random_vectors(400)
+    ivf = IVFIndex.build(vectors, n_lists=8, n_iter=5)
+    exact = VectorIndex(vectors, metadata(400))
+    queries = random_vectors(10, seed=1)
+    approx_rows, _ = ivf.search_indices(queries, k=5, n_probe=8)
+    exact_rows, _ = exact.search_indices(queries, k=5)
+    assert approx_rows.tolist() == exact_rows.tolist()
+
+
+def test_short_lists_are_padded():
+    ivf = IVFIndex.build(random_vectors(10), n_lists=5, n_iter=2)
+    rows, scores = ivf.search_indices(random_vectors(1, seed=1), k=10, n_probe=1)
+    found = rows[0] >= 0
+    assert 0 < found.sum() < 10
+    assert np.all(rows[0][~found] == -1) and np.all(np.isneginf(scores[0][~found]))
+
+
+def test_built_on_disk_and_memory_mapped(tmp_path):
+    vectors = random_vectors(100)
+    ivf = IVFIndex.build(vectors, path=tmp_path / "ivf", n_lists=4, n_iter=3, n_probe=2)
+    assert isinstance(ivf.list_vectors, np.memmap)
+    assert sorted(ivf.row_ids.tolist()) == list(range(100))
+    reloaded = IVFIndex.load(tmp_path / "ivf")
+    assert reloaded.n_probe == 2
+    query = random_vectors(1, seed=4)
+    assert np.array_equal(reloaded.search_indices(query, k=3)[0], ivf.search_indices(query, k=3)[0])
+
+
+def test_empty_matrix_is_rejected():
+    with pytest.raises(ValueError):
+        IVFIndex.build(np.empty((0, 4), dtype=np.float32))
+
+
+def test_vector_index_uses_ann_only_for_unfiltered_searches():
+    vectors = random_vectors(50)
+
+    class RecordingANN:
+        calls = 0
+
+        def search_indices(self, queries, k):
+            RecordingANN.calls += 1
+            return np.full((1, k), -1), np.full((1, k), -np.inf)
+
+    index = VectorIndex(vectors, metadata(50), ann=RecordingANN())
+    query = random_vectors(1, seed=5)[0]
+    assert index.search(query, k=3) == []
+    assert len(index.search(query, k=3, exact=True)) == 3
+    assert len(index.search(query, k=3, schemas=["a"])) == 3
+    assert RecordingANN.calls == 1
+
+
+def test_recall_at_k():
+    assert recall_at_k(np.array([[1, 2], [3, 4]]), np.array([[2, 9], [4, 3]])) == 0.75
@@ -0,0 +1,176 @@
+# tests/test_api_server.py
+import http.client
+import json
+import threading
+import time
+
+import pytest
+
+import services.api_server
+import services.pipeline
+from core.exceptions import QueryTimeoutError
+from services.api_server import AppState, QueryServer
+from services.cost_gate import CostGateDecision
+from services.result_cache import ResultCache
+from tests.fakes import FakeDatabase
+
+
+class AllowAll:
+    enabled = True
+
+    def enforce(self, sql):
+        return CostGateDecision(action="allow", sql=sql)
+
+    def stats(self):
+        return {}
+
+
+def fake_stream(rows=None, error=None):
+    def stream_sql(sql, db, itersize=2000, timeout=None):
+        if error is not None:
+            raise error
+        yield from rows or []
+    return stream_sql
+
+
+def patch_stream(monkeypatch, stream_sql):
+    # Streaming responses read the cursor directly; the others go through the pipeline.
+    monkeypatch.setattr(services.api_server, "stream_sql", stream_sql)
+    monkeypatch.setattr(services.pipeline, "stream_sql", stream_sql)
+
+
+@pytest.fixture
+def server_factory(monkeypatch):
+    monkeypatch.setattr(services.pipeline, "call_gpt_generate_sql", lambda question, path: "SELECT n FROM t")
+    monkeypatch.setattr(services.pipeline, "enforce_guardrails", lambda sql, path, **kwargs: None)
+    patch_stream(monkeypatch, fake_stream([{"n": i} for i in range(5)]))
+    servers = []
+
+    def start(workers=2, max_pending=None):
+        db = FakeDatabase()
+        state = AppState(db, max_rows=3, workers=workers, result_cache=ResultCache(db, max_bytes=0))
+        state.pipeline.cost_gate = AllowAll()
+        server = QueryServer(("127.0.0.1", 0), state, workers=workers, max_pending=max_pending)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def request(server, method, path, payload=None):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=5)
+    try:
+        connection.request(method, path, body=json.dumps(payload) if payload is not None else None,
+                           headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        body = response.read()
+        return response.status, body
+    finally:
+        connection.close()
+
+
+def test_health(server_factory):
+    assert request(server_factory(), "GET", "/health") == (200, b'{"status": "ok"}')
+
+
+@pytest.mark.parametrize("payload", [
+    {},
+    {"question": "  "},
+    {"question": "q", "max_rows": "ten"},
+    {"question": "q", "max_rows": -1},
+    {"question": "q", "max_rows": 2.5},
+    {"question": "q", "max_rows": True},
+    ["not", "an", "object"],
+])
+def test_invalid_requests_get_400(server_factory, payload):
+    status, body = request(server_factory(), "POST", "/query", payload)
+    assert status == 400
+    assert json.loads(body)["error"].startswith("Invalid request")
+
+
+def test_oversized_body_gets_413(server_factory, monkeypatch):
+    monkeypatch.setattr(services.api_server, "MAX_BODY_BYTES", 16)
+    status, body = request(server_factory(), "POST", "/query", {"question": "a question longer than the cap"})
+    assert status == 413
+    assert json.loads(body)["error"].startswith("Request body over 16 bytes")
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_statements_without_rows_skip_the_named_cursor(server_factory, monkeypatch, stream):
+    monkeypatch.setattr(services.pipeline, "call_gpt_generate_sql", lambda question, path: "UPDATE t SET n = 1")
+    patch_stream(monkeypatch, fake_stream(error=AssertionError("named cursor used")))
+    server = server_factory()
+    status, body = request(server, "POST", "/query", {"question": "q", "stream": stream})
+    assert status == 200
+    if stream:
+        assert json.loads(body.splitlines()[-1]) == {"row_count": 0}
+    else:
+        assert json.loads(body)["rows"] == []
+    assert server.state.db.connection.executed[-1][0] == "UPDATE t SET n = 1"
+
+
+def test_export_format_is_validated(server_factory):
+    status, _ = request(server_factory(), "POST", "/export", {"question": "q", "format": "xlsx"})
+    assert status == 400
+
+
+def test_rows_are_capped_at_the_server_limit(server_factory):
+    server = server_factory()
+    status, body = request(server, "POST", "/query", {"question": "q", "max_rows": 2})
+    data = json.loads(body)
+    assert status == 200 and data["row_count"] == 2 and data["truncated"]
+    data = json.loads(request(server, "POST", "/query", {"question": "q", "max_rows": 100})[1])
+    assert data["row_count"] == 3
+    data = json.loads(request(server, "POST", "/query", {"question": "q", "max_rows": 0})[1])
+    assert data["rows"] == [] and data["truncated"]
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_timeout_before_the_first_row_is_504(server_factory, monkeypatch, stream):
+    patch_stream(monkeypatch, fake_stream(error=QueryTimeoutError("too slow")))
+    status, body = request(server_factory(), "POST", "/query", {"question": "q", "stream": stream})
+    assert status == 504
+    assert "too slow" in json.loads(body)["error"]
+
+
+def test_streaming_response(server_factory):
+    status, body = request(server_factory(), "POST", "/query", {"question": "q", "stream": True})
+    lines = [json.loads(line) for line in body.splitlines()]
+    assert status == 200
+    assert lines[0]["sql"] == "SELECT n FROM t"
+    assert lines[1:-1] == [{"n": i} for i in range(5)]
+    assert lines[-1] == {"row_count": 5}
+
+
+def test_connections_beyond_the_queue_get_503(server_factory, monkeypatch):
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow_generate(question, path):
+        started.set()
+        release.wait(5)
+        return "SELECT n FROM t"
+
+    monkeypatch.setattr(services.pipeline, "call_gpt_generate_sql", slow_generate)
+    server = server_factory(workers=1, max_pending=0)
+    busy = threading.Thread(target=request, args=(server, "POST", "/query", {"question": "q"}))
+    busy.start()
+    try:
+        assert started.wait(5)
+        status, body = request(server, "GET", "/health")
+        assert status == 503
+        assert json.loads(body)["error"].startswith("Server busy")
+    finally:
+        release.set()
+        busy.join()
+    # The worker frees its slot once it sees the client close, which can trail the response.
+    deadline = time.monotonic() + 5
+    status = request(server, "GET", "/health")[0]
+    while status == 503 and time.monotonic() < deadline:
+        time.sleep(0.01)
+        status = request(server, "GET", "/health")[0]
+    assert status == 200
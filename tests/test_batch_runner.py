@@ -0,0 +1,117 @@
+# tests/test_batch_runner.py
+import asyncio
+import json
+
+import pytest
+
+import services.pipeline
+from services.batch_runner import BatchRunner, RateLimiter, load_completed_ids, read_questions
+from tests.fakes import FakeDatabase
+from tests.test_pipeline import FakeAsyncDatabase, FakeCostGate, FakeLLM
+
+
+def write_jsonl(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+
+
+def read_jsonl(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+@pytest.fixture
+def runner(monkeypatch):
+    monkeypatch.setattr(services.pipeline, "enforce_guardrails", lambda sql, path, **kwargs: None)
+    runner = BatchRunner(FakeDatabase(), llm_concurrency=2, db_concurrency=1, max_rows=10, progress_every=1000)
+    runner.pipeline.llm = FakeLLM(fail_on="bad")
+    runner.pipeline.database = FakeAsyncDatabase(rows=[{"n": 1}, {"n": 2}])
+    runner.pipeline.cost_gate = FakeCostGate()
+    return runner
+
+
+def test_read_questions_defaults_ids_to_line_numbers(tmp_path):
+    path = tmp_path / "in.jsonl"
+    path.write_text('{"id": "a", "question": "q1"}\n\n{"question": "q2"}\n', encoding="utf-8")
+    assert list(read_questions(str(path))) == [("a", "q1"), ("3", "q2")]
+
+
+def test_load_completed_ids_ignores_a_torn_line(tmp_path):
+    path = tmp_path / "out.jsonl"
+    assert load_completed_ids(str(path)) == set()
+    path.write_text('{"id": 1}\n{"id": "2"}\n{"id": "3", "sq', encoding="utf-8")
+    assert load_completed_ids(str(path)) == {"1", "2"}
+
+
+def test_run_writes_one_record_per_question(runner, tmp_path):
+    source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_jsonl(source, [{"id": i, "question": "bad" if i == 3 else f"q{i}"} for i in range(5)])
+
+    summary = runner.run(str(source), str(output))
+
+    assert (summary.processed, summary.skipped, summary.errors) == (5, 0, 1)
+    records = {record["id"]: record for record in read_jsonl(output)}
+    assert sorted(records) == ["0", "1", "2", "3", "4"]
+    assert records["0"]["row_count"] == 2 and "rows" not in records["0"]
+    assert "upstream down" in records["3"]["error"]
+
+
+def test_resume_skips_answered_ids_and_repairs_a_torn_line(runner, tmp_path):
+    source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_jsonl(source, [{"id": i, "question": f"q{i}"} for i in range(4)])
+    output.write_text('{"id": "0", "sql": "x"}\n{"id": "1", "sq', encoding="utf-8")
+
+    summary = runner.run(str(source), str(output))
+
+    assert (summary.processed, summary.skipped) == (3, 1)
+    assert sorted(load_completed_ids(str(output))) == ["0", "1", "2", "3"]
+    assert sum(1 for record in output.read_text().splitlines() if record.startswith('{"id": "1", "sq')) == 1
+
+
+def test_load_completed_ids_leaves_out_ids_whose_latest_record_failed(tmp_path):
+    path = tmp_path / "out.jsonl"
+    write_jsonl(path, [{"id": "1", "error": "boom"}, {"id": "1", "error": None}, {"id": "2", "error": None},
+                       {"id": "2", "error": "boom"}, {"id": "3", "error": "boom"}])
+    assert load_completed_ids(str(path)) == {"1"}
+
+
+def test_resume_retries_failed_questions(runner, tmp_path):
+    source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_jsonl(source, [{"id": i, "question": f"q{i}"} for i in range(2)])
+    write_jsonl(output, [{"id": "0", "error": None}, {"id": "1", "error": "SQL generation failed: upstream down"}])
+
+    summary = runner.run(str(source), str(output))
+
+    assert (summary.processed, summary.skipped, summary.errors) == (1, 1, 0)
+    assert read_jsonl(output)[-1]["id"] == "1" and read_jsonl(output)[-1]["error"] is None
+    assert load_completed_ids(str(output)) == {"0", "1"}
+
+
+def test_restart_overwrites_the_output(runner, tmp_path):
+    source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_jsonl(source, [{"id": "a", "question": "q"}])
+    output.write_text('{"id": "a"}\n', encoding="utf-8")
+    runner.include_rows = True
+
+    summary = runner.run(str(source), str(output), resume=False)
+
+    assert (summary.processed, summary.skipped) == (1, 0)
+    assert read_jsonl(output)[0]["rows"] == [{"n": 1}, {"n": 2}]
+
+
+def test_rate_limiter_spaces_requests(monkeypatch):
+    now = [0.0]
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+        now[0] += delay
+
+    monkeypatch.setattr("services.batch_runner.time.monotonic", lambda: now[0])
+    monkeypatch.setattr("services.batch_runner.asyncio.sleep", fake_sleep)
+
+    async def acquire_all():
+        limiter = RateLimiter(rate=2, burst=2)
+        for _ in range(4):
+            await limiter.acquire()
+
+    asyncio.run(acquire_all())
+    assert sleeps == [pytest.approx(0.5), pytest.approx(0.5)]
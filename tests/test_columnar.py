@@ -0,0 +1,119 @@
+# tests/test_columnar.py
+from datetime import date, datetime, timezone
+
+import numpy as np
+import pytest
+
+import core.columnar
+from core.columnar import ColumnarResult
+
+INT4, INT8, FLOAT8, BOOL, TEXT, DATE, TIMESTAMPTZ = 23, 20, 701, 16, 25, 1082, 1184
+
+
+class ColumnCursor:
+    """Cursor serving canned rows with ``(name, type_code)`` descriptions, optionally only after the first fetch."""
+
+    def __init__(self, columns, rows, named=False):
+        self._description = [(name, oid) for name, oid in columns]
+        self._rows = list(rows)
+        self._fetched = not named
+        self.fetches = 0
+
+    @property
+    def description(self):
+        return self._description if self._fetched else None
+
+    def fetchmany(self, size):
+        self._fetched = True
+        self.fetches += 1
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+
+@pytest.fixture(autouse=True)
+def no_typecaster_registration(monkeypatch):
+    monkeypatch.setattr(core.columnar.psycopg2.extensions, "register_type", lambda *args: None)
+
+
+COLUMNS = [("id", INT4), ("score", FLOAT8), ("active", BOOL), ("name", TEXT), ("day", DATE), ("at", TIMESTAMPTZ)]
+ROWS = [
+    (1, 0.5, True, "a", "2024-01-31", "2024-01-31 10:00:00+00"),
+    (None, None, None, None, None, None),
+    (3, 2.5, False, "c", "2024-02-29", "2024-02-29 23:59:59.5+00"),
+]
+
+
+def test_columns_are_typed_arrays_with_null_masks():
+    cursor = ColumnCursor(COLUMNS, ROWS)
+    result = ColumnarResult.from_cursor(cursor, batch_size=2)
+
+    assert cursor.fetches == 3
+    assert len(result) == 3 and result.names == [name for name, _ in COLUMNS]
+    arrays = result.to_numpy()
+    assert arrays["id"].dtype == np.int32 and arrays["id"].tolist() == [1, 0, 3]
+    assert result.null_mask("id").tolist() == [False, True, False]
+    assert arrays["score"].dtype == np.float64
+    assert arrays["active"].dtype == np.bool_
+    assert arrays["name"].dtype == object and result.null_mask("name") is None
+    assert arrays["day"].dtype == np.dtype("datetime64[D]")
+    assert arrays["at"].dtype == np.dtype("datetime64[us]")
+    assert arrays["id"] is result.column("id")
+
+
+def test_rows_read_back_as_psycopg2_values():
+    result = ColumnarResult.from_cursor(ColumnCursor(COLUMNS, ROWS))
+    assert result.to_dicts() == [
+        {"id": 1, "score": 0.5, "active": True, "name": "a", "day": date(2024, 1, 31),
+         "at": datetime(2024, 1, 31, 10, tzinfo=timezone.utc)},
+        {"id": None, "score": None, "active": None, "name": None, "day": None, "at": None},
+        {"id": 3, "score": 2.5, "active": False, "name": "c", "day": date(2024, 2, 29),
+         "at": datetime(2024, 2, 29, 23, 59, 59, 500000, tzinfo=timezone.utc)},
+    ]
+    row = result[-1]
+    assert row["id"] == 3 and type(row["id"]) is int
+    assert dict(row) == result.to_dicts()[2]
+    with pytest.raises(IndexError):
+        result[3]
+
+
+def test_unparseable_temporal_values_fall_back_to_objects(monkeypatch):
+    parsed = datetime(2024, 1, 1, 8, tzinfo=timezone.utc)
+    monkeypatch.setitem(core.columnar.TEMPORAL_CASTERS, TIMESTAMPTZ, lambda value, cursor: parsed)
+    rows = [("2024-01-01 10:00:00+02",), ("2024-01-01 10:00:00+00",), (None,)]
+
+    result = ColumnarResult.from_cursor(ColumnCursor([("at", TIMESTAMPTZ)], rows), batch_size=1)
+
+    assert result.column("at").dtype == object
+    assert [row["at"] for row in result] == [parsed, datetime(2024, 1, 1, 10, tzinfo=timezone.utc), None]
+
+
+def test_named_cursor_is_described_after_the_first_fetch():
+    cursor = ColumnCursor([("n", INT8)], [(1,), (2,)], named=True)
+    result = ColumnarResult.from_cursor(cursor)
+    assert result.column("n").tolist() == [1, 2]
+    assert result.nbytes == 16
+
+
+def test_repeated_column_names_are_renamed_like_pandas():
+    columns = [("id", INT4), ("id", TIMESTAMPTZ), ("id.1", TEXT), ("id", TEXT)]
+    result = ColumnarResult.from_cursor(ColumnCursor(columns, [(1, "2024-01-31 10:00:00+00", "x", "y")]))
+    assert result.names == ["id", "id.1", "id.1.1", "id.2"]
+    assert result[0].to_dict() == {"id": 1, "id.1": datetime(2024, 1, 31, 10, tzinfo=timezone.utc),
+                                   "id.1.1": "x", "id.2": "y"}
+    assert result[0]["id"] == 1
+
+
+def test_empty_results():
+    empty = ColumnarResult.from_cursor(ColumnCursor([("n", INT4), ("s", TEXT)], []))
+    assert len(empty) == 0 and empty.column("n").dtype == np.int32 and empty.to_dicts() == []
+    no_result = ColumnarResult.from_cursor(ColumnCursor([], [], named=True))
+    assert no_result.names == [] and len(no_result) == 0
+
+
+def test_to_pandas_shares_buffers_and_keeps_nulls():
+    pd = pytest.importorskip("pandas")
+    result = ColumnarResult.from_cursor(ColumnCursor(COLUMNS, ROWS))
+    frame = result.to_pandas()
+    assert frame["id"].dtype == pd.Int32Dtype()
+    assert frame["id"].isna().tolist() == [False, True, False]
+    assert str(frame["at"].dt.tz) == "UTC"
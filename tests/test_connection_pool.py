@@ -0,0 +1,149 @@
+# tests/test_connection_pool.py
+import threading
+import time
+
+import psycopg2
+import psycopg2.extensions
+import pytest
+
+import core.database
+from core.database import ConnectionPool
+from core.exceptions import ConnectionError, DatabaseError, PoolTimeoutError
+from tests.fakes import FakeConnection
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    opened = []
+
+    def connect(**params):
+        connection = FakeConnection()
+        opened.append(connection)
+        return connection
+
+    monkeypatch.setattr(core.database.psycopg2, "connect", connect)
+    return opened
+
+
+def test_open_prewarms_min_size(connections):
+    pool = ConnectionPool({}, min_size=2, max_size=4)
+    pool.open()
+    stats = pool.stats()
+    assert (stats.size, stats.idle, stats.in_use) == (2, 2, 0)
+    assert all(c.autocommit for c in connections)
+
+
+def test_checkout_reuses_most_recently_returned(connections):
+    pool = ConnectionPool({}, min_size=0, max_size=2, check_interval=60)
+    first = pool.getconn()
+    second = pool.getconn()
+    pool.putconn(first)
+    pool.putconn(second)
+    assert pool.getconn() is second
+    assert len(connections) == 2
+
+
+def test_exhausted_pool_times_out(connections):
+    pool = ConnectionPool({}, min_size=0, max_size=1)
+    pool.getconn()
+    with pytest.raises(PoolTimeoutError):
+        pool.getconn(timeout=0.05)
+    assert pool.stats().timeouts == 1
+
+
+def test_waiter_gets_returned_connection(connections):
+    pool = ConnectionPool({}, min_size=0, max_size=1, check_interval=60)
+    held = pool.getconn()
+    threading.Timer(0.05, pool.putconn, args=(held,)).start()
+    assert pool.getconn(timeout=2) is held
+    assert pool.stats().max_wait_time > 0
+
+
+def test_putconn_rolls_back_open_transaction_and_resets_session(connections):
+    pool = ConnectionPool({}, min_size=0, max_size=1)
+    connection = pool.getconn()
+    connection.autocommit = False
+    connection.cursor_factory = object
+    connection.status = psycopg2.extensions.TRANSACTION_STATUS_INERROR
+    pool.putconn(connection)
+    assert connection.rollbacks == 1
+    assert connection.autocommit is True
+    assert connection.cursor_factory is None
+
+
+def test_putconn_discards_connection_that_fails_to_reset(connections):
+    pool = ConnectionPool({}, min_size=0, max_size=1)
+    connection = pool.getconn()
+    connection.status = psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+
+    def broken_rollback():
+        raise psycopg2.InterfaceError("connection already closed")
+
+    connection.rollback = broken_rollback
+    pool.putconn(connection)
+    assert connection.closed
+    assert pool.stats().size == 0
+
+
+def test_putconn_rejects_foreign_connection(connections):
+    pool = ConnectionPool({}, min_size=0, max_size=1)
+    with pytest.raises(DatabaseError):
+        pool.putconn(FakeConnection())
+
+
+def test_unhealthy_idle_connection_is_replaced(connections):
+    pool = ConnectionPool({}, min_size=0, max_size=1, check_interval=0)
+    connection = pool.getconn()
+    pool.putconn(connection)
+    connection.fail_on, connection.error = "SELECT 1", psycopg2.OperationalError("server closed")
+    replacement = pool.getconn()
+    assert replacement is not connection
+    assert connection.closed
+    assert pool.stats().failed_health_checks == 1
+
+
+def test_expired_connection_is_recycled(connections, monkeypatch):
+    pool = ConnectionPool({}, min_size=0, max_size=1, max_lifetime=10, check_interval=60)
+    connection = pool.getconn()
+    pool.putconn(connection)
+    later = time.monotonic() + 11
+    monkeypatch.setattr(core.database.time, "monotonic", lambda: later)
+    assert pool.getconn() is not connection
+    assert connection.closed
+
+
+def test_idle_connections_above_min_size_are_evicted(connections, monkeypatch):
+    pool = ConnectionPool({}, min_size=1, max_size=3, max_idle=5, check_interval=60)
+    held = [pool.getconn() for _ in range(3)]
+    for connection in held:
+        pool.putconn(connection)
+    later = time.monotonic() + 6
+    monkeypatch.setattr(core.database.time, "monotonic", lambda: later)
+    pool.getconn()
+    assert pool.stats().size == 1
+    assert sum(1 for c in held if c.closed) == 2
+
+
+def test_failed_connect_releases_reserved_slot(monkeypatch):
+    def connect(**params):
+        raise psycopg2.OperationalError("could not connect")
+
+    monkeypatch.setattr(core.database.psycopg2, "connect", connect)
+    pool = ConnectionPool({}, min_size=0, max_size=1)
+    with pytest.raises(psycopg2.OperationalError):
+        pool.getconn()
+    assert pool.stats().size == 0
+
+
+def test_closed_pool_refuses_checkouts(connections):
+    pool = ConnectionPool({}, min_size=1, max_size=1)
+    pool.open()
+    pool.close()
+    assert all(c.closed for c in connections)
+    with pytest.raises(ConnectionError):
+        pool.getconn()
+
+
+def test_invalid_sizes_are_rejected():
+    with pytest.raises(ValueError):
+        ConnectionPool({}, min_size=3, max_size=2)
@@ -0,0 +1,139 @@
+# tests/test_cost_gate.py
+import json
+
+import pytest
+
+from core.exceptions import QueryRejectedError
+from services.cost_gate import CostGate, PlanSummary
+from tests.fakes import FakeConnection, FakeDatabase
+
+
+def scan(relation, cost, rows=1000, **extra):
+    return {"Node Type": "Seq Scan", "Relation Name": relation, "Schema": "s", "Total Cost": cost,
+            "Startup Cost": 0.0, "Plan Rows": rows, "Plan Width": 16, **extra}
+
+
+def explained(plan, as_text=False):
+    document = [{"Plan": plan}]
+    return (["QUERY PLAN"], [(json.dumps(document) if as_text else document,)])
+
+
+def gate(*plans, **options):
+    connection = FakeConnection(results=[explained(plan) for plan in plans])
+    options.setdefault("max_cost", 1000.0)
+    options.setdefault("reject_cost", 0.0)
+    return CostGate(FakeDatabase(connection), **options), connection
+
+
+def test_plan_summary_walks_the_tree():
+    plan = {
+        "Node Type": "Nested Loop", "Total Cost": 5e6, "Startup Cost": 1.0, "Plan Rows": 1e9, "Plan Width": 32,
+        "Plans": [scan("a", 10.0), scan("b", 20.0)],
+    }
+    summary = PlanSummary.from_plan(plan)
+    assert summary.shape == "Nested Loop(Seq Scan s.a, Seq Scan s.b)"
+    assert summary.node_types == ["Nested Loop", "Seq Scan", "Seq Scan"]
+    assert summary.seq_scans == ["s.a", "s.b"]
+    assert summary.unconditioned_nested_loops == 1
+
+    plan["Plans"][1] = {"Node Type": "Index Scan", "Relation Name": "b", "Index Cond": "(b.id = a.b_id)",
+                        "Total Cost": 1.0, "Startup Cost": 0.0, "Plan Rows": 1, "Plan Width": 8}
+    assert PlanSummary.from_plan(plan).unconditioned_nested_loops == 0
+
+
+def test_long_shapes_are_truncated():
+    plan = {"Node Type": "Append", "Total Cost": 1, "Startup Cost": 0, "Plan Rows": 1, "Plan Width": 1,
+            "Plans": [scan(f"partition_{i}", 1.0) for i in range(50)]}
+    shape = PlanSummary.from_plan(plan).shape
+    assert len(shape) == 300 and shape.endswith(" ...")
+
+
+def test_cheap_statements_are_allowed_and_plans_cached():
+    cost_gate, connection = gate(scan("t", 10.0))
+    first = cost_gate.enforce("SELECT * FROM t;")
+    second = cost_gate.enforce("select *  from t")
+    assert (first.action, first.sql) == ("allow", "SELECT * FROM t;")
+    assert second.plan == first.plan
+    assert connection.executed == [("EXPLAIN (FORMAT JSON) SELECT * FROM t", None)]
+    # EXPLAIN runs in a transaction that is rolled back, never committed.
+    assert (connection.rollbacks, connection.commits) == (1, 0)
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT 1; DROP TABLE t",
+    "SELECT 1 /* ; */; DELETE FROM t;",
+])
+def test_multiple_statements_are_rejected_before_explain(sql):
+    cost_gate, connection = gate(scan("t", 10.0))
+    with pytest.raises(QueryRejectedError) as excinfo:
+        cost_gate.enforce(sql)
+    assert excinfo.value.reasons == [{"rule": "multiple_statements"}]
+    assert connection.executed == []
+
+
+def test_semicolons_in_literals_and_comments_are_not_separators():
+    cost_gate, connection = gate(scan("t", 10.0))
+    cost_gate.enforce("SELECT ';', \"a;b\", $$x;y$$ FROM t -- trailing; comment\n;")
+    assert len(connection.executed) == 1
+
+
+def test_json_text_plans_are_decoded():
+    connection = FakeConnection(results=[explained(scan("t", 10.0), as_text=True)])
+    decision = CostGate(FakeDatabase(connection), max_cost=100.0).evaluate("SELECT 1")
+    assert decision.plan.total_cost == 10.0
+
+
+def test_expensive_statements_are_rejected_with_reasons():
+    cost_gate, _ = gate(scan("big", 5e6))
+    with pytest.raises(QueryRejectedError) as excinfo:
+        cost_gate.enforce("SELECT * FROM big")
+    reason = excinfo.value.reasons[0]
+    assert (reason["rule"], reason["total_cost"], reason["shape"]) == ("cost_gate", 5e6, "Seq Scan s.big")
+
+
+def test_limit_policy_rewrites_and_replans():
+    cost_gate, connection = gate(scan("big", 5e6), scan("big", 50.0), policy="limit", limit_rows=100)
+    decision = cost_gate.enforce("SELECT * FROM big;")
+    assert decision.action == "limit"
+    assert decision.sql == "SELECT * FROM (SELECT * FROM big) AS limited LIMIT 100"
+    assert decision.plan.total_cost == 5e6
+    assert connection.executed[1][0] == f"EXPLAIN (FORMAT JSON) {decision.sql}"
+
+
+def test_limit_policy_rejects_what_a_limit_cannot_save():
+    cost_gate, _ = gate(scan("big", 5e6), scan("big", 4e6), policy="limit")
+    with pytest.raises(QueryRejectedError, match="still 4,000,000 with LIMIT"):
+        cost_gate.enforce("SELECT count(*) FROM big")
+
+
+def test_limit_policy_never_wraps_non_row_statements():
+    cost_gate, connection = gate(scan("big", 5e6), policy="limit")
+    assert cost_gate.evaluate("DELETE FROM big").action == "reject"
+    assert len(connection.executed) == 1
+
+
+def test_background_policy_and_hard_limit():
+    cost_gate, _ = gate(scan("big", 5e6), scan("huge", 5e9), policy="background", reject_cost=1e9)
+    assert cost_gate.enforce("SELECT * FROM big").background
+    with pytest.raises(QueryRejectedError, match="hard limit"):
+        cost_gate.enforce("SELECT * FROM huge")
+
+
+def test_disabled_gate_never_plans():
+    cost_gate, connection = gate(max_cost=0)
+    assert not cost_gate.enabled
+    assert cost_gate.enforce("SELECT * FROM big").plan is None
+    assert connection.executed == []
+
+
+def test_invalid_policy_is_rejected():
+    with pytest.raises(ValueError, match="Invalid cost gate policy"):
+        CostGate(FakeDatabase(), policy="sometimes")
+
+
+def test_plan_cache_is_bounded():
+    cost_gate, connection = gate(scan("a", 1.0), scan("b", 1.0), scan("a", 1.0), cache_size=1)
+    for sql in ("SELECT * FROM a", "SELECT * FROM b", "SELECT * FROM a"):
+        cost_gate.evaluate(sql)
+    assert len(connection.executed) == 3
+    assert cost_gate.stats()["cached_plans"] == 1
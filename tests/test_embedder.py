@@ -0,0 +1,62 @@
+# tests/test_embedder.py
+import json
+
+import numpy as np
+import pytest
+
+from modules.embedder import Embedder, HashingBackend, backend_from_config
+
+
+def write_chunks(base_dir, texts, ids=None):
+    with open(base_dir / "embedding_chunks.jsonl", "w") as f:
+        for chunk_id, text in zip(ids if ids is not None else range(len(texts)), texts):
+            f.write(json.dumps({"id": chunk_id, "text": text}) + "\n")
+
+
+def test_hashing_rows_are_unit_length_and_deterministic():
+    backend = HashingBackend(dim=64)
+    first = backend.embed(["customer orders", "support tickets"])
+    assert first.shape == (2, 64) and first.dtype == np.float32
+    assert np.allclose(np.linalg.norm(first, axis=1), 1.0)
+    assert np.array_equal(first, HashingBackend(dim=64).embed(["customer orders", "support tickets"]))
+
+
+def test_text_without_terms_embeds_to_zero():
+    assert not HashingBackend(dim=16).embed(["the of and"]).any()
+
+
+def test_related_texts_are_closer():
+    vectors = HashingBackend().embed(["customer_orders", "orders of customers", "ticket priority"])
+    assert vectors[0] @ vectors[1] > vectors[0] @ vectors[2]
+
+
+def test_backend_round_trips_through_config():
+    backend = HashingBackend(dim=32, ngram_min=2, ngram_max=3)
+    rebuilt = backend_from_config(backend.config())
+    assert rebuilt.config() == backend.config()
+    assert np.array_equal(rebuilt.embed(["abc"]), backend.embed(["abc"]))
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        backend_from_config({"name": "nope", "dim": 8})
+
+
+def test_run_places_rows_by_chunk_id_independent_of_batching(tmp_path):
+    texts = ["customers", "orders", "tickets", "agents", "products"]
+    write_chunks(tmp_path, list(reversed(texts)), ids=list(reversed(range(len(texts)))))
+    Embedder(tmp_path, backend=HashingBackend(dim=32), batch_size=2).run()
+    vectors = np.load(tmp_path / "embedding_vectors.npy")
+    assert np.array_equal(vectors, HashingBackend(dim=32).embed(texts))
+
+    saved = Embedder.from_saved(tmp_path)
+    assert saved.backend.config() == HashingBackend(dim=32).config()
+    assert saved.load_info()["count"] == len(texts)
+    assert isinstance(saved.load_vectors(), np.memmap)
+
+
+def test_out_of_range_chunk_id_leaves_no_partial_file(tmp_path):
+    write_chunks(tmp_path, ["a", "b"], ids=[0, 5])
+    with pytest.raises(ValueError):
+        Embedder(tmp_path, backend=HashingBackend(dim=8)).run()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["embedding_chunks.jsonl"]
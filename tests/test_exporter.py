@@ -0,0 +1,107 @@
+# tests/test_exporter.py
+import gzip
+import io
+
+import psycopg2
+import psycopg2.extensions
+import pytest
+
+from core.exceptions import DatabaseError
+from services.exporter import _CopySink, copy_statement, export_query
+from tests.fakes import FakeConnection, FakeDatabase
+
+LINES = [b"id,name\n"] + [f"{i},name {i}\n".encode() for i in range(100)]
+
+
+class CopyConnection(FakeConnection):
+    """``copy_expert`` writes ``lines`` one CopyData message at a time, then raises ``fail`` if set."""
+
+    def __init__(self, lines=LINES, fail=None):
+        super().__init__()
+        self.lines = lines
+        self.fail = fail
+
+    def cursor(self, name=None):
+        cursor = super().cursor(name)
+
+        def copy_expert(sql, sink):
+            self.executed.append((sql, None))
+            for line in self.lines:
+                sink.write(line)
+            if self.fail is not None:
+                raise self.fail
+
+        cursor.copy_expert = copy_expert
+        return cursor
+
+
+class BrokenPipe(io.BytesIO):
+    def write(self, data):
+        raise BrokenPipeError("client went away")
+
+
+def test_copy_statement_wraps_row_returning_sql():
+    assert copy_statement("SELECT 1 -- note\n;", "tsv", header=False) == (
+        "COPY (\nSELECT 1 -- note\n) TO STDOUT WITH (FORMAT csv, DELIMITER E'\\t', HEADER false)")
+    with pytest.raises(ValueError, match="format"):
+        copy_statement("SELECT 1", "xlsx")
+    with pytest.raises(ValueError, match="Only SELECT"):
+        copy_statement("DELETE FROM t")
+
+
+def test_sink_buffers_rows_and_counts_them():
+    out = io.BytesIO()
+    reports = []
+    sink = _CopySink(out, compress=False, compress_level=6, buffer_size=64, progress=lambda *a: reports.append(a),
+                     progress_interval=0, header=True)
+    for line in LINES[:4]:
+        sink.write(line)
+    assert out.getvalue() == b""  # nothing flushed until the buffer fills
+    for line in LINES[4:]:
+        sink.write(line)
+    sink.close()
+    assert out.getvalue() == b"".join(LINES)
+    assert (sink.rows, sink.bytes) == (100, len(b"".join(LINES)))
+    assert reports[-1] == (100, sink.bytes) and len(reports) > 1
+
+
+def test_export_to_a_file_object():
+    db = FakeDatabase(CopyConnection())
+    out = io.BytesIO()
+    result = export_query("SELECT id, name FROM t", db, out, buffer_size=16)
+    assert out.getvalue() == b"".join(LINES)
+    assert (result.rows, result.path, result.compressed) == (100, None, False)
+    assert db.connection.executed[-1][0].startswith("COPY (\nSELECT id, name FROM t\n) TO STDOUT")
+    assert db.connection.autocommit is True and db.connection.commits == 0
+
+
+def test_export_to_a_gzip_path(tmp_path):
+    path = tmp_path / "out.csv.gz"
+    result = export_query("SELECT 1", FakeDatabase(CopyConnection()), path, compress=True)
+    assert gzip.decompress(path.read_bytes()) == b"".join(LINES)
+    assert result.file_bytes == path.stat().st_size
+    assert not (tmp_path / "out.csv.gz.part").exists()
+
+
+def test_failed_export_leaves_no_file(tmp_path):
+    path = tmp_path / "out.csv"
+    db = FakeDatabase(CopyConnection(fail=psycopg2.OperationalError("server closed the connection")))
+    with pytest.raises(psycopg2.OperationalError):
+        export_query("SELECT 1", db, path)
+    assert list(tmp_path.iterdir()) == []
+    assert db.connection.cancels == 0
+
+
+def test_failing_destination_cancels_the_copy():
+    db = FakeDatabase(CopyConnection())
+    with pytest.raises(BrokenPipeError):
+        export_query("SELECT 1", db, BrokenPipe(), buffer_size=1)
+    assert db.connection.cancels == 1
+
+
+def test_export_refuses_to_run_under_a_wait_callback(monkeypatch):
+    monkeypatch.setattr(psycopg2.extensions, "get_wait_callback", lambda: object())
+    db = FakeDatabase(CopyConnection())
+    with pytest.raises(DatabaseError, match="wait callback"):
+        export_query("SELECT 1", db, io.BytesIO())
+    assert db.checkouts == 0
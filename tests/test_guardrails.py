@@ -0,0 +1,73 @@
+# tests/test_guardrails.py
+import pytest
+
+from core.exceptions import QueryRejectedError
+from services.guardrails import check_large_table_scans, enforce_guardrails
+from tests.test_index_usage import TABLES
+
+ROWS = {"support.tickets": 400e6, "sales.orders": 50e6, "sales.customers": 20e3}
+
+
+def violations(sql):
+    return [v.table for v in check_large_table_scans(sql, TABLES, ROWS, large_table_rows=1_000_000)]
+
+
+def test_unfiltered_large_tables_are_flagged():
+    assert violations("SELECT * FROM support.tickets") == ["support.tickets"]
+    assert violations("SELECT * FROM sales.orders o JOIN support.tickets t ON t.customer_id = o.customer_id") == [
+        "sales.orders", "support.tickets"]
+    assert violations("SELECT * FROM sales.customers") == []
+
+
+def test_where_predicate_counts_as_a_filter():
+    assert violations("SELECT * FROM support.tickets WHERE status = 'open'") == []
+    # Only the filtered table is excused.
+    assert violations("SELECT * FROM sales.orders o JOIN support.tickets t ON t.customer_id = o.customer_id "
+                      "WHERE o.created_at > now() - interval '1 day'") == []
+
+
+def test_indexed_join_to_a_filtered_relation_is_selective():
+    sql = "SELECT t.* FROM sales.customers c JOIN support.tickets t ON t.customer_id = c.id WHERE c.name = 'Acme'"
+    assert violations(sql) == []
+    # The same join without the customer filter reads every ticket.
+    assert violations("SELECT t.* FROM sales.customers c JOIN support.tickets t ON t.customer_id = c.id") == [
+        "support.tickets"]
+
+
+def test_selectivity_does_not_flow_into_an_unindexed_join_column():
+    # orders.product_id has no index, so the product filter does not make the orders scan selective.
+    sql = "SELECT o.* FROM sales.products p JOIN sales.orders o ON o.product_id = p.id WHERE p.title = 'x'"
+    assert violations(sql) == ["sales.orders"]
+
+
+def test_selectivity_propagates_along_indexed_joins():
+    tables = {key: dict(value) for key, value in TABLES.items()}
+    tables["sales.orders"]["indexes"] = [{"name": "orders_customer_idx", "columns": ["customer_id"]}]
+    sql = ("SELECT * FROM support.agents a JOIN support.tickets t ON t.customer_id = a.id "
+           "JOIN sales.orders o ON o.customer_id = t.customer_id WHERE a.name = 'Kim'")
+    assert check_large_table_scans(sql, tables, ROWS, 1_000_000) == []
+
+
+def test_only_a_top_level_limit_bounds_the_statement():
+    assert violations("SELECT * FROM support.tickets LIMIT 10") == []
+    assert violations("SELECT * FROM support.tickets FETCH FIRST 5 ROWS ONLY") == []
+    assert violations("SELECT * FROM support.tickets t "
+                      "WHERE t.customer_id IN (SELECT id FROM sales.customers LIMIT 5)") == []
+    # A LIMIT in a subquery bounds the subquery, not the ticket scan.
+    assert violations("SELECT * FROM support.tickets t "
+                      "WHERE EXISTS (SELECT 1 FROM sales.customers LIMIT 1)") == ["support.tickets"]
+    assert violations("SELECT count(*) FROM support.tickets t JOIN (SELECT id FROM sales.customers LIMIT 5) c "
+                      "ON c.id = t.customer_id") == ["support.tickets"]
+    assert violations("SELECT * FROM sales.orders WHERE note = 'LIMIT 10'") == ["sales.orders"]
+
+
+def test_enforce_guardrails_rejects_with_reasons(monkeypatch, llm_schema_path):
+    class Retriever:
+        tables = TABLES
+        row_estimates = ROWS
+
+    monkeypatch.setattr("services.guardrails.get_retriever", lambda path, large_table_rows: Retriever)
+    with pytest.raises(QueryRejectedError) as excinfo:
+        enforce_guardrails("SELECT * FROM support.tickets", str(llm_schema_path), large_table_rows=1_000_000)
+    assert excinfo.value.reasons[0]["rule"] == "large_table_filter"
+    assert "400M rows" in str(excinfo.value)
@@ -0,0 +1,86 @@
+# tests/test_incremental_extraction.py
+import os
+
+from core.models import ColumnInfo, DatabaseSchema, TableInfo
+from services.schema_extractor import SchemaExtractor
+from utils.schema_io import fingerprint_path, load_fingerprints, save_fingerprints
+from tests.fakes import FakeDatabase
+
+
+def table(key, column="id"):
+    schema_name, table_name = key.split(".")
+    return TableInfo(schema_name=schema_name, table_name=table_name,
+                     columns=[ColumnInfo(column_name=column, data_type="integer")])
+
+
+class FakeExtractor(SchemaExtractor):
+    """Catalog of ``{key: (fingerprint, column)}``; records which oids are refetched."""
+
+    def __init__(self, catalog):
+        super().__init__(FakeDatabase())
+        self.catalog = catalog
+        self.oids = {key: oid for oid, key in enumerate(sorted(catalog), start=1)}
+        self.refetched = []
+
+    def fingerprint_tables(self, schemas=None):
+        return {key: (self.oids[key], fingerprint) for key, (fingerprint, _) in self.catalog.items()
+                if not schemas or key.split(".")[0] in schemas}
+
+    def _extract_pg_catalog(self, schemas=None, table_oids=None, snapshot=None):
+        keys = [key for key, oid in self.oids.items() if oid in table_oids]
+        self.refetched.extend(keys)
+        return DatabaseSchema(tables={key: table(key, self.catalog[key][1]) for key in keys})
+
+
+def test_only_changed_and_added_tables_are_refetched():
+    previous = DatabaseSchema(tables={key: table(key) for key in ("a.t1", "a.t2", "a.gone")})
+    fingerprints = {"a.t1": "f1", "a.t2": "f2", "a.gone": "f3"}
+    extractor = FakeExtractor({"a.t1": ("f1", "id"), "a.t2": ("f2-new", "renamed"), "a.t4": ("f4", "id")})
+
+    schema, new_fingerprints, report = extractor.extract_incremental(previous, fingerprints,
+                                                                     full_extraction_seconds=10.0)
+
+    assert sorted(extractor.refetched) == ["a.t2", "a.t4"]
+    assert (report.added, report.changed, report.removed, report.unchanged) == (["a.t4"], ["a.t2"], ["a.gone"], 1)
+    assert list(schema.tables) == ["a.t1", "a.t2", "a.t4"]
+    assert schema.tables["a.t1"] is previous.tables["a.t1"]
+    assert schema.tables["a.t2"].columns[0].column_name == "renamed"
+    assert new_fingerprints == {"a.t1": "f1", "a.t2": "f2-new", "a.t4": "f4"}
+    assert report.time_saved_seconds is not None
+
+
+def test_schema_filter_carries_other_schemas_over():
+    previous = DatabaseSchema(tables={key: table(key) for key in ("a.t1", "b.t2", "b.t3")})
+    fingerprints = {"a.t1": "f1", "b.t2": "f2", "b.t3": "f3"}
+    extractor = FakeExtractor({"a.t1": ("f1-new", "id"), "b.t2": ("f2", "id"), "b.t3": ("f3", "id")})
+
+    schema, new_fingerprints, report = extractor.extract_incremental(previous, fingerprints, schemas=["a"])
+
+    assert report.removed == []
+    assert (report.changed, report.unchanged) == (["a.t1"], 0)
+    assert extractor.refetched == ["a.t1"]
+    assert list(schema.tables) == ["a.t1", "b.t2", "b.t3"]
+    assert schema.tables["b.t2"] is previous.tables["b.t2"]
+    assert new_fingerprints == {"a.t1": "f1-new", "b.t2": "f2", "b.t3": "f3"}
+
+
+def test_schema_filter_still_reports_tables_dropped_from_that_schema():
+    previous = DatabaseSchema(tables={key: table(key) for key in ("a.t1", "a.old", "b.t2")})
+    fingerprints = {"a.t1": "f1", "a.old": "f0", "b.t2": "f2"}
+    extractor = FakeExtractor({"a.t1": ("f1", "id"), "b.t2": ("f2", "id")})
+
+    schema, new_fingerprints, report = extractor.extract_incremental(previous, fingerprints, schemas=["a"])
+
+    assert report.removed == ["a.old"]
+    assert extractor.refetched == []
+    assert list(schema.tables) == ["a.t1", "b.t2"]
+    assert new_fingerprints == {"a.t1": "f1", "b.t2": "f2"}
+
+
+def test_fingerprint_sidecar_round_trip(tmp_path, monkeypatch):
+    assert fingerprint_path("metadata/database_schema.snap") == os.path.join("metadata", "database_schema.fingerprints.json")
+    assert load_fingerprints(str(tmp_path / "missing.json")) == ({}, None)
+    # A bare file name (no directory part) is written to the working directory.
+    monkeypatch.chdir(tmp_path)
+    save_fingerprints("schema.fingerprints.json", {"a.t1": "f1"}, 1.5)
+    assert load_fingerprints("schema.fingerprints.json") == ({"a.t1": "f1"}, 1.5)
@@ -0,0 +1,92 @@
+# tests/test_index_usage.py
+from core.models import ColumnInfo, DatabaseSchema, IndexInfo, TableInfo
+from format_schema import format_schema_to_json
+from modules.schema_retriever import SchemaRetriever
+from services.index_usage import analyze_index_usage, leading_index_columns, resolve_tables, summarize
+from tests.conftest import LLM_SCHEMA
+
+TABLES = {
+    f"{schema_name}.{table_name}": table_info
+    for schema_name, schema_info in LLM_SCHEMA["schemas"].items()
+    for table_name, table_info in schema_info["tables"].items()
+}
+
+
+def predicates(sql):
+    return [(p.table, p.column, p.clause, p.index) for p in analyze_index_usage(sql, TABLES).predicates]
+
+
+def test_format_schema_writes_compact_indexes():
+    table = TableInfo(
+        schema_name="s", table_name="t",
+        columns=[ColumnInfo(column_name="id", data_type="integer", is_primary_key=True)],
+        indexes=[
+            IndexInfo(index_name="t_pkey", is_unique=True, is_primary=True, columns=["id"]),
+            IndexInfo(index_name="t_plain", columns=["a"]),
+            IndexInfo(index_name="t_tags", index_type="gin", columns=["tags"]),
+            IndexInfo(index_name="t_open", is_unique=True, columns=["b", "c"], include_columns=["d"],
+                      predicate="(status = 'open'::text)"),
+        ],
+    )
+    indexes = format_schema_to_json(DatabaseSchema(tables={"s.t": table}))["schemas"]["s"]["tables"]["t"]["indexes"]
+    assert indexes == [
+        {"name": "t_plain", "columns": ["a"]},
+        {"name": "t_tags", "columns": ["tags"], "method": "gin"},
+        {"name": "t_open", "columns": ["b", "c"], "unique": True, "include": ["d"],
+         "where": "(status = 'open'::text)"},
+    ]
+
+
+def test_render_index_notation():
+    assert SchemaRetriever.render_index({"columns": ["a"]}) == "(a)"
+    assert SchemaRetriever.render_index(
+        {"columns": ["b", "c"], "unique": True, "method": "gin", "include": ["d"], "where": "status = 'open'"}
+    ) == "UNIQUE gin(b, c) INCLUDE (d) WHERE status = 'open'"
+    line = SchemaRetriever.render_table("support.tickets", TABLES["support.tickets"])
+    assert line.endswith(
+        " IDX[btree(customer_id); btree(created_at) INCLUDE (priority) WHERE status = 'open']")
+
+
+def test_leading_columns_cover_pk_btree_leaders_and_every_gin_key():
+    table = {
+        "columns": [{"name": "id", "is_primary_key": True}],
+        "indexes": [{"name": "ab", "columns": ["a", "b"]}, {"name": "g", "method": "gin", "columns": ["x", "y"]}],
+    }
+    assert leading_index_columns(table) == {"id": "PRIMARY KEY", "a": "ab", "x": "g", "y": "g"}
+
+
+def test_resolve_tables_maps_aliases_and_unique_bare_names():
+    aliases = resolve_tables("SELECT * FROM sales.orders o JOIN tickets AS t ON t.customer_id = o.customer_id "
+                             "LEFT JOIN customers WHERE 1 = 1", TABLES)
+    assert aliases["o"] == "sales.orders"
+    assert aliases["t"] == "support.tickets"
+    assert aliases["customers"] == "sales.customers"
+    assert "where" not in aliases and "left" not in aliases
+
+
+def test_predicates_are_scored_per_clause():
+    sql = ("SELECT c.name FROM sales.customers c JOIN support.tickets t ON t.customer_id = c.id "
+           "WHERE t.priority = 'high' AND c.region = 'it''s where' ORDER BY c.name")
+    assert predicates(sql) == [
+        ("support.tickets", "customer_id", "join", "tickets_customer_idx"),
+        ("sales.customers", "id", "join", "PRIMARY KEY"),
+        ("support.tickets", "priority", "where", None),
+        ("sales.customers", "region", "where", None),
+    ]
+
+
+def test_ambiguous_and_unknown_columns_are_skipped():
+    # "id" and "created_at" belong to both tables, and "nope" to neither.
+    sql = "SELECT 1 FROM sales.orders JOIN support.tickets ON true WHERE id = 1 AND created_at > now() AND nope"
+    assert predicates(sql) == []
+    assert analyze_index_usage("SELECT 1 FROM elsewhere WHERE x = 1", TABLES).hit_ratio is None
+
+
+def test_summarize_reports_hit_ratio_and_top_misses():
+    reports = [analyze_index_usage(sql, TABLES) for sql in (
+        "SELECT * FROM support.tickets WHERE customer_id = 1 AND status = 'open'",
+        "SELECT * FROM support.tickets WHERE status = 'closed'",
+    )]
+    summary = summarize(reports)
+    assert (summary["statements"], summary["predicates"], summary["indexed_predicates"]) == (2, 3, 1)
+    assert summary["top_unindexed"] == [("support.tickets.status", 2)]
@@ -0,0 +1,69 @@
+# tests/test_lazy_schema.py
+import copy
+import pickle
+
+import pytest
+
+from core.models import DatabaseSchema, LazyTableMapping, TableInfo
+from utils.schema_io import load_schema, save_schema
+from tests.test_schema_snapshot import sample_schema
+
+
+@pytest.fixture(params=["schema.snap", "schema.json"])
+def lazy_schema(request, tmp_path):
+    path = str(tmp_path / request.param)
+    save_schema(sample_schema(), path)
+    return load_schema(path, lazy=True)
+
+
+def test_directory_operations_decode_nothing(lazy_schema):
+    tables = lazy_schema.tables
+    assert isinstance(tables, LazyTableMapping)
+    assert len(tables) == 3
+    assert list(tables) == ["zeta.empty", "sales.orders", "sales.customers"]
+    assert "sales.orders" in tables and "sales.missing" not in tables
+    assert tables.keys_in_schema("sales") == ["sales.orders", "sales.customers"]
+    assert tables.loaded == 0
+
+
+def test_tables_decode_once_on_access(lazy_schema):
+    orders = lazy_schema.get_table("sales", "orders")
+    assert orders.columns[1].foreign_key_info.referenced_table_name == "customers"
+    assert lazy_schema.tables["sales.orders"] is orders
+    assert lazy_schema.tables.loaded == 1
+    assert lazy_schema.get_table("sales", "missing") is None
+    with pytest.raises(KeyError):
+        lazy_schema.tables["sales.missing"]
+
+
+def test_get_tables_in_schema_decodes_only_that_schema(lazy_schema):
+    assert [t.table_name for t in lazy_schema.get_tables_in_schema("sales")] == ["orders", "customers"]
+    assert lazy_schema.tables.loaded == 2
+
+
+def test_assignment_and_deletion(lazy_schema):
+    lazy_schema.tables["new.t"] = TableInfo(schema_name="new", table_name="t")
+    del lazy_schema.tables["zeta.empty"]
+    assert lazy_schema.tables.keys_in_schema("new") == ["new.t"]
+    assert list(lazy_schema.tables) == ["sales.orders", "sales.customers", "new.t"]
+
+
+def test_lazy_schema_behaves_like_an_eager_one(lazy_schema):
+    eager = sample_schema()
+    assert lazy_schema.model_dump() == eager.model_dump()
+    assert lazy_schema.model_dump_json() == eager.model_dump_json()
+    assert lazy_schema.get_relationships() == eager.get_relationships()
+    assert dict(lazy_schema.tables) == eager.tables
+
+
+def test_pickle_and_deepcopy_materialize_a_plain_dict(lazy_schema):
+    for clone in (pickle.loads(pickle.dumps(lazy_schema)), copy.deepcopy(lazy_schema)):
+        assert type(clone.tables) is dict
+        assert clone.model_dump() == sample_schema().model_dump()
+
+
+def test_eager_loading_is_unchanged(tmp_path):
+    path = str(tmp_path / "schema.snap")
+    save_schema(sample_schema(), path)
+    schema = load_schema(path)
+    assert type(schema.tables) is dict and isinstance(schema, DatabaseSchema)
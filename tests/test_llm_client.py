@@ -0,0 +1,152 @@
+# tests/test_llm_client.py
+import pytest
+import requests
+
+import LLMs.client
+from config.settings import LLMConfig
+from core.exceptions import CircuitOpenError, LLMRequestError
+from LLMs.client import CircuitBreaker, OpenRouterClient, parse_retry_after
+
+OK = {"choices": [{"message": {"content": " SELECT 1 "}}]}
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=OK, headers=None):
+        self.status_code = status_code
+        self._body = body
+        self.headers = headers or {}
+        self.text = str(body)
+
+    def json(self):
+        if isinstance(self._body, Exception):
+            raise self._body
+        return self._body
+
+
+class FakeSession:
+    """Returns (or raises) the queued outcomes in order."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.posts = 0
+
+    def post(self, url, json=None, timeout=None):
+        self.posts += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    def close(self):
+        pass
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(LLMs.client.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(LLMs.client.time, "sleep", delays.append)
+    return delays
+
+
+def client(*outcomes, **config):
+    params = {"api_url": "http://llm.test/v1/chat/completions", "model": "m", "max_retries": 2,
+              "circuit_failure_threshold": 2, "circuit_reset_timeout": 30.0, **config}
+    return OpenRouterClient(LLMConfig(**params), session=FakeSession(*outcomes))
+
+
+def open_circuit(llm, clock):
+    for _ in range(llm.breaker.failure_threshold):
+        llm.breaker.record_failure()
+    clock.now += llm.breaker.reset_timeout
+
+
+def test_breaker_opens_then_lets_one_trial_through(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.allow()
+    clock.now += 10
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+
+
+def test_retries_retryable_status_then_succeeds(sleeps):
+    llm = client(FakeResponse(503), FakeResponse(429, headers={"Retry-After": "3"}), FakeResponse(),
+                 circuit_failure_threshold=5)
+    assert llm.complete("q") == "SELECT 1"
+    assert llm.session.posts == 3
+    assert sleeps[1] == 3.0
+    assert llm.stats()["retries"] == 2
+    assert llm.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_client_error_is_not_retried_and_keeps_circuit_closed(sleeps):
+    llm = client(FakeResponse(400, body={"error": "bad"}))
+    with pytest.raises(LLMRequestError) as raised:
+        llm.complete("q")
+    assert raised.value.status_code == 400
+    assert llm.session.posts == 1 and sleeps == []
+    assert llm.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_open_circuit_fails_fast(clock, sleeps):
+    llm = client(requests.ConnectionError("down"), requests.Timeout("slow"))
+    with pytest.raises(CircuitOpenError):
+        llm.complete("q")
+    assert llm.session.posts == 2
+
+
+@pytest.mark.parametrize("failure", [
+    requests.exceptions.ChunkedEncodingError("truncated body"),
+    requests.TooManyRedirects("loop"),
+    FakeResponse(body=requests.exceptions.JSONDecodeError("Expecting value", "<html>", 0)),
+])
+def test_failed_trial_call_releases_the_circuit(clock, sleeps, failure):
+    llm = client(failure, FakeResponse(), max_retries=0)
+    open_circuit(llm, clock)
+    with pytest.raises(LLMRequestError):
+        llm.complete("q")
+    assert llm.breaker.state == CircuitBreaker.OPEN
+    clock.now += 30
+    assert llm.complete("q") == "SELECT 1"
+    assert llm.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_interrupted_trial_call_releases_the_circuit(clock, sleeps):
+    llm = client(KeyboardInterrupt(), FakeResponse())
+    open_circuit(llm, clock)
+    with pytest.raises(KeyboardInterrupt):
+        llm.complete("q")
+    clock.now += 30
+    assert llm.complete("q") == "SELECT 1"
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
@@ -0,0 +1,73 @@
+# tests/test_parallel_extraction.py
+import threading
+
+from core.models import DatabaseSchema, TableInfo
+from services.schema_extractor import SchemaExtractor
+from tests.fakes import FakeConnection, FakeDatabase
+
+
+class ShardRecordingExtractor(SchemaExtractor):
+    """Coordinator runs against the fake connection; shards return one table per schema."""
+
+    def __init__(self, db):
+        super().__init__(db)
+        self.shards = []
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def _extract_shard(self, schemas=None, snapshot=None):
+        with self._lock:
+            self.shards.append((sorted(schemas or []), snapshot))
+            self.threads.add(threading.current_thread().name)
+        return DatabaseSchema(tables={f"{name}.t": TableInfo(schema_name=name, table_name="t")
+                                      for name in schemas or ["public"]})
+
+
+def coordinator(table_counts):
+    return FakeConnection(results=[
+        None,
+        (["snapshot"], [{"snapshot": "00000003-0000001B-1"}]),
+        (["nspname", "tables"], [{"nspname": name, "tables": count} for name, count in table_counts.items()]),
+        None,
+    ])
+
+
+def test_shards_are_balanced_by_table_count():
+    shards = SchemaExtractor._shard_schemas({"big": 100, "mid": 60, "small1": 30, "small2": 20, "tiny": 5}, 2)
+    assert shards == [["big", "tiny"], ["mid", "small1", "small2"]]
+    assert SchemaExtractor._shard_schemas({"only": 1}, 3) == [["only"]]
+
+
+def test_parallel_extraction_shares_one_exported_snapshot():
+    connection = coordinator({"a": 10, "b": 5, "c": 5})
+    extractor = ShardRecordingExtractor(FakeDatabase(connection))
+
+    schema = extractor.extract_schema(max_workers=2)
+
+    assert sorted(extractor.shards) == [(["a"], "00000003-0000001B-1"), (["b", "c"], "00000003-0000001B-1")]
+    assert all(name.startswith("extract") for name in extractor.threads)
+    assert list(schema.tables) == ["a.t", "b.t", "c.t"]
+    statements = [sql for sql, _ in connection.executed]
+    assert statements[0] == "BEGIN ISOLATION LEVEL REPEATABLE READ READ ONLY"
+    assert statements[-1] == "COMMIT"
+
+
+def test_parallel_extraction_of_an_empty_catalog_commits_and_returns_nothing():
+    connection = coordinator({})
+    extractor = ShardRecordingExtractor(FakeDatabase(connection))
+
+    assert extractor.extract_schema(schemas=["none"], max_workers=4).tables == {}
+    assert extractor.shards == []
+    assert connection.executed[-1][0] == "COMMIT"
+
+
+def test_workers_are_capped_below_the_pool_size():
+    db = FakeDatabase()
+    db.config.pool_max_size = 2
+    extractor = ShardRecordingExtractor(db)
+
+    extractor.extract_schema(["a"], max_workers=8)
+
+    # One pooled connection must stay free for the coordinator, so this runs serially.
+    assert extractor.shards == [(["a"], None)]
+    assert db.connection.executed == []
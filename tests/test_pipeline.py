@@ -0,0 +1,156 @@
+# tests/test_pipeline.py
+import asyncio
+import threading
+
+import pytest
+
+import services.pipeline
+from core.exceptions import QueryRejectedError
+from services.cost_gate import CostGateDecision, PlanSummary
+from services.pipeline import AsyncDatabase, AsyncPipeline
+from services.result_cache import ResultCache
+from tests.fakes import FakeConnection, FakeDatabase
+
+PLAN = PlanSummary(total_cost=42.0, startup_cost=0.0, plan_rows=3, plan_width=8, shape="Seq Scan t")
+
+
+class FakeLLM:
+    def __init__(self, delay=0.0, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.schema_json_path = "unused.json"
+        self.in_flight = 0
+        self.peak = 0
+
+    async def generate_sql(self, question):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        if question == self.fail_on:
+            raise RuntimeError("upstream down")
+        return f"SELECT '{question}'"
+
+    def close(self):
+        pass
+
+
+class FakeAsyncDatabase:
+    def __init__(self, rows=None, reject=None):
+        self.rows = rows if rows is not None else [{"n": 1}]
+        self.reject = reject
+        self.executed = []
+
+    async def call(self, fn, *args):
+        return fn(*args)
+
+    async def execute(self, sql, max_rows=None, background=False):
+        self.executed.append((sql, max_rows, background))
+        return list(self.rows)
+
+    def close(self):
+        pass
+
+
+class FakeCostGate:
+    enabled = True
+
+    def __init__(self, action="allow"):
+        self.action = action
+
+    def enforce(self, sql):
+        if self.action == "reject":
+            raise QueryRejectedError("too expensive", reasons=[{"rule": "cost_gate"}])
+        return CostGateDecision(action=self.action, sql=sql, plan=PLAN)
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    monkeypatch.setattr(services.pipeline, "enforce_guardrails", lambda sql, path, **kwargs: None)
+    pipeline = AsyncPipeline(FakeDatabase(), max_concurrency=2)
+    pipeline.llm = FakeLLM(delay=0.01)
+    pipeline.database = FakeAsyncDatabase()
+    pipeline.cost_gate = FakeCostGate()
+    return pipeline
+
+
+def test_results_keep_input_order_under_bounded_concurrency(pipeline):
+    questions = [f"q{i}" for i in range(6)]
+    results = pipeline.run(questions)
+    assert [r.question for r in results] == questions
+    assert [r.sql for r in results] == [f"SELECT '{q}'" for q in questions]
+    assert pipeline.llm.peak == 2
+    assert all(r.row_count == 1 and r.estimated_cost == 42.0 and r.gate_action == "allow" for r in results)
+
+
+def test_generation_failure_is_reported_per_question(pipeline):
+    pipeline.llm.fail_on = "q1"
+    ok, failed = pipeline.run(["q0", "q1"])
+    assert ok.error is None
+    assert failed.error.startswith("SQL generation failed") and failed.sql is None
+
+
+def test_cost_gate_rejection(pipeline):
+    pipeline.cost_gate = FakeCostGate("reject")
+    result, = pipeline.run(["q"])
+    assert result.gate_action == "reject" and result.error.startswith("SQL rejected")
+    assert pipeline.database.executed == []
+
+
+def test_background_decision_uses_background_lane(pipeline):
+    pipeline.cost_gate = FakeCostGate("background")
+    pipeline.run(["q"])
+    assert pipeline.database.executed == [("SELECT 'q'", None, True)]
+
+
+def test_rows_are_truncated_at_max_rows(pipeline):
+    pipeline.max_rows = 2
+    pipeline.database.rows = [{"n": i} for i in range(3)]
+    result, = pipeline.run(["q"])
+    assert result.truncated and result.row_count == 2
+
+
+def test_guardrails_run_off_the_event_loop_thread(pipeline, monkeypatch):
+    threads = []
+    monkeypatch.setattr(services.pipeline, "enforce_guardrails",
+                        lambda sql, path, **kwargs: threads.append(threading.current_thread()))
+    pipeline.run(["q"])
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_result_cache_is_optional():
+    db = FakeDatabase()
+    cache = ResultCache(db, max_bytes=0)
+    uncached, cached = AsyncPipeline(db), AsyncPipeline(db, result_cache=cache)
+    try:
+        assert uncached.database.result_cache is None
+        assert cached.result_cache is cache and cached.database.result_cache is cache
+    finally:
+        uncached.close()
+        cached.close()
+
+
+def test_generate_only(pipeline):
+    result, = pipeline.run(["q"], execute=False)
+    assert result.sql and pipeline.database.executed == []
+
+
+def test_async_database_fetches_one_row_past_max_rows():
+    rows = [(i,) for i in range(10)]
+    database = AsyncDatabase(FakeDatabase(FakeConnection(results=[(["n"], rows)])), max_workers=1, timeout=0)
+    try:
+        fetched = asyncio.run(database.execute("SELECT n FROM t", max_rows=3))
+    finally:
+        database.close()
+    assert fetched == [{"n": i} for i in range(4)]
+    assert database.db.connection.executed[-1][0] == "SELECT n FROM t"
+
+
+def test_async_database_runs_statements_without_rows_directly():
+    database = AsyncDatabase(FakeDatabase(FakeConnection(results=[None])), max_workers=1, timeout=0)
+    try:
+        assert asyncio.run(database.execute("UPDATE t SET n = 1", max_rows=3)) == []
+    finally:
+        database.close()
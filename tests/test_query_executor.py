@@ -0,0 +1,73 @@
+# tests/test_query_executor.py
+import time
+
+import pytest
+
+from core.exceptions import QueryTimeoutError
+from services.query_executor import execute_sql, stream_sql
+from tests.fakes import FakeConnection, FakeDatabase
+
+ROWS = [(i, f"name {i}") for i in range(5)]
+
+
+def database(*results):
+    return FakeDatabase(FakeConnection(results=list(results)))
+
+
+def test_stream_sql_yields_dicts_through_a_named_cursor():
+    db = database((["id", "name"], ROWS))
+    assert list(stream_sql("SELECT id, name FROM t", db, itersize=2)) == [
+        {"id": i, "name": f"name {i}"} for i in range(5)
+    ]
+    # Named cursors need a transaction even without a time limit.
+    assert db.connection.autocommit is False
+    assert db.connection.commits == 1
+
+
+def test_stream_sql_batches():
+    db = database((["id", "name"], ROWS))
+    batches = list(stream_sql("SELECT id, name FROM t", db, batch_size=2))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert batches[2] == [{"id": 4, "name": "name 4"}]
+
+
+def test_stream_sql_is_lazy():
+    db = database((["id"], [(1,)]))
+    stream = stream_sql("SELECT id FROM t", db)
+    assert db.checkouts == 0
+    next(stream)
+    assert db.checkouts == 1
+
+
+def test_stream_sql_rejects_bad_itersize():
+    with pytest.raises(ValueError):
+        list(stream_sql("SELECT 1", database(), itersize=0))
+
+
+def test_stream_sql_deadline_covers_the_consumer():
+    db = database((["id", "name"], ROWS))
+    stream = stream_sql("SELECT id, name FROM t", db, batch_size=1, deadline=time.monotonic() + 0.05)
+    next(stream)
+    time.sleep(0.1)
+    with pytest.raises(QueryTimeoutError):
+        next(stream)
+
+
+def test_execute_sql_returns_dicts():
+    db = database((["id", "name"], ROWS[:2]))
+    assert execute_sql("SELECT id, name FROM t", db) == [{"id": 0, "name": "name 0"}, {"id": 1, "name": "name 1"}]
+    assert db.connection.autocommit is True and db.connection.commits == 0
+
+
+def test_execute_sql_statement_without_result_set():
+    db = database(None)
+    assert execute_sql("UPDATE t SET name = 'x'", db) == []
+    assert db.connection.autocommit is True and db.connection.commits == 0
+
+
+def test_execute_sql_without_a_limit_stays_in_autocommit():
+    # CREATE INDEX CONCURRENTLY and VACUUM refuse to run inside a transaction block.
+    db = database(None)
+    assert execute_sql("VACUUM t", db) == []
+    assert db.connection.autocommit is True
+    assert db.connection.executed == [("VACUUM t", None)]
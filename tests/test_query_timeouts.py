@@ -0,0 +1,96 @@
+# tests/test_query_timeouts.py
+import threading
+import time
+
+import psycopg2.extensions
+import pytest
+
+from core.exceptions import QueryCancelledError, QueryTimeoutError
+from services.query_executor import _remaining, _Watchdog, execute_sql
+from tests.fakes import FakeConnection, FakeDatabase
+
+SERVER_TIMEOUT = psycopg2.extensions.QueryCanceledError("canceling statement due to statement timeout")
+USER_CANCEL = psycopg2.extensions.QueryCanceledError("canceling statement due to user request")
+
+
+class BlockingConnection(FakeConnection):
+    """Statements block until cancel() is called, then fail like a cancelled query."""
+
+    def __init__(self):
+        super().__init__(fail_on="FROM slow", error=USER_CANCEL)
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        super().cancel()
+        self.cancelled.set()
+
+    def cursor(self, name=None):
+        cursor = super().cursor(name)
+        execute = cursor.execute
+
+        def blocking_execute(sql, params=None):
+            if "FROM slow" in sql:
+                self.cancelled.wait(5)
+            execute(sql, params)
+
+        cursor.execute = blocking_execute
+        return cursor
+
+
+def test_remaining_takes_the_earlier_bound():
+    assert _remaining(None, None) is None
+    assert _remaining(5.0, None) == 5.0
+    assert _remaining(5.0, time.monotonic() + 1.0) == pytest.approx(1.0, abs=0.05)
+
+
+def test_expired_deadline_fails_before_running():
+    db = FakeDatabase()
+    with pytest.raises(QueryTimeoutError, match="deadline expired"):
+        execute_sql("SELECT 1", db, deadline=time.monotonic() - 1)
+    assert db.connection.executed == []
+
+
+def test_timeout_becomes_a_transaction_local_statement_timeout():
+    db = FakeDatabase(FakeConnection(results=[(["n"], [(1,)])]))
+    assert execute_sql("SELECT 1 AS n", db, timeout=2.5) == [{"n": 1}]
+    assert db.connection.executed[0] == ("SELECT set_config('statement_timeout', %s, true)", ("2500ms",))
+    assert db.connection.autocommit is False and db.connection.commits == 1
+
+
+def test_statement_timeout_maps_to_query_timeout_error():
+    db = FakeDatabase(FakeConnection(fail_on="FROM t", error=SERVER_TIMEOUT))
+    with pytest.raises(QueryTimeoutError, match="2.0s time limit"):
+        execute_sql("SELECT * FROM t", db, timeout=2)
+    assert db.connection.rollbacks == 1
+
+
+def test_server_statement_timeout_without_our_own_limit():
+    # statement_timeout set on the role or server: no client-side limit to report.
+    db = FakeDatabase(FakeConnection(fail_on="FROM t", error=SERVER_TIMEOUT))
+    with pytest.raises(QueryTimeoutError, match="server statement_timeout"):
+        execute_sql("SELECT * FROM t", db)
+    assert db.connection.rollbacks == 1
+
+
+def test_other_cancellations_map_to_query_cancelled_error():
+    db = FakeDatabase(FakeConnection(fail_on="FROM t", error=USER_CANCEL))
+    with pytest.raises(QueryCancelledError):
+        execute_sql("SELECT * FROM t", db)
+    assert db.connection.rollbacks == 1
+
+
+def test_watchdog_cancels_an_overrunning_statement():
+    db = FakeDatabase(BlockingConnection())
+    started = time.monotonic()
+    with pytest.raises(QueryTimeoutError, match="time limit"):
+        execute_sql("SELECT * FROM slow", db, timeout=0.1)
+    assert time.monotonic() - started < 2
+    assert db.connection.cancels == 1
+
+
+def test_stopped_watchdog_never_cancels():
+    connection = FakeConnection()
+    watchdog = _Watchdog(connection, 0.05)
+    watchdog.stop()
+    time.sleep(0.1)
+    assert not watchdog.fired and connection.cancels == 0
@@ -0,0 +1,80 @@
+# tests/test_response_cache.py
+import os
+
+import pytest
+
+import LLMs.response_cache
+from LLMs.response_cache import ResponseCache, normalize_question, schema_fingerprint
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache" / "llm.sqlite"), ttl_seconds=60, max_entries=3)
+    yield cache
+    cache.close()
+
+
+def test_normalize_question():
+    assert normalize_question("  How many   Tickets?! ") == "how many tickets"
+    assert normalize_question("Tickets  for 'ACME  Corp' over 1E5 in Q3?") == "tickets for 'ACME  Corp' over 1E5 in q3"
+
+
+def test_literal_case_is_part_of_the_key(cache):
+    cache.put("m", "Tickets for customer 'ACME'", "s1", "SELECT 'ACME'")
+    assert cache.get("m", "tickets for customer 'acme'", "s1") is None
+    assert cache.get("m", "TICKETS  for customer 'ACME'?", "s1") == "SELECT 'ACME'"
+
+
+def test_hit_on_normalized_question(cache):
+    cache.put("m", "How many tickets?", "s1", "SELECT 1")
+    assert cache.get("m", "how many   tickets", "s1") == "SELECT 1"
+    assert cache.get("other-model", "how many tickets", "s1") is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_new_schema_fingerprint_purges_old_entries(cache):
+    cache.put("m", "q", "s1", "SELECT 1")
+    assert cache.get("m", "q", "s2") is None
+    assert cache.get("m", "q", "s1") is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_entries_expire(cache, monkeypatch):
+    cache.put("m", "q", "s1", "SELECT 1")
+    now = LLMs.response_cache.time.time()
+    monkeypatch.setattr(LLMs.response_cache.time, "time", lambda: now + 61)
+    assert cache.get("m", "q", "s1") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_least_recently_used_is_evicted(cache, monkeypatch):
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr(LLMs.response_cache.time, "time", lambda: next(clock))
+    cache.ttl_seconds = 10_000
+    for question in ("a", "b", "c"):
+        cache.put("m", question, "s1", f"SELECT '{question}'")
+    cache.get("m", "a", "s1")
+    cache.put("m", "d", "s1", "SELECT 'd'")
+    assert cache.get("m", "b", "s1") is None
+    assert cache.get("m", "a", "s1") == "SELECT 'a'"
+    assert cache.stats()["entries"] == 3
+
+
+def test_entries_survive_reopening(tmp_path):
+    path = str(tmp_path / "llm.sqlite")
+    first = ResponseCache(path)
+    first.put("m", "q", "s1", "SELECT 1")
+    first.close()
+    second = ResponseCache(path)
+    assert second.get("m", "q", "s1") == "SELECT 1"
+    second.close()
+
+
+def test_schema_fingerprint_follows_file_changes(tmp_path):
+    path = tmp_path / "llm_schema.json"
+    path.write_text('{"schemas": {}}')
+    before = schema_fingerprint(str(path))
+    assert schema_fingerprint(str(path)) == before
+    path.write_text('{"schemas": {"a": {}}}')
+    os.utime(path, (0, 0))
+    assert schema_fingerprint(str(path)) != before
@@ -0,0 +1,142 @@
+# tests/test_result_cache.py
+import pytest
+
+from services.result_cache import ResultCache
+from tests.fakes import FakeConnection, FakeDatabase
+
+
+class CatalogConnection(FakeConnection):
+    """Answers every statement with the current relation versions."""
+
+    def __init__(self):
+        super().__init__()
+        self.relations = {
+            ("s", "orders"): [0, 0, 0, 100],
+            ("s", "customers"): [0, 0, 0, 200],
+            ("s", "order_totals"): None,  # a view: no change counters
+        }
+
+    @property
+    def results(self):
+        rows = [(schema, name, *(version or (None, None, None, None)))
+                for (schema, name), version in self.relations.items()]
+        return [(["nspname", "relname", "n_tup_ins", "n_tup_upd", "n_tup_del", "relfilenode"], rows)]
+
+    @results.setter
+    def results(self, value):
+        pass
+
+    def touch(self, table, column=0):
+        self.relations[("s", table)][column] += 1
+
+
+@pytest.fixture
+def catalog():
+    return CatalogConnection()
+
+
+@pytest.fixture
+def cache(catalog):
+    return ResultCache(FakeDatabase(catalog), max_bytes=10_000, poll_interval=0)
+
+
+def fetcher(rows):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return [dict(row) for row in rows]
+
+    fetch.calls = calls
+    return fetch
+
+
+ORDERS = [{"id": 1, "total": 10}, {"id": 2, "total": 20}]
+
+
+def test_repeated_statements_are_served_from_the_cache(cache):
+    fetch = fetcher(ORDERS)
+    assert cache.get_or_fetch("SELECT * FROM s.orders", fetch) == (ORDERS, False)
+    assert cache.get_or_fetch("select *   from s.orders;", fetch) == (ORDERS, True)
+    assert len(fetch.calls) == 1
+    assert cache.get_or_fetch("SELECT * FROM s.orders", fetch, variant=1)[1] is False
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 2)
+
+
+@pytest.mark.parametrize("column", [0, 1, 2, 3])
+def test_writes_and_truncates_invalidate_dependent_entries(cache, catalog, column):
+    fetch = fetcher(ORDERS)
+    cache.get_or_fetch("SELECT * FROM s.orders o JOIN s.customers c ON c.id = o.id", fetch)
+    cache.get_or_fetch("SELECT * FROM customers", fetch)
+    catalog.touch("orders", column)
+
+    assert cache.get_or_fetch("SELECT * FROM s.orders o JOIN s.customers c ON c.id = o.id", fetch)[1] is False
+    assert cache.get_or_fetch("SELECT * FROM customers", fetch)[1] is True
+    assert cache.invalidations == 1
+
+
+def test_dropped_tables_invalidate_too(cache, catalog):
+    fetch = fetcher(ORDERS)
+    cache.get_or_fetch("SELECT * FROM s.orders", fetch)
+    del catalog.relations[("s", "orders")]
+    assert cache.get_or_fetch("SELECT * FROM s.orders", fetch)[1] is False
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM s.order_totals",
+    "SELECT now(), * FROM s.orders",
+    "SELECT * FROM s.orders FOR UPDATE",
+    "DELETE FROM s.orders RETURNING *",
+    "SELECT * FROM generate_series(1, 3)",
+    "SELECT * FROM pg_class",
+    "SELECT 1",
+])
+def test_uncacheable_statements_always_run(cache, sql):
+    fetch = fetcher(ORDERS)
+    cache.get_or_fetch(sql, fetch)
+    assert cache.get_or_fetch(sql, fetch)[1] is False
+    assert len(fetch.calls) == 2
+    assert cache.stats()["uncacheable"] == 2
+
+
+def test_table_names_inside_literals_do_not_count(cache):
+    cache._poll()
+    assert cache.referenced_tables("SELECT 'orders'") is None
+    assert cache.referenced_tables("SELECT id FROM s.orders WHERE note = 'customers'") == {("s", "orders")}
+
+
+def test_lru_is_bounded_by_bytes(catalog):
+    cache = ResultCache(FakeDatabase(catalog), max_bytes=2_000, poll_interval=0, max_entry_fraction=0.5)
+    rows = [{"id": i, "note": f"{i:03d}" + "x" * 50} for i in range(10)]
+    for limit in range(5):
+        cache.get_or_fetch("SELECT * FROM s.orders", fetcher(rows), variant=limit)
+    stats = cache.stats()
+    assert stats["bytes_held"] <= 2_000 and stats["evictions"] > 0
+    assert cache.get_or_fetch("SELECT * FROM s.orders", fetcher(rows), variant=4)[1] is True
+    assert cache.get_or_fetch("SELECT * FROM s.orders", fetcher(rows), variant=0)[1] is False
+
+    # Larger than max_entry_fraction of the cache: returned, never stored.
+    huge = [{"id": i, "note": f"{i:03d}" + "x" * 200} for i in range(10)]
+    cache.get_or_fetch("SELECT * FROM s.customers", fetcher(huge))
+    assert cache.get_or_fetch("SELECT * FROM s.customers", fetcher(huge))[1] is False
+
+
+def test_result_of_a_table_changed_mid_query_is_not_cached(cache, catalog):
+    cache._poll()
+
+    def fetch():
+        catalog.touch("orders")
+        cache._poll()
+        return list(ORDERS)
+
+    cache.get_or_fetch("SELECT * FROM s.orders", fetch)
+    assert cache.stats()["entries"] == 0
+
+
+def test_disabled_cache_only_fetches(catalog):
+    cache = ResultCache(FakeDatabase(catalog), max_bytes=0)
+    fetch = fetcher(ORDERS)
+    cache.get_or_fetch("SELECT * FROM s.orders", fetch)
+    assert cache.get_or_fetch("SELECT * FROM s.orders", fetch)[1] is False
+    assert catalog.executed == []
@@ -0,0 +1,126 @@
+# tests/test_schema_extractor.py
+import pytest
+
+from services.schema_extractor import SchemaExtractor
+from tests.fakes import FakeConnection, FakeDatabase
+
+
+def column_row(table, name, data_type="integer", schema="s"):
+    return {
+        "table_schema": schema, "table_name": table, "column_name": name, "data_type": data_type,
+        "is_nullable": "YES", "column_default": None, "character_maximum_length": None,
+        "numeric_precision": None, "numeric_scale": None,
+    }
+
+
+def fk_row(table, name, column, target, target_column="id", schema="s"):
+    return {
+        "table_schema": schema, "table_name": table, "constraint_name": name, "column_name": column,
+        "foreign_table_schema": schema, "foreign_table_name": target, "foreign_column_name": target_column,
+    }
+
+
+def test_assemble_builds_tables_in_one_pass():
+    columns = [column_row("orders", "id"), column_row("orders", "customer_id"), column_row("customers", "id"),
+               column_row("orders", "note", "text")]
+    pks = [{"table_schema": "s", "table_name": "orders", "column_name": "id"},
+           {"table_schema": "s", "table_name": "customers", "column_name": "id"}]
+    fks = [fk_row("orders", "orders_customer_fk", "customer_id", "customers")]
+
+    schema = SchemaExtractor._assemble(iter(columns), iter(pks), iter(fks))
+
+    orders = schema.tables["s.orders"]
+    assert [c.column_name for c in orders.columns] == ["id", "customer_id", "note"]
+    assert [c.is_primary_key for c in orders.columns] == [True, False, False]
+    customer_id = orders.columns[1]
+    assert customer_id.is_foreign_key
+    assert customer_id.foreign_key_info is orders.foreign_keys[0]
+    assert customer_id.foreign_key_info.referenced_table_name == "customers"
+    assert schema.tables["s.customers"].columns[0].is_primary_key
+
+
+def test_assemble_ignores_repeated_rows_and_unknown_tables():
+    columns = [column_row("t", "a"), column_row("t", "a"), column_row("t", "b")]
+    fks = [fk_row("t", "t_fk", "b", "u"), fk_row("t", "t_fk", "b", "u"), fk_row("missing", "m_fk", "x", "u")]
+    pks = [{"table_schema": "s", "table_name": "missing", "column_name": "id"},
+           {"table_schema": "s", "table_name": "t", "column_name": "nope"}]
+
+    schema = SchemaExtractor._assemble(columns, pks, fks)
+
+    assert list(schema.tables) == ["s.t"]
+    table = schema.tables["s.t"]
+    assert [c.column_name for c in table.columns] == ["a", "b"]
+    assert len(table.foreign_keys) == 1
+    assert not any(c.is_primary_key for c in table.columns)
+
+
+def test_assemble_keeps_composite_foreign_keys_pairwise():
+    columns = [column_row("line", "order_id"), column_row("line", "line_no"), column_row("shipment", "order_id")]
+    fks = [fk_row("shipment", "ship_line_fk", "order_id", "line", "order_id"),
+           fk_row("shipment", "ship_line_fk", "line_no", "line", "line_no")]
+
+    schema = SchemaExtractor._assemble(columns, [], fks)
+
+    shipment = schema.tables["s.shipment"]
+    assert [(fk.column_name, fk.referenced_column_name) for fk in shipment.foreign_keys] == [
+        ("order_id", "order_id"), ("line_no", "line_no")]
+    # line_no is not a column of shipment in this catalog, so only order_id is linked.
+    assert [c.is_foreign_key for c in shipment.columns] == [True]
+
+
+def table_document(schema, table, columns, foreign_keys=(), indexes=()):
+    return {
+        "schema_name": schema,
+        "table_name": table,
+        "columns": [{"column_name": name, "data_type": "integer", "is_nullable": False,
+                     "is_primary_key": name == "id"} for name in columns],
+        "foreign_keys": list(foreign_keys),
+        "indexes": list(indexes),
+        "check_constraints": [],
+    }
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown extraction backend"):
+        SchemaExtractor(FakeDatabase(), backend="mysql")
+
+
+def test_table_filter_binds_schemas_and_oids():
+    assert SchemaExtractor._table_filter() == ("", [])
+    table_filter, params = SchemaExtractor._table_filter(["a", "b"], [10, 11])
+    assert table_filter == " AND n.nspname = ANY(%s) AND c.oid = ANY(%s::oid[])"
+    assert params == [["a", "b"], [10, 11]]
+    # An empty oid list still filters (to nothing) rather than widening to every table.
+    assert SchemaExtractor._table_filter(table_oids=[])[1] == [[]]
+
+
+def test_pg_catalog_backend_fetches_everything_in_one_statement():
+    fk = {"constraint_name": "orders_customer_fk", "column_name": "customer_id", "referenced_table_schema": "s",
+          "referenced_table_name": "customers", "referenced_column_name": "id"}
+    index = {"index_name": "orders_customer_idx", "columns": ["customer_id"], "index_type": "btree"}
+    documents = [table_document("s", "customers", ["id"]),
+                 table_document("s", "orders", ["id", "customer_id"], [fk], [index])]
+    connection = FakeConnection(results=[(["doc"], [{"doc": doc} for doc in documents])])
+
+    schema = SchemaExtractor(FakeDatabase(connection)).extract_schema(schemas=["s"])
+
+    assert len(connection.executed) == 1
+    sql, params = connection.executed[0]
+    assert "json_agg" in sql and "AND n.nspname = ANY(%s)" in sql
+    assert params == [["s"]]
+    orders = schema.tables["s.orders"]
+    assert orders.primary_key_columns == ["id"]
+    assert orders.columns[1].is_foreign_key
+    assert orders.columns[1].foreign_key_info.referenced_table_full_name == "s.customers"
+    assert orders.indexes[0].columns == ["customer_id"]
+
+
+def test_assemble_attaches_check_constraints():
+    checks = [{"table_schema": "s", "table_name": "t", "constraint_name": "t_price_check",
+               "check_clause": "CHECK ((price > (0)::numeric))"},
+              {"table_schema": "s", "table_name": "missing", "constraint_name": "m_check", "check_clause": "CHECK (x)"}]
+
+    schema = SchemaExtractor._assemble([column_row("t", "price", "numeric")], [], [], check_rows=checks)
+
+    assert [(c.constraint_name, c.check_clause) for c in schema.tables["s.t"].check_constraints] == [
+        ("t_price_check", "CHECK ((price > (0)::numeric))")]
@@ -0,0 +1,55 @@
+# tests/test_schema_retriever.py
+import pytest
+
+from modules.schema_retriever import SchemaRetriever
+
+
+@pytest.fixture
+def retriever(llm_schema_path):
+    return SchemaRetriever(llm_schema_path.parent, schema_path=str(llm_schema_path), use_vectors=False,
+                           stats_path=None)
+
+
+def test_indexes_every_table(retriever):
+    assert set(retriever.tables) == {
+        "sales.customers", "sales.products", "sales.orders", "support.tickets", "support.agents",
+    }
+
+
+def test_best_match_ranks_first(retriever):
+    assert retriever.rank("average product price", top_k=1) == ["sales.products"]
+
+
+def test_foreign_key_neighbours_follow_the_seeds(retriever):
+    selected = retriever.retrieve("ticket priority", top_k=1)
+    assert selected == ["support.tickets", "sales.customers"]
+
+
+def test_neighbours_are_bounded(retriever):
+    retriever.max_neighbours = 0
+    assert retriever.retrieve("ticket priority", top_k=1) == ["support.tickets"]
+
+
+def test_unmatched_question_falls_back_to_first_tables(retriever):
+    assert retriever.retrieve("zzz qqq", top_k=2)[:2] == retriever.table_ids[:2]
+
+
+def test_render_table_marks_keys_and_foreign_keys(retriever):
+    line = retriever.render_table("sales.orders", retriever.tables["sales.orders"])
+    assert line == (
+        "sales.orders(id integer PK, customer_id integer FK->sales.customers.id, "
+        "product_id integer FK->sales.products.id, created_at timestamp with time zone)"
+    )
+
+
+def test_render_respects_character_budget(retriever):
+    retriever.max_chars = 120
+    text = retriever.render(["support.tickets", "sales.customers"])
+    assert len(text) <= 120
+    assert text.endswith(" ...")
+
+
+def test_prompt_schema_only_contains_relevant_tables(retriever):
+    text = retriever.build_prompt_schema("ticket priority", top_k=1)
+    assert text.splitlines()[0].startswith("support.tickets(")
+    assert "sales.products" not in text
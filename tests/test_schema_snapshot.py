@@ -0,0 +1,140 @@
+# tests/test_schema_snapshot.py
+import pickle
+import struct
+from datetime import datetime
+
+import pytest
+
+from core.exceptions import SchemaSnapshotError
+from core.models import CheckConstraintInfo, ColumnInfo, DatabaseSchema, ForeignKeyInfo, IndexInfo, TableInfo
+from utils.schema_io import load_schema, save_schema
+from utils.schema_snapshot import SchemaSnapshot, is_snapshot, write_snapshot
+
+
+def sample_schema():
+    """Tables deliberately out of key order, with NULLs, empty strings and non-ASCII names."""
+    fk = ForeignKeyInfo(constraint_name="orders_customer_fk", column_name="customer_id",
+                        referenced_table_schema="sales", referenced_table_name="customers",
+                        referenced_column_name="id")
+    orders = TableInfo(
+        schema_name="sales", table_name="orders",
+        columns=[
+            ColumnInfo(column_name="id", data_type="bigint", is_nullable=False, is_primary_key=True,
+                       numeric_precision=64, numeric_scale=0, column_default="nextval('orders_id_seq'::regclass)"),
+            ColumnInfo(column_name="customer_id", data_type="integer", is_foreign_key=True, foreign_key_info=fk),
+            ColumnInfo(column_name="note", data_type="character varying", character_maximum_length=200,
+                       column_default="''::character varying"),
+            ColumnInfo(column_name="prix_€", data_type="numeric", column_default=""),
+        ],
+        foreign_keys=[fk],
+        indexes=[
+            IndexInfo(index_name="orders_pkey", is_unique=True, is_primary=True, columns=["id"]),
+            IndexInfo(index_name="orders_open_idx", columns=["customer_id", "note"], include_columns=["id"],
+                      predicate="(note <> ''::text)"),
+            IndexInfo(index_name="orders_note_trgm", index_type="gin", columns=["note"]),
+        ],
+        check_constraints=[CheckConstraintInfo(constraint_name="orders_note_check", check_clause="length(note) < 200")],
+    )
+    customers = TableInfo(
+        schema_name="sales", table_name="customers",
+        columns=[ColumnInfo(column_name="id", data_type="integer", is_nullable=False, is_primary_key=True)],
+    )
+    empty = TableInfo(schema_name="zeta", table_name="empty")
+    return DatabaseSchema(
+        tables={"zeta.empty": empty, "sales.orders": orders, "sales.customers": customers},
+        extracted_at=datetime(2026, 10, 17, 8, 30, 1, 123456),
+    )
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    path = tmp_path / "schema.snap"
+    write_snapshot(sample_schema(), str(path))
+    return path
+
+
+def test_round_trip_is_lossless_and_keeps_table_order(snapshot_path):
+    with SchemaSnapshot(str(snapshot_path)) as snapshot:
+        loaded = snapshot.load()
+        assert len(snapshot) == 3 and "sales.orders" in snapshot
+        assert list(snapshot.keys()) == ["zeta.empty", "sales.orders", "sales.customers"]
+        assert snapshot.table_names("sales.orders") == ("sales", "orders")
+    expected = sample_schema()
+    assert list(loaded.tables) == list(expected.tables)
+    assert loaded.model_dump() == expected.model_dump()
+    assert loaded.extracted_at == expected.extracted_at
+
+
+def test_nulls_and_empty_strings_stay_distinct(snapshot_path):
+    with SchemaSnapshot(str(snapshot_path)) as snapshot:
+        orders = snapshot.table("sales.orders")
+    assert orders.columns[1].column_default is None
+    assert orders.columns[3].column_default == ""
+    assert orders.columns[1].character_maximum_length is None
+    assert orders.indexes[0].predicate is None
+
+
+def test_column_foreign_keys_share_the_table_entries(snapshot_path):
+    with SchemaSnapshot(str(snapshot_path)) as snapshot:
+        orders = snapshot.table("sales.orders")
+        with pytest.raises(KeyError):
+            snapshot.table("sales.missing")
+    assert orders.columns[1].foreign_key_info is orders.foreign_keys[0]
+
+
+def test_fields_added_to_the_models_since_writing(snapshot_path, monkeypatch):
+    class WithDefault(CheckConstraintInfo):
+        deferrable: bool = False
+
+    class WithRequired(CheckConstraintInfo):
+        severity: str
+
+    with SchemaSnapshot(str(snapshot_path)) as snapshot:
+        monkeypatch.setattr("utils.schema_snapshot.CheckConstraintInfo", WithDefault)
+        assert snapshot.table("sales.orders").check_constraints[0].deferrable is False
+        monkeypatch.setattr("utils.schema_snapshot.CheckConstraintInfo", WithRequired)
+        with pytest.raises(SchemaSnapshotError, match="required WithRequired field.s. severity"):
+            snapshot.table("sales.orders")
+
+
+def test_foreign_key_missing_from_the_table_is_rejected(tmp_path):
+    schema = sample_schema()
+    schema.tables["sales.orders"].foreign_keys = []
+    with pytest.raises(SchemaSnapshotError, match="missing from the table's foreign_keys"):
+        write_snapshot(schema, str(tmp_path / "bad.snap"))
+
+
+def test_rejects_files_that_are_not_snapshots(tmp_path, snapshot_path):
+    short = tmp_path / "short.snap"
+    short.write_bytes(b"DBSNAP")
+    with pytest.raises(SchemaSnapshotError, match="too short"):
+        SchemaSnapshot(str(short))
+
+    data = bytearray(snapshot_path.read_bytes())
+    bad_magic = tmp_path / "magic.snap"
+    bad_magic.write_bytes(b"NOTSNAP!" + data[8:])
+    with pytest.raises(SchemaSnapshotError, match="not a schema snapshot"):
+        SchemaSnapshot(str(bad_magic))
+
+    truncated = tmp_path / "truncated.snap"
+    truncated.write_bytes(data[:-10])
+    with pytest.raises(SchemaSnapshotError, match="truncated or corrupt"):
+        SchemaSnapshot(str(truncated))
+
+    future = tmp_path / "future.snap"
+    struct.pack_into("<H", data, 8, 99)
+    future.write_bytes(bytes(data))
+    with pytest.raises(SchemaSnapshotError, match="snapshot format 99"):
+        SchemaSnapshot(str(future))
+
+
+def test_schema_io_picks_the_format_from_the_path(tmp_path):
+    schema = sample_schema()
+    for name in ("schema.snap", "schema.json", "schema.pkl"):
+        path = str(tmp_path / name)
+        save_schema(schema, path)
+        assert is_snapshot(path) == name.endswith(".snap")
+        assert load_schema(path).model_dump() == schema.model_dump()
+    with open(tmp_path / "schema.pkl", "rb") as f:
+        assert isinstance(pickle.load(f), DatabaseSchema)
+    assert not (tmp_path / "schema.snap.tmp").exists()
@@ -0,0 +1,77 @@
+# tests/test_semantic_cache.py
+import pytest
+
+import LLMs.generate_sql as generate_sql
+from LLMs.response_cache import ResponseCache, schema_fingerprint
+from LLMs.semantic_cache import SemanticCache, question_constraints
+
+CREATED_2023 = "List all support tickets for enterprise customers in the EMEA region that were created in 2023"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SemanticCache(str(tmp_path / "llm.sqlite"), threshold=0.92, max_entries=3)
+    yield cache
+    cache.close()
+
+
+def test_paraphrase_is_a_hit(cache):
+    cache.add("m", CREATED_2023, "s1", "SELECT 2023")
+    nearest = cache.lookup("m", "List the support tickets for enterprise customers in the EMEA region created in 2023",
+                           "s1")
+    assert nearest["hit"] and nearest["sql"] == "SELECT 2023"
+
+
+@pytest.mark.parametrize("answered, asked", [
+    (CREATED_2023, CREATED_2023.replace("2023", "2024")),
+    ("List customers in the EMEA region with open high-priority support tickets assigned to agents",
+     "List customers in the EMEA region without open high-priority support tickets assigned to agents"),
+    ("Average resolution time of high-priority support tickets for enterprise customers last month",
+     "Average resolution time of high-priority support tickets for enterprise customers this month"),
+    ("Show enterprise customers in the region named 'EMEA North' with open support tickets",
+     "Show enterprise customers in the region named 'EMEA South' with open support tickets"),
+])
+def test_near_miss_with_different_constraints_is_not_a_hit(cache, answered, asked):
+    cache.add("m", answered, "s1", "SELECT answered")
+    nearest = cache.lookup("m", asked, "s1")
+    assert nearest["similarity"] >= cache.threshold
+    assert not nearest["hit"]
+
+
+def test_hit_prefers_the_closest_compatible_question(cache):
+    cache.add("m", CREATED_2023, "s1", "SELECT 2023")
+    cache.add("m", "List the support tickets for enterprise customers in the EMEA region created in 2024", "s1",
+              "SELECT 2024")
+    nearest = cache.lookup("m", CREATED_2023.replace("2023", "2024"), "s1")
+    assert nearest["hit"] and nearest["sql"] == "SELECT 2024"
+
+
+def test_question_constraints():
+    assert question_constraints("Tickets NOT closed since March 3, 2024 for 'Acme Corp'") == (
+        "'Acme Corp'", "3", "2024", "not", "since", "march",
+    )
+    assert question_constraints("customers who haven't ordered") == ("haven't",)
+    assert question_constraints("list customers") == ()
+
+
+def test_scope_and_eviction(cache):
+    cache.add("m", CREATED_2023, "s1", "SELECT 1")
+    assert cache.lookup("other", CREATED_2023, "s1") is None
+    assert cache.lookup("m", CREATED_2023, "s2") is None
+    for i in range(4):
+        cache.add("m", f"question number {i}", "s2", f"SELECT {i}")
+    assert len(cache) == 3
+    assert cache.lookup("m", "question number 0", "s2")["sql"] != "SELECT 0"
+
+
+def test_semantic_hit_is_not_promoted_to_the_exact_cache(tmp_path, llm_schema_path, monkeypatch):
+    exact = ResponseCache(str(tmp_path / "exact.sqlite"))
+    semantic = SemanticCache(str(tmp_path / "semantic.sqlite"))
+    monkeypatch.setattr(generate_sql, "_response_cache", exact)
+    monkeypatch.setattr(generate_sql, "_semantic_cache", semantic)
+    schema_hash = schema_fingerprint(str(llm_schema_path))
+    semantic.add(generate_sql.MODEL, CREATED_2023, schema_hash, "SELECT 2023")
+
+    paraphrase = "List the support tickets for enterprise customers in the EMEA region created in 2023"
+    assert generate_sql.call_gpt_generate_sql(paraphrase, str(llm_schema_path)) == "SELECT 2023"
+    assert exact.get(generate_sql.MODEL, paraphrase, schema_hash) is None
@@ -0,0 +1,104 @@
+# tests/test_statistics.py
+import os
+
+import psycopg2
+import pytest
+
+from config.settings import DatabaseConfig
+from core.database import DatabaseConnection
+from core.models import ColumnStatistics, DatabaseStatistics, TableStatistics
+from modules.schema_retriever import SchemaRetriever
+from services.stats_collector import StatisticsCollector
+from utils.schema_io import DEFAULT_SCHEMA_PATH, DEFAULT_STATS_PATH, load_statistics, save_statistics, statistics_path
+from tests.fakes import FakeConnection, FakeDatabase
+
+
+def stats_row(table, row_estimate, columns=()):
+    return {
+        "schema_name": "s", "table_name": table, "row_estimate": row_estimate, "relpages": 10,
+        "table_bytes": 8192, "index_bytes": 0, "total_bytes": 8192, "last_analyzed": None, "columns": list(columns),
+    }
+
+
+def test_statistics_path_follows_the_schema_path():
+    assert DEFAULT_STATS_PATH == statistics_path(DEFAULT_SCHEMA_PATH)
+    assert statistics_path(os.path.join("out", "prod.snap")) == os.path.join("out", "prod.stats.json")
+
+
+def test_statistics_round_trip_to_a_bare_file_name(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert load_statistics("stats.json") is None
+    statistics = DatabaseStatistics(tables={"s.t": TableStatistics(schema_name="s", table_name="t", row_estimate=5)})
+    save_statistics(statistics, "stats.json")
+    assert load_statistics("stats.json").row_estimate("s.t") == 5
+
+
+def test_collector_builds_table_statistics_from_one_statement():
+    column = {"column_name": "status", "null_frac": 0.0, "n_distinct": -0.5, "avg_width": 4, "estimated_bytes": 40,
+              "most_common_values": ["open"], "most_common_freqs": [0.9]}
+    connection = FakeConnection(results=[(["schema_name"], [stats_row("big", 2e6, [column]), stats_row("new", None)])])
+
+    statistics = StatisticsCollector(FakeDatabase(connection), most_common_values=3).collect(["s"])
+
+    sql, params = connection.executed[0]
+    assert "most_common_freqs[1:3]" in sql and params == [["s"]]
+    assert statistics.row_estimate("s.big") == 2e6
+    assert statistics.row_estimate("s.new") is None
+    assert statistics.row_estimate("s.missing") is None
+    assert statistics.tables["s.big"].columns["status"].distinct_estimate(2e6) == 1e6
+    assert [t.full_name for t in statistics.large_tables(1e6)] == ["s.big"]
+
+
+def test_distinct_estimate_handles_absolute_and_unknown_counts():
+    assert ColumnStatistics(column_name="c", n_distinct=12).distinct_estimate(None) == 12
+    assert ColumnStatistics(column_name="c", n_distinct=-1).distinct_estimate(None) is None
+    assert ColumnStatistics(column_name="c").distinct_estimate(100) is None
+
+
+def test_large_tables_are_annotated_in_the_prompt():
+    table = {"columns": [{"name": "id", "data_type": "integer", "is_primary_key": True}]}
+    assert SchemaRetriever.render_table("s.big", table, 3.4e6) == "s.big(id integer PK) ROWS~3.4M"
+    assert SchemaRetriever.render_table("s.small", table) == "s.small(id integer PK)"
+
+
+@pytest.fixture
+def live_db():
+    """A real DatabaseConnection from the DB_* environment; skips when no server answers."""
+    if not os.environ.get("DB_NAME"):
+        pytest.skip("DB_NAME not set")
+    config = DatabaseConfig(host=os.environ.get("DB_HOST", "localhost"), port=int(os.environ.get("DB_PORT", 5432)),
+                            database=os.environ["DB_NAME"], user=os.environ.get("DB_USER", "postgres"),
+                            password=os.environ.get("DB_PASSWORD", "postgres"),
+                            sslmode=os.environ.get("DB_SSL_MODE", "prefer"), pool_min_size=0)
+    try:
+        psycopg2.connect(host=config.host, port=config.port, dbname=config.database, user=config.user,
+                         password=config.password, sslmode=config.sslmode, connect_timeout=3).close()
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"no database reachable: {e}")
+    db = DatabaseConnection(config)
+    yield db
+    db.close()
+
+
+def test_collector_reads_most_common_values_from_real_pg_stats(live_db):
+    # Values with commas, quotes and braces would break a naive split of the anyarray text.
+    with live_db.get_connection() as conn, conn.cursor() as cursor:
+        cursor.execute("DROP SCHEMA IF EXISTS stats_live_test CASCADE; CREATE SCHEMA stats_live_test")
+        cursor.execute("CREATE TABLE stats_live_test.t (label text, n int)")
+        cursor.execute("""
+            INSERT INTO stats_live_test.t
+            SELECT CASE WHEN g % 10 < 6 THEN 'a, "b"' ELSE '{c}' END, g % 3 FROM generate_series(1, 1000) g
+        """)
+        cursor.execute("ANALYZE stats_live_test.t")
+    try:
+        statistics = StatisticsCollector(live_db, most_common_values=2).collect(["stats_live_test"])
+    finally:
+        with live_db.get_connection() as conn, conn.cursor() as cursor:
+            cursor.execute("DROP SCHEMA stats_live_test CASCADE")
+
+    table = statistics.tables["stats_live_test.t"]
+    assert table.row_estimate == 1000
+    label = table.columns["label"]
+    assert label.most_common_values == ['a, "b"', "{c}"]
+    assert label.most_common_freqs == pytest.approx([0.6, 0.4])
+    assert table.columns["n"].most_common_values[0] in {"0", "1", "2"}
@@ -0,0 +1,67 @@
+# tests/test_vector_search.py
+import numpy as np
+import pytest
+
+from modules.vector_search import VectorIndex, top_k_indices
+
+
+def random_vectors(n, dim=16, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def metadata(n, schemas=("a", "b")):
+    return [{"id": f"{schemas[i % len(schemas)]}.t{i}", "schema": schemas[i % len(schemas)], "embedding_index": i}
+            for i in range(n)]
+
+
+def brute_force(vectors, query, k, rows=None):
+    rows = np.arange(len(vectors)) if rows is None else np.asarray(rows)
+    scores = vectors[rows] @ (query / np.linalg.norm(query))
+    return rows[np.argsort(-scores, kind="stable")[:k]]
+
+
+def test_top_k_indices_orders_best_first():
+    scores = np.array([[0.1, 0.9, 0.5, 0.7], [4.0, 3.0, 2.0, 1.0]])
+    assert top_k_indices(scores, 2).tolist() == [[1, 3], [0, 1]]
+    assert top_k_indices(scores, 10).tolist() == [[1, 3, 2, 0], [0, 1, 2, 3]]
+    assert top_k_indices(scores, 0).shape == (2, 0)
+
+
+def test_blocked_search_matches_brute_force():
+    vectors = random_vectors(500)
+    index = VectorIndex(vectors, metadata(500), block_size=64)
+    queries = random_vectors(5, seed=1)
+    rows, scores = index.search_indices(queries, k=7)
+    for query, query_rows, query_scores in zip(queries, rows, scores):
+        assert query_rows.tolist() == brute_force(vectors, query, 7).tolist()
+        assert np.all(np.diff(query_scores) <= 0)
+
+
+def test_schema_filter_only_returns_that_schema():
+    vectors = random_vectors(200)
+    index = VectorIndex(vectors, metadata(200), block_size=32)
+    query = random_vectors(1, seed=2)[0]
+    results = index.search(query, k=5, schemas=["b"])
+    assert [row for row, _ in results] == [f"b.t{i}" for i in brute_force(vectors, query, 5, rows=range(1, 200, 2))]
+    assert index.search(query, k=5, schemas=["missing"]) == []
+
+
+def test_unnormalized_vectors_score_as_cosine():
+    vectors = random_vectors(50)
+    scaled = vectors * np.linspace(0.5, 5.0, 50, dtype=np.float32)[:, None]
+    query = random_vectors(1, seed=3)[0]
+    exact = VectorIndex(vectors, metadata(50)).search(query, k=3)
+    rescaled = VectorIndex(scaled, metadata(50), normalized=False, block_size=8).search(query, k=3)
+    assert [row for row, _ in rescaled] == [row for row, _ in exact]
+    assert np.allclose([s for _, s in rescaled], [s for _, s in exact], atol=1e-5)
+
+
+def test_metadata_must_cover_every_row():
+    with pytest.raises(ValueError):
+        VectorIndex(random_vectors(3), metadata(2))
+
+
+def test_search_text_needs_an_embedder():
+    with pytest.raises(ValueError):
+        VectorIndex(random_vectors(3), metadata(3)).search_text("customers")
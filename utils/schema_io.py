@@ -1,14 +1,100 @@
+import json
 import pickle
-from core.models import DatabaseSchema
+from core.models import DatabaseSchema, DatabaseStatistics, TableInfo
+from datetime import datetime
 from pathlib import Path
+from typing import Dict, Optional, Tuple
 import os
 
-def save_schema(schema, filepath: str):
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-    with open(filepath, "wb") as f:
-        pickle.dump(schema, f)
+from utils.schema_snapshot import SchemaSnapshot, is_snapshot, write_snapshot
 
+DEFAULT_SCHEMA_PATH = "metadata/database_schema.snap"
+PICKLE_SUFFIXES = (".pkl", ".pickle")
 
-def load_schema(filepath: str) -> DatabaseSchema:
+def save_schema(schema, filepath: str = DEFAULT_SCHEMA_PATH):
+    """Write a binary snapshot; .json paths get the model's JSON and .pkl/.pickle paths a (legacy) pickle."""
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+    suffix = Path(filepath).suffix
+    if suffix in PICKLE_SUFFIXES:
+        with open(filepath, "wb") as f:
+            pickle.dump(schema, f)
+    elif suffix == ".json":
+        with open(filepath, "w", encoding="utf-8") as f:
+            f.write(schema.model_dump_json())
+    else:
+        write_snapshot(schema, filepath)
+
+
+def _load_json_schema(filepath: str, lazy: bool) -> DatabaseSchema:
+    with open(filepath, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not lazy:
+        return DatabaseSchema.model_validate(data)
+    # Parsing the document is cheap next to validating it: tables stay plain dicts until first use.
+    raw_tables = data.get("tables", {})
+    return DatabaseSchema.lazy(
+        {key: table["schema_name"] for key, table in raw_tables.items()},
+        lambda key: TableInfo.model_validate(raw_tables[key]),
+        datetime.fromisoformat(data["extracted_at"]) if "extracted_at" in data else datetime.now(),
+    )
+
+
+def load_schema(filepath: str = DEFAULT_SCHEMA_PATH, lazy: bool = False) -> DatabaseSchema:
+    """
+    Load a snapshot, a JSON schema or a legacy pickle (told apart by the
+    file's leading bytes and suffix). With ``lazy``, snapshot and JSON
+    tables are decoded on first access instead of up front; pickles are
+    always loaded whole.
+    """
+    if is_snapshot(filepath):
+        snapshot = SchemaSnapshot(filepath)
+        if lazy:
+            return snapshot.load_lazy()
+        with snapshot:
+            return snapshot.load()
+    if Path(filepath).suffix == ".json":
+        return _load_json_schema(filepath, lazy)
     with open(filepath, "rb") as f:
-        return pickle.load(f)
\ No newline at end of file
+        return pickle.load(f)
+
+
+def fingerprint_path(schema_path: str) -> str:
+    """Sidecar holding per-table fingerprints next to a saved schema."""
+    return str(Path(schema_path).with_suffix(".fingerprints.json"))
+
+
+def statistics_path(schema_path: str) -> str:
+    """Statistics snapshot saved alongside a schema."""
+    return str(Path(schema_path).with_suffix(".stats.json"))
+
+
+DEFAULT_STATS_PATH = statistics_path(DEFAULT_SCHEMA_PATH)
+
+
+def save_fingerprints(filepath: str, fingerprints: Dict[str, str], full_extraction_seconds: Optional[float]):
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+    with open(filepath, "w", encoding="utf-8") as f:
+        json.dump({"full_extraction_seconds": full_extraction_seconds, "tables": fingerprints}, f, indent=2)
+
+
+def load_fingerprints(filepath: str) -> Tuple[Dict[str, str], Optional[float]]:
+    """``(fingerprints, full_extraction_seconds)``; empty when no sidecar exists."""
+    if not Path(filepath).exists():
+        return {}, None
+    with open(filepath, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("tables", {}), data.get("full_extraction_seconds")
+
+
+def save_statistics(statistics: DatabaseStatistics, filepath: str = DEFAULT_STATS_PATH):
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+    with open(filepath, "w", encoding="utf-8") as f:
+        f.write(statistics.model_dump_json(indent=2))
+
+
+def load_statistics(filepath: str = DEFAULT_STATS_PATH) -> Optional[DatabaseStatistics]:
+    """Saved statistics snapshot, or None if statistics were never collected."""
+    if not Path(filepath).exists():
+        return None
+    with open(filepath, "r", encoding="utf-8") as f:
+        return DatabaseStatistics.model_validate_json(f.read())
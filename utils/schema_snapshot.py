@@ -0,0 +1,312 @@
+# utils/schema_snapshot.py
+"""
+Binary, versioned DatabaseSchema snapshot (``.snap``), read through mmap.
+
+Layout, little-endian::
+
+    header      magic, format version, flags, table/string counts, the
+                extracted_at string, section offsets and the file size
+    tables      per table, contiguous: fixed-width column records, FK
+                records, index records (fixed part + key/INCLUDE name ids),
+                check constraint records
+    strings     (count + 1) u32 offsets into one UTF-8 blob; every name,
+                type, default and clause is stored once and referenced by
+                id, with id 0 standing for NULL
+    directory   one fixed-width record per table, in the schema's table order:
+                key, schema and table name ids, offset of the table's
+                records, counts
+
+Opening a snapshot reads the header, the string offsets and the
+directory only; tables are decoded on request, straight from the mapped
+pages. Decoding builds the models without validation (the values were
+valid when written) and fills fields added to the models since the file
+was written with their defaults, so model changes do not break old files;
+a required field the file has no value for raises SchemaSnapshotError.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from core.exceptions import SchemaSnapshotError
+from core.models import CheckConstraintInfo, ColumnInfo, DatabaseSchema, ForeignKeyInfo, IndexInfo, TableInfo
+
+MAGIC = b"DBSNAP\r\n"
+FORMAT_VERSION = 1
+NULL_ID = 0
+NULL_INT = -2**31
+
+# magic, version, flags, tables, strings, extracted_at id, tables/strings/directory offsets, file size
+HEADER = struct.Struct("<8sHHIIIQQQQ")
+# key, schema name, table name, records offset, columns, FKs, indexes, check constraints
+DIRECTORY = struct.Struct("<IIIQIIII")
+# name, data type, default, char length, precision, scale, flags, FK position
+COLUMN = struct.Struct("<IIIiiiB3xi")
+# constraint, column, referenced schema/table/column
+FOREIGN_KEY = struct.Struct("<IIIII")
+# name, method, predicate, is_unique, is_primary, key columns, INCLUDE columns; then that many name ids
+INDEX = struct.Struct("<IIIBBHH")
+# name, clause
+CHECK = struct.Struct("<II")
+
+NULLABLE, PRIMARY_KEY, FOREIGN_KEY_FLAG = 1, 2, 4
+
+_required_fields: Dict[type, Set[str]] = {}
+
+
+def _construct(cls, values: Dict[str, Any]):
+    """Model instance over already-valid ``values`` (no validation); missing optional fields get their defaults."""
+    required = _required_fields.get(cls)
+    if required is None:
+        required = _required_fields[cls] = {name for name, field in cls.model_fields.items() if field.is_required()}
+    missing = required.difference(values)
+    if missing:
+        raise SchemaSnapshotError(f"Snapshot has no value for required {cls.__name__} "
+                                  f"field(s) {', '.join(sorted(missing))}; re-extract the schema")
+    return cls.model_construct(**values)
+
+
+def _int(value: Optional[int]) -> int:
+    return NULL_INT if value is None else value
+
+
+def is_snapshot(filepath: str) -> bool:
+    """Whether ``filepath`` starts with the snapshot magic."""
+    with open(filepath, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write_snapshot(schema: DatabaseSchema, filepath: str):
+    """
+    Write ``schema`` to ``filepath`` through a temporary file and an atomic
+    rename, so processes that have the previous snapshot mapped keep
+    reading a consistent file.
+    """
+    strings: Dict[str, int] = {}
+
+    def sid(value: Optional[str]) -> int:
+        if value is None:
+            return NULL_ID
+        i = strings.get(value)
+        if i is None:
+            i = strings[value] = len(strings) + 1
+        return i
+
+    extracted_at = sid(schema.extracted_at.isoformat())
+    directory = []
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(bytes(HEADER.size))
+        for key, table in schema.tables.items():
+            fk_positions = {id(fk): i for i, fk in enumerate(table.foreign_keys)}
+            records = []
+            for column in table.columns:
+                fk_position = -1
+                if column.foreign_key_info is not None:
+                    fk_position = fk_positions.get(id(column.foreign_key_info), -1)
+                    if fk_position < 0:
+                        if column.foreign_key_info not in table.foreign_keys:
+                            raise SchemaSnapshotError(f"{key}.{column.column_name} references a foreign key "
+                                                      "missing from the table's foreign_keys")
+                        fk_position = table.foreign_keys.index(column.foreign_key_info)
+                flags = ((NULLABLE if column.is_nullable else 0) | (PRIMARY_KEY if column.is_primary_key else 0)
+                         | (FOREIGN_KEY_FLAG if column.is_foreign_key else 0))
+                records.append(COLUMN.pack(
+                    sid(column.column_name), sid(column.data_type), sid(column.column_default),
+                    _int(column.character_maximum_length), _int(column.numeric_precision),
+                    _int(column.numeric_scale), flags, fk_position,
+                ))
+            for fk in table.foreign_keys:
+                records.append(FOREIGN_KEY.pack(
+                    sid(fk.constraint_name), sid(fk.column_name), sid(fk.referenced_table_schema),
+                    sid(fk.referenced_table_name), sid(fk.referenced_column_name),
+                ))
+            for index in table.indexes:
+                records.append(INDEX.pack(
+                    sid(index.index_name), sid(index.index_type), sid(index.predicate), index.is_unique,
+                    index.is_primary, len(index.columns), len(index.include_columns),
+                ))
+                names = [sid(name) for name in index.columns + index.include_columns]
+                records.append(struct.pack(f"<{len(names)}I", *names))
+            for check in table.check_constraints:
+                records.append(CHECK.pack(sid(check.constraint_name), sid(check.check_clause)))
+            directory.append(DIRECTORY.pack(
+                sid(key), sid(table.schema_name), sid(table.table_name), f.tell(), len(table.columns),
+                len(table.foreign_keys), len(table.indexes), len(table.check_constraints),
+            ))
+            f.write(b"".join(records))
+
+        strings_offset = f.tell()
+        encoded = [b""] + [value.encode("utf-8") for value in strings]
+        offsets = array("I", [0])
+        total = 0
+        for value in encoded:
+            total += len(value)
+            offsets.append(total)
+        if sys.byteorder == "big":
+            offsets.byteswap()
+        f.write(offsets.tobytes())
+        f.write(b"".join(encoded))
+
+        directory_offset = f.tell()
+        f.write(b"".join(directory))
+        size = f.tell()
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(directory), len(encoded), extracted_at,
+                            HEADER.size, strings_offset, directory_offset, size))
+    os.replace(tmp_path, filepath)
+
+
+class SchemaSnapshot:
+    """
+    Read-only view of a snapshot file. Opening it costs the directory, not
+    the catalog: ``table(key)`` decodes one TableInfo from the mapped file
+    on each call, ``load()`` decodes them all and ``load_lazy()`` returns a
+    schema that decodes each table on first access. Names are decoded once
+    and shared between tables.
+    """
+
+    def __init__(self, filepath: str):
+        self.path = filepath
+        with open(filepath, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER.size:
+                raise SchemaSnapshotError(f"{filepath} is not a schema snapshot (too short)")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            (magic, version, _flags, table_count, string_count, extracted_at, _tables_offset,
+             strings_offset, directory_offset, expected_size) = HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC:
+                raise SchemaSnapshotError(f"{filepath} is not a schema snapshot")
+            if version > FORMAT_VERSION:
+                raise SchemaSnapshotError(f"{filepath} uses snapshot format {version}; "
+                                          f"this version reads up to {FORMAT_VERSION}")
+            if size != expected_size:
+                raise SchemaSnapshotError(f"{filepath} is truncated or corrupt "
+                                          f"({size} bytes, header says {expected_size})")
+            self.version = version
+
+            self._string_offsets = array("I")
+            self._string_offsets.frombytes(self._mmap[strings_offset:strings_offset + 4 * (string_count + 1)])
+            if sys.byteorder == "big":
+                self._string_offsets.byteswap()
+            self._string_base = strings_offset + 4 * (string_count + 1)
+            self._strings: List[Optional[str]] = [None] * string_count
+            self._all_strings = False
+
+            self._directory: Dict[str, Tuple[int, ...]] = {}
+            end = directory_offset + table_count * DIRECTORY.size
+            for key, *entry in DIRECTORY.iter_unpack(self._mmap[directory_offset:end]):
+                self._directory[self.string(key)] = tuple(entry)
+            self.extracted_at = datetime.fromisoformat(self.string(extracted_at))
+        except BaseException:
+            self.close()
+            raise
+
+    def string(self, string_id: int) -> Optional[str]:
+        value = self._strings[string_id]
+        if value is None and string_id != NULL_ID:
+            start = self._string_base + self._string_offsets[string_id]
+            end = self._string_base + self._string_offsets[string_id + 1]
+            value = self._strings[string_id] = self._mmap[start:end].decode("utf-8")
+        return value
+
+    def _decode_strings(self):
+        """Decode the whole string table at once (a full load touches every string anyway)."""
+        if self._all_strings:
+            return
+        offsets = self._string_offsets
+        blob = self._mmap[self._string_base:self._string_base + offsets[-1]]
+        self._strings = [None] + [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(1, len(offsets) - 1)]
+        self._all_strings = True
+
+    def __len__(self) -> int:
+        return len(self._directory)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._directory
+
+    def keys(self) -> Iterator[str]:
+        """Table keys (``schema.table``) in the order they were written."""
+        return iter(self._directory)
+
+    def table_names(self, key: str) -> Tuple[str, str]:
+        """``(schema_name, table_name)`` of a table without decoding it."""
+        entry = self._directory[key]
+        return self.string(entry[0]), self.string(entry[1])
+
+    def table(self, key: str) -> TableInfo:
+        """Decode one table; raises KeyError for unknown keys."""
+        schema_id, table_id, offset, n_columns, n_fks, n_indexes, n_checks = self._directory[key]
+        s = self._strings.__getitem__ if self._all_strings else self.string
+        data = self._mmap
+
+        fk_start = offset + n_columns * COLUMN.size
+        pos = fk_start + n_fks * FOREIGN_KEY.size
+        foreign_keys = [
+            _construct(ForeignKeyInfo, {
+                "constraint_name": s(name), "column_name": s(column), "referenced_table_schema": s(ref_schema),
+                "referenced_table_name": s(ref_table), "referenced_column_name": s(ref_column),
+            })
+            for name, column, ref_schema, ref_table, ref_column in FOREIGN_KEY.iter_unpack(data[fk_start:pos])
+        ]
+        columns = [
+            _construct(ColumnInfo, {
+                "column_name": s(name), "data_type": s(data_type), "is_nullable": bool(flags & NULLABLE),
+                "column_default": s(default),
+                "character_maximum_length": None if char_length == NULL_INT else char_length,
+                "numeric_precision": None if precision == NULL_INT else precision,
+                "numeric_scale": None if scale == NULL_INT else scale,
+                "is_primary_key": bool(flags & PRIMARY_KEY), "is_foreign_key": bool(flags & FOREIGN_KEY_FLAG),
+                "foreign_key_info": foreign_keys[fk_position] if fk_position >= 0 else None,
+            })
+            for name, data_type, default, char_length, precision, scale, flags, fk_position
+            in COLUMN.iter_unpack(data[offset:fk_start])
+        ]
+        indexes = []
+        for _ in range(n_indexes):
+            name, method, predicate, is_unique, is_primary, n_keys, n_include = INDEX.unpack_from(data, pos)
+            pos += INDEX.size
+            names = [s(i) for i in struct.unpack_from(f"<{n_keys + n_include}I", data, pos)]
+            pos += 4 * (n_keys + n_include)
+            indexes.append(_construct(IndexInfo, {
+                "index_name": s(name), "is_unique": bool(is_unique), "is_primary": bool(is_primary),
+                "columns": names[:n_keys], "index_type": s(method), "predicate": s(predicate),
+                "include_columns": names[n_keys:],
+            }))
+        check_constraints = [
+            _construct(CheckConstraintInfo, {"constraint_name": s(name), "check_clause": s(clause)})
+            for name, clause in CHECK.iter_unpack(data[pos:pos + n_checks * CHECK.size])
+        ]
+        return _construct(TableInfo, {
+            "schema_name": s(schema_id), "table_name": s(table_id), "columns": columns,
+            "foreign_keys": foreign_keys, "indexes": indexes, "check_constraints": check_constraints,
+        })
+
+    def load(self) -> DatabaseSchema:
+        """Decode every table into a regular DatabaseSchema."""
+        self._decode_strings()
+        tables = {key: self.table(key) for key in self._directory}
+        return _construct(DatabaseSchema, {"tables": tables, "extracted_at": self.extracted_at})
+
+    def load_lazy(self) -> DatabaseSchema:
+        """
+        DatabaseSchema whose tables are decoded on first access and cached;
+        the snapshot stays open for as long as the schema is in use.
+        """
+        schema_names = {key: self.string(entry[0]) for key, entry in self._directory.items()}
+        return DatabaseSchema.lazy(schema_names, self.table, self.extracted_at)
+
+    def close(self):
+        self._mmap.close()
+
+    def __enter__(self) -> "SchemaSnapshot":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,38 @@
+import hashlib
+import re
+
+# String literals, quoted identifiers and dollar-quoted bodies are kept
+# verbatim; comments are dropped and everything else is case-folded with
+# whitespace collapsed, the way PostgreSQL itself reads unquoted text.
+_TOKEN_RE = re.compile(
+    r"(?P<literal>'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|(?P<tag>\$[A-Za-z_]*\$).*?(?P=tag))"
+    r"|(?P<comment>--[^\n]*|/\*.*?\*/)"
+    r"|(?P<space>\s+)",
+    re.DOTALL,
+)
+
+
+def normalize_sql(sql: str) -> str:
+    """Canonical text of ``sql``: comments removed, whitespace and case normalized outside literals."""
+    parts = []
+    position = 0
+    for match in _TOKEN_RE.finditer(sql):
+        if match.start() > position:
+            parts.append(sql[position:match.start()].lower())
+        if match.group("literal"):
+            parts.append(match.group("literal"))
+        elif parts and parts[-1] != " ":
+            parts.append(" ")
+        position = match.end()
+    parts.append(sql[position:].lower())
+    return "".join(parts).strip().rstrip(";").strip()
+
+
+def has_multiple_statements(sql: str) -> bool:
+    """True when ``sql`` has a ``;`` outside literals and comments, other than a trailing one."""
+    return ";" in _TOKEN_RE.sub(" ", normalize_sql(sql))
+
+
+def sql_fingerprint(sql: str) -> str:
+    """SHA-256 of the normalized SQL; equal for statements that differ only in layout."""
+    return hashlib.sha256(normalize_sql(sql).encode("utf-8")).hexdigest()
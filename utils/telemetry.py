@@ -0,0 +1,44 @@
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Telemetry:
+    """Thread-safe in-process counters plus a bounded log of recent events."""
+
+    def __init__(self, max_events: int = 1000):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._events: deque = deque(maxlen=max_events)
+
+    def increment(self, name: str, value: float = 1):
+        with self._lock:
+            self._counters[name] += value
+
+    def record(self, event: str, **fields: Any):
+        """Count ``event`` and keep its fields in the recent-events log."""
+        entry = {"event": event, "timestamp": time.time(), **fields}
+        with self._lock:
+            self._counters[event] += 1
+            self._events.append(entry)
+        logger.debug(f"{event}: {fields}")
+
+    def counters(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._counters)
+
+    def events(self, event: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [e for e in self._events if event is None or e["event"] == event]
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._events.clear()
+
+
+telemetry = Telemetry()
@@ -0,0 +1,33 @@
+import re
+from typing import List
+
+_TOKEN_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Za-z][a-z]*|\d+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in",
+    "is", "it", "many", "me", "of", "on", "or", "show", "the", "to", "what",
+    "which", "who", "with", "all", "list", "give", "get", "find", "count",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text and identifiers (snake_case, camelCase) into normalized terms."""
+    terms = []
+    for raw in _TOKEN_RE.findall(text):
+        term = raw.lower()
+        if term in _STOPWORDS:
+            continue
+        if len(term) > 3 and term.endswith("ies"):
+            term = term[:-3] + "y"
+        elif len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+            term = term[:-1]
+        terms.append(term)
+    return terms
+
+
+def format_count(count: float) -> str:
+    """Short human-readable count: 950, 12k, 3.4M, 1.2B."""
+    for threshold, suffix in ((1e9, "B"), (1e6, "M"), (1e3, "k")):
+        if count >= threshold:
+            scaled = count / threshold
+            return f"{scaled:.1f}{suffix}" if scaled < 10 else f"{scaled:.0f}{suffix}"
+    return f"{count:.0f}"
@@ -1,12 +1,9 @@
-import pickle
 from datetime import datetime
 
-def load_schema(filepath):
-    with open(filepath, "rb") as file:
-        return pickle.load(file)
+from utils.schema_io import DEFAULT_SCHEMA_PATH, load_schema
 
 if __name__ == "__main__":
-    schema = load_schema("metadata/database_schema.pkl")
+    schema = load_schema(DEFAULT_SCHEMA_PATH)
 
     print(f"\n📅 Extracted At: {datetime.now()}")
     print("📦 Raw Extracted Schema:\n")